@@ -4,23 +4,88 @@ extract_hevy_data.py
 Extracts Hevy workout and exercise data using the Hevy API.
 - Loads API key from project root .env (HEVY_API_KEY)
 - Exports exercises to hevy_exercises.json
-- Exports workouts to hevy_workouts.csv
+- Exports workouts to hevy_workouts.csv (or .parquet with --format parquet),
+  flattening and writing fixed-size batches of sets as pages arrive
+- With --incremental, only applies workouts created, updated or deleted
+  since the last sync (workouts/events) to the stored export
+- Completed pages are staged in staging/ until an export finishes, so an
+  interrupted run resumes without fetching them again
 - No downstream processing, just raw export
 """
 
 import os
+import sys
 import json
+import argparse
+import itertools
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterable, Iterator, Optional
 from dotenv import load_dotenv
-import requests
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 from config import get_timezone_offset_hours
 
+# Add the src directory to the path so we can import the module
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../../../../../src"))
+
+from training_readiness.etl.extract_data.hevy.hevy_checkpoints import (  # noqa: E402
+    PageCheckpoints,
+)
+from training_readiness.etl.extract_data.hevy.hevy_client import (  # noqa: E402
+    HEVY_API_URL,
+    HevyClient,
+)
+from training_readiness.etl.timestamps import parse_hevy_timestamps  # noqa: E402
+
 # Load .env from project root
 project_root = Path(__file__).resolve().parents[4]
 load_dotenv(project_root / ".env")
 
+HEVY_PAGE_SIZE = 10
+
+# Pages requested at the same time once the page count is known
+HEVY_FETCH_WORKERS = 4
+
+# Set rows flattened and written at a time
+HEVY_BATCH_ROWS = 5_000
+
+# Columns of the exported set rows
+HEVY_WORKOUT_SCHEMA = pa.schema(
+    [
+        ("workout_id", pa.string()),
+        ("title", pa.string()),
+        ("description", pa.string()),
+        ("start_time", pa.string()),
+        ("end_time", pa.string()),
+        ("exercise_title", pa.string()),
+        ("exercise_notes", pa.string()),
+        ("exercise_template_id", pa.string()),
+        ("superset_id", pa.int64()),
+        ("set_index", pa.int64()),
+        ("set_type", pa.string()),
+        ("weight_lbs", pa.float64()),
+        ("reps", pa.int64()),
+        ("distance_miles", pa.float64()),
+        ("duration_seconds", pa.float64()),
+        ("rpe", pa.float64()),
+    ]
+)
+HEVY_WORKOUT_COLUMNS = HEVY_WORKOUT_SCHEMA.names
+
+# Time of the last workout sync, next to the exported workouts
+HEVY_SYNC_STATE_FILE = "hevy_sync_state.json"
+
+# Pages of interrupted exports, next to the exported workouts
+HEVY_STAGING_DIR = "staging"
+
+# Events are re-read from this long before the last sync, so clock skew
+# against the API cannot drop changes; applying an event twice is harmless
+HEVY_SYNC_OVERLAP = timedelta(minutes=5)
+
 
 def load_api_key() -> str:
     """Load Hevy API key from environment variable HEVY_API_KEY."""
@@ -30,130 +95,573 @@ def load_api_key() -> str:
     return api_key
 
 
-def fetch_hevy_exercises() -> List[Dict[str, Any]]:
+def create_hevy_client(
+    max_workers: int = HEVY_FETCH_WORKERS, base_url: str = HEVY_API_URL
+) -> HevyClient:
+    """Create a pooled Hevy client with a connection for every fetch thread."""
+    return HevyClient(load_api_key(), base_url=base_url, pool_size=max(max_workers, 1))
+
+
+def fetch_hevy_page(
+    client: HevyClient,
+    url: str,
+    page: int,
+    page_size: int,
+    params: Optional[Dict[str, Any]] = None,
+) -> Optional[Dict[str, Any]]:
+    """Fetch one page of a paginated Hevy endpoint; None past the last page."""
+    params = {**(params or {}), "page": page, "pageSize": page_size}
+    response = client.get(url, params=params)
+
+    # Handle 404 error for end of data (common for paginated APIs)
+    if response.status_code == 404:
+        print(f"Reached end of data at page {page}")
+        return None
+
+    response.raise_for_status()
+    return response.json()
+
+
+def page_checkpoints(
+    checkpoint_dir: Path,
+    endpoint: str,
+    items_key: str,
+    page_size: int = HEVY_PAGE_SIZE,
+    params: Optional[Dict[str, Any]] = None,
+) -> PageCheckpoints:
+    """Staged pages of one paginated query in ``checkpoint_dir``."""
+    query = {**(params or {}), "pageSize": page_size}
+    return PageCheckpoints(checkpoint_dir, endpoint, items_key, query)
+
+
+def iter_hevy_pages(
+    endpoint: str,
+    items_key: str,
+    page_size: int = HEVY_PAGE_SIZE,
+    max_workers: int = HEVY_FETCH_WORKERS,
+    client: Optional[HevyClient] = None,
+    params: Optional[Dict[str, Any]] = None,
+    checkpoint_dir: Optional[Path] = None,
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Yield the items of every page of a paginated Hevy endpoint, in page order.
+
+    The first page reports the page count, so the following pages are fetched
+    concurrently on up to ``max_workers`` threads, at most two per thread
+    ahead of the page being yielded, and each is yielded as soon as it and
+    the pages before it have arrived. Without a page count, pages are walked
+    one at a time until a short page. All requests go through ``client``, or
+    a new client when none is given, with ``params`` added to every page's
+    query.
+
+    With a ``checkpoint_dir``, every completed page is staged there (see
+    hevy_checkpoints), and a fetch that was interrupted resumes with the
+    pages it already has. The staged pages are removed once all are fetched.
+    """
+    if client is None:
+        with create_hevy_client(max_workers) as client:
+            yield from iter_hevy_pages(
+                endpoint,
+                items_key,
+                page_size,
+                max_workers,
+                client,
+                params,
+                checkpoint_dir,
+            )
+        return
+
+    url = f"{client.base_url}/{endpoint}"
+    checkpoints = None
+    if checkpoint_dir is not None:
+        checkpoints = page_checkpoints(
+            checkpoint_dir, endpoint, items_key, page_size, params
+        )
+
+    def fetch_page(page: int) -> Optional[Dict[str, Any]]:
+        data = fetch_hevy_page(client, url, page, page_size, params)
+        if data is not None and checkpoints is not None:
+            checkpoints.save(page, data)
+        return data
+
+    # The first page is always fetched fresh, as it tells whether the
+    # staged pages still line up with the data
+    data = fetch_hevy_page(client, url, 1, page_size, params)
+    if data is None:
+        if checkpoints is not None:
+            checkpoints.clear()
+        return
+
+    page_count = data.get("page_count")
+    staged = set()
+    if checkpoints is not None:
+        staged = checkpoints.start(page_count, data, fetch_page)
+        checkpoints.save(1, data)
+    yield data.get(items_key, [])
+
+    if page_count is None:
+        page = 1
+        while len(data.get(items_key, [])) == page_size:
+            page += 1
+            data = checkpoints.load(page) if page in staged else fetch_page(page)
+            if data is None or not data.get(items_key):
+                break
+            yield data[items_key]
+    else:
+        workers = max(max_workers, 1)
+        upcoming = iter(range(2, page_count + 1))
+        pending = deque()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+
+            def request(page: int) -> Optional[Future]:
+                # Staged pages are read from disk once their turn comes
+                if page in staged:
+                    return None
+                return executor.submit(fetch_page, page)
+
+            # Keep a bounded window of requests in flight
+            for page in itertools.islice(upcoming, 2 * workers):
+                pending.append((page, request(page)))
+            while pending:
+                page, future = pending.popleft()
+                data = checkpoints.load(page) if future is None else future.result()
+                # Pages past a 404 are ignored, like the end of the data
+                if data is None:
+                    for _, future in pending:
+                        if future is not None:
+                            future.cancel()
+                    break
+                for page_after in itertools.islice(upcoming, 1):
+                    pending.append((page_after, request(page_after)))
+                yield data.get(items_key, [])
+        print(
+            f"Fetched {page_count} pages of {items_key} "
+            f"({len([page for page in staged if 1 < page <= page_count])} "
+            "from staging)"
+        )
+
+    if checkpoints is not None:
+        checkpoints.clear()
+
+
+def fetch_hevy_pages(
+    endpoint: str,
+    items_key: str,
+    page_size: int = HEVY_PAGE_SIZE,
+    max_workers: int = HEVY_FETCH_WORKERS,
+    client: Optional[HevyClient] = None,
+    params: Optional[Dict[str, Any]] = None,
+    checkpoint_dir: Optional[Path] = None,
+) -> List[Dict[str, Any]]:
+    """Fetch every page of a paginated Hevy endpoint (see iter_hevy_pages)."""
+    items = []
+    for page_items in iter_hevy_pages(
+        endpoint,
+        items_key,
+        page_size,
+        max_workers,
+        client,
+        params,
+        checkpoint_dir,
+    ):
+        items.extend(page_items)
+    return items
+
+
+def fetch_hevy_exercises(
+    max_workers: int = HEVY_FETCH_WORKERS,
+    client: Optional[HevyClient] = None,
+    checkpoint_dir: Optional[Path] = None,
+) -> List[Dict[str, Any]]:
     """Fetch exercise templates from Hevy API."""
-    api_key = load_api_key()
-    base_url = "https://api.hevyapp.com/v1/exercise_templates"
-    headers = {"Accept": "application/json", "api-key": api_key}
-    all_exercises = []
-    page = 1
-    per_page = 10
-    while True:
-        params = {"page": page, "pageSize": per_page}
-        response = requests.get(base_url, headers=headers, params=params)
-
-        # Handle 404nd of data (common for paginated APIs)
-        if response.status_code == 404:
-            print(f"Reached end of data at page {page}")
-            break
-
-        response.raise_for_status()
-        data = response.json()
-        exercises = data.get("exercise_templates", [])
-        if not exercises:
-            break
-        all_exercises.extend(exercises)
-        if len(exercises) < per_page:
-            break
-        page += 1
-    return all_exercises
-
-
-def fetch_hevy_workouts() -> Optional[pd.DataFrame]:
+    return fetch_hevy_pages(
+        "exercise_templates",
+        "exercise_templates",
+        max_workers=max_workers,
+        client=client,
+        checkpoint_dir=checkpoint_dir,
+    )
+
+
+def iter_workout_batches(
+    pages: Iterable[List[Dict[str, Any]]], batch_rows: int = HEVY_BATCH_ROWS
+) -> Iterator[pd.DataFrame]:
+    """
+    Flatten pages of workouts into DataFrames of ``batch_rows`` set rows.
+
+    Only one batch of rows is held at a time, so memory does not grow with
+    the workout history; the last batch holds the remaining rows.
+    """
+    # A workout logged while the pages are fetched shifts later ones onto
+    # the next page, so two pages can list the same workout
+    seen = set()
+    rows = []
+    for workouts in pages:
+        new_workouts = [workout for workout in workouts if workout["id"] not in seen]
+        seen.update(workout["id"] for workout in new_workouts)
+        rows.extend(flatten_workouts(new_workouts))
+
+        while len(rows) >= batch_rows:
+            batch, rows = rows[:batch_rows], rows[batch_rows:]
+            yield workout_batch(batch)
+
+    if rows:
+        yield workout_batch(rows)
+
+
+def workout_batch(rows: List[Dict[str, Any]]) -> pd.DataFrame:
+    """Build a batch of set rows with local times and the export's columns."""
+    return localize_workout_times(pd.DataFrame(rows, columns=HEVY_WORKOUT_COLUMNS))
+
+
+def write_workout_batches(batches: Iterable[pd.DataFrame], output_file: Path) -> int:
+    """
+    Write batches of set rows to CSV or Parquet as they are produced.
+
+    A CSV file is appended to batch by batch, so it can be read while the
+    export runs; a Parquet file gets one row group per batch and is complete
+    once closed. Without any rows, no file is left behind.
+
+    Returns:
+        Number of rows written
+    """
+    output_file = Path(output_file)
+    parquet = output_file.suffix == ".parquet"
+    writer = None
+    rows = 0
+
+    try:
+        for batch in batches:
+            if parquet:
+                table = pa.Table.from_pandas(
+                    batch, schema=HEVY_WORKOUT_SCHEMA, preserve_index=False
+                )
+                if writer is None:
+                    writer = pq.ParquetWriter(output_file, HEVY_WORKOUT_SCHEMA)
+                writer.write_table(table)
+            else:
+                batch.to_csv(
+                    output_file, mode="a" if rows else "w", header=not rows, index=False
+                )
+            rows += len(batch)
+    finally:
+        if writer is not None:
+            writer.close()
+
+    if rows == 0 and output_file.exists():
+        output_file.unlink()
+    return rows
+
+
+def read_workouts_file(workouts_file: Path) -> pd.DataFrame:
+    """Read an exported workouts file written by write_workout_batches."""
+    if Path(workouts_file).suffix == ".parquet":
+        return pd.read_parquet(workouts_file)
+    return pd.read_csv(workouts_file, dtype={"workout_id": str})
+
+
+def export_hevy_workouts(
+    output_file: Path,
+    max_workers: int = HEVY_FETCH_WORKERS,
+    client: Optional[HevyClient] = None,
+    checkpoint_dir: Optional[Path] = None,
+    batch_rows: int = HEVY_BATCH_ROWS,
+) -> int:
+    """Stream all workouts from Hevy API into a CSV or Parquet file."""
+    pages = iter_hevy_pages(
+        "workouts",
+        "workouts",
+        max_workers=max_workers,
+        client=client,
+        checkpoint_dir=checkpoint_dir,
+    )
+    return write_workout_batches(iter_workout_batches(pages, batch_rows), output_file)
+
+
+def fetch_hevy_workouts(
+    max_workers: int = HEVY_FETCH_WORKERS,
+    client: Optional[HevyClient] = None,
+    checkpoint_dir: Optional[Path] = None,
+) -> Optional[pd.DataFrame]:
     """Fetch workout data from Hevy API and return as DataFrame."""
-    api_key = load_api_key()
-    base_url = "https://api.hevyapp.com/v1/workouts"
-    headers = {"Accept": "application/json", "api-key": api_key}
-    all_workouts = []
-    page = 1
-    per_page = 10
-    while True:
-        params = {"page": page, "pageSize": per_page}
-        response = requests.get(base_url, headers=headers, params=params)
-
-        # Handle 404 error for end of data (common for paginated APIs)
-        if response.status_code == 404:
-            print(f"Reached end of data at page {page}")
-            break
-
-        response.raise_for_status()
-        data = response.json()
-        workouts = data.get("workouts", [])
-        if not workouts:
-            break
-        for workout in workouts:
-            workout_id = workout["id"]
-            workout_title = workout["title"]
-            workout_description = workout["description"]
-            start_time_utc = pd.to_datetime(workout["start_time"])
-            end_time_utc = pd.to_datetime(workout["end_time"])
-            offset_hours = get_timezone_offset_hours()
-            start_time_local = start_time_utc - pd.Timedelta(hours=offset_hours)
-            end_time_local = end_time_utc - pd.Timedelta(hours=offset_hours)
-            for exercise in workout["exercises"]:
-                exercise_data = {
-                    "workout_id": workout_id,
-                    "title": workout_title,
-                    "description": workout_description,
-                    "start_time": start_time_local.strftime("%Y-%m-%dT%H:%M:%S"),
-                    "end_time": end_time_local.strftime("%Y-%m-%dT%H:%M:%S"),
-                    "exercise_title": exercise["title"],
-                    "exercise_notes": exercise["notes"],
-                    "exercise_template_id": exercise["exercise_template_id"],
-                    "superset_id": exercise.get("supersets_id", 0),
-                    "set_index": exercise["index"],
-                }
-                for set_data in exercise["sets"]:
-                    set_row = exercise_data.copy()
-                    set_row.update(
-                        {
-                            "set_index": set_data["index"],
-                            "set_type": set_data["type"],
-                            "weight_lbs": (
-                                set_data["weight_kg"] * 2.20462
-                                if set_data["weight_kg"]
-                                else None
-                            ),
-                            "reps": set_data["reps"],
-                            "distance_miles": (
-                                set_data["distance_meters"] * 0.000621371
-                                if set_data["distance_meters"]
-                                else None
-                            ),
-                            "duration_seconds": set_data["duration_seconds"],
-                            "rpe": set_data["rpe"],
-                        }
-                    )
-                    all_workouts.append(set_row)
-        if len(workouts) < per_page:
-            break
-        page += 1
-    if not all_workouts:
+    pages = iter_hevy_pages(
+        "workouts",
+        "workouts",
+        max_workers=max_workers,
+        client=client,
+        checkpoint_dir=checkpoint_dir,
+    )
+    batches = list(iter_workout_batches(pages))
+    if not batches:
         return None
-    return pd.DataFrame(all_workouts)
+    return pd.concat(batches, ignore_index=True)
 
 
-def main():
-    """Export Hevy exercises and workouts to data/raw_data/hevy/"""
-    output_dir = Path("data/raw_data/hevy")
-    output_dir.mkdir(parents=True, exist_ok=True)
-    # Export exercises
-    print("Fetching Hevy exercises...")
-    exercises = fetch_hevy_exercises()
-    exercises_file = output_dir / "hevy_exercises.json"
-    with open(exercises_file, "w", encoding="utf-8") as f:
-        json.dump(exercises, f, indent=2, ensure_ascii=False)
-    print(f"Saved {len(exercises)} exercises to {exercises_file}")
-    # Export workouts
-    print("Fetching Hevy workouts...")
-    workouts_df = fetch_hevy_workouts()
+def flatten_workouts(workouts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Flatten Hevy workouts into one row per set."""
+    all_workouts = []
+    for workout in workouts:
+        workout_id = workout["id"]
+        workout_title = workout["title"]
+        workout_description = workout["description"]
+        for exercise in workout["exercises"]:
+            exercise_data = {
+                "workout_id": workout_id,
+                "title": workout_title,
+                "description": workout_description,
+                # Converted to local time for all rows at once below
+                "start_time": workout["start_time"],
+                "end_time": workout["end_time"],
+                "exercise_title": exercise["title"],
+                "exercise_notes": exercise["notes"],
+                "exercise_template_id": exercise["exercise_template_id"],
+                "superset_id": exercise.get("supersets_id", 0),
+                "set_index": exercise["index"],
+            }
+            for set_data in exercise["sets"]:
+                set_row = exercise_data.copy()
+                set_row.update(
+                    {
+                        "set_index": set_data["index"],
+                        "set_type": set_data["type"],
+                        "weight_lbs": (
+                            set_data["weight_kg"] * 2.20462
+                            if set_data["weight_kg"]
+                            else None
+                        ),
+                        "reps": set_data["reps"],
+                        "distance_miles": (
+                            set_data["distance_meters"] * 0.000621371
+                            if set_data["distance_meters"]
+                            else None
+                        ),
+                        "duration_seconds": set_data["duration_seconds"],
+                        "rpe": set_data["rpe"],
+                    }
+                )
+                all_workouts.append(set_row)
+    return all_workouts
+
+
+def localize_workout_times(df: pd.DataFrame) -> pd.DataFrame:
+    """Convert the UTC start and end times of all rows to local time strings."""
+    offset = pd.Timedelta(hours=get_timezone_offset_hours())
+    for column in ("start_time", "end_time"):
+        _, utc = parse_hevy_timestamps(df[column])
+        local = utc.dt.tz_localize(None) - offset
+        df[column] = local.dt.strftime("%Y-%m-%dT%H:%M:%S")
+    return df
+
+
+def fetch_hevy_workout_events(
+    since: str,
+    max_workers: int = HEVY_FETCH_WORKERS,
+    client: Optional[HevyClient] = None,
+    checkpoint_dir: Optional[Path] = None,
+) -> List[Dict[str, Any]]:
+    """Fetch workout update and delete events since an ISO 8601 time."""
+    return fetch_hevy_pages(
+        "workouts/events",
+        "events",
+        max_workers=max_workers,
+        client=client,
+        params={"since": since},
+        checkpoint_dir=checkpoint_dir,
+    )
+
+
+def event_time(event: Dict[str, Any]) -> pd.Timestamp:
+    """Time a workout event happened, for applying events in order."""
+    if event["type"] == "deleted":
+        value = event.get("deleted_at")
+    else:
+        value = event["workout"].get("updated_at")
+    return pd.Timestamp(value) if value else pd.Timestamp(0, tz="UTC")
+
+
+def apply_workout_events(
+    workouts_df: Optional[pd.DataFrame], events: List[Dict[str, Any]]
+) -> Optional[pd.DataFrame]:
+    """
+    Apply workout events to exported workout rows.
+
+    Every workout with an event is replaced by its latest version, or removed
+    when its latest event is a delete. Rows are kept newest workout first,
+    like a full export.
+
+    Args:
+        workouts_df: Stored rows of the workouts export, or None
+        events: Events from fetch_hevy_workout_events
+
+    Returns:
+        Updated rows, or None when no workouts are left
+    """
+    latest = {}
+    for event in sorted(events, key=event_time):
+        if event["type"] == "deleted":
+            latest[str(event["id"])] = None
+        else:
+            latest[str(event["workout"]["id"])] = event["workout"]
+
+    updated = [workout for workout in latest.values() if workout is not None]
+    print(
+        f"Applying {len(updated)} updated and {len(latest) - len(updated)} "
+        "deleted workouts"
+    )
+
+    frames = []
     if workouts_df is not None:
-        workouts_file = output_dir / "hevy_workouts.csv"
-        workouts_df.to_csv(workouts_file, index=False)
-        print(f"Saved {len(workouts_df)} workout records to {workouts_file}")
+        changed = workouts_df["workout_id"].astype(str).isin(latest.keys())
+        frames.append(workouts_df[~changed])
+    rows = flatten_workouts(updated)
+    if rows:
+        frames.append(localize_workout_times(pd.DataFrame(rows)))
+
+    frames = [frame for frame in frames if not frame.empty]
+    if not frames:
+        return None
+    combined = pd.concat(frames, ignore_index=True)
+    return combined.sort_values(
+        "start_time", ascending=False, kind="stable"
+    ).reset_index(drop=True)
+
+
+def load_sync_state(state_file: Path) -> Optional[str]:
+    """Time of the last workout sync, or None before the first one."""
+    if not state_file.exists():
+        return None
+    with open(state_file, encoding="utf-8") as f:
+        return json.load(f).get("last_sync")
+
+
+def save_sync_state(state_file: Path, last_sync: str) -> None:
+    """Record the time a workout sync started."""
+    with open(state_file, "w", encoding="utf-8") as f:
+        json.dump({"last_sync": last_sync}, f, indent=2)
+
+
+def sync_hevy_workouts(
+    output_dir: Path,
+    client: HevyClient,
+    max_workers: int = HEVY_FETCH_WORKERS,
+    incremental: bool = False,
+    checkpoint_dir: Optional[Path] = None,
+    file_format: str = "csv",
+) -> int:
+    """
+    Export workouts to output_dir/hevy_workouts.csv (or .parquet).
+
+    In incremental mode, only the events since the last sync are applied to
+    the stored export; without a previous sync, all workouts are fetched
+    and written in batches as their pages arrive.
+    The sync time is taken before fetching, less HEVY_SYNC_OVERLAP, so
+    changes made while a sync runs are picked up again by the next one.
+    Pages are staged in ``checkpoint_dir`` so an interrupted sync resumes;
+    a resumed export is only as recent as the run that staged its pages,
+    so its sync time is when that run started.
+
+    Returns:
+        Number of workout set rows exported
+    """
+    workouts_file = output_dir / f"hevy_workouts.{file_format}"
+    state_file = output_dir / HEVY_SYNC_STATE_FILE
+    sync_started = datetime.now(timezone.utc)
+
+    since = load_sync_state(state_file) if incremental else None
+    if since is not None and workouts_file.exists():
+        print(f"Fetching Hevy workout events since {since}...")
+        events = fetch_hevy_workout_events(
+            since, max_workers=max_workers, client=client, checkpoint_dir=checkpoint_dir
+        )
+        workouts_df = apply_workout_events(read_workouts_file(workouts_file), events)
+        batches = [] if workouts_df is None else [workouts_df]
+        rows = write_workout_batches(batches, workouts_file)
+    else:
+        print("Fetching Hevy workouts...")
+        # A partly written export must not pass for a completed sync
+        if state_file.exists():
+            state_file.unlink()
+        # Resumed pages are as old as the fetch that staged them, so later
+        # syncs must apply the changes made since then
+        if checkpoint_dir is not None:
+            staged = page_checkpoints(checkpoint_dir, "workouts", "workouts")
+            staged_started = staged.started()
+            if staged_started is not None:
+                sync_started = min(sync_started, staged_started)
+        rows = export_hevy_workouts(
+            workouts_file,
+            max_workers=max_workers,
+            client=client,
+            checkpoint_dir=checkpoint_dir,
+        )
+
+    if rows:
+        print(f"Saved {rows} workout records to {workouts_file}")
     else:
         print("No workout data found.")
 
+    last_sync = sync_started - HEVY_SYNC_OVERLAP
+    save_sync_state(state_file, last_sync.strftime("%Y-%m-%dT%H:%M:%SZ"))
+    return rows
+
+
+def main(
+    max_workers: int = HEVY_FETCH_WORKERS,
+    incremental: bool = False,
+    output_dir: Path = Path("data/raw_data/hevy"),
+    base_url: str = HEVY_API_URL,
+    file_format: str = "csv",
+):
+    """Export Hevy exercises and workouts to data/raw_data/hevy/"""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    # Completed pages are kept here until an export finishes
+    checkpoint_dir = output_dir / HEVY_STAGING_DIR
+    # Both exports share one pooled, rate-limited client
+    with create_hevy_client(max_workers, base_url) as client:
+        # Export exercises
+        print("Fetching Hevy exercises...")
+        exercises = fetch_hevy_exercises(
+            max_workers=max_workers, client=client, checkpoint_dir=checkpoint_dir
+        )
+        exercises_file = output_dir / "hevy_exercises.json"
+        with open(exercises_file, "w", encoding="utf-8") as f:
+            json.dump(exercises, f, indent=2, ensure_ascii=False)
+        print(f"Saved {len(exercises)} exercises to {exercises_file}")
+        # Export workouts
+        sync_hevy_workouts(
+            output_dir, client, max_workers, incremental, checkpoint_dir, file_format
+        )
+
+        stats = client.stats
+        print(
+            f"Hevy API: {stats['requests']} requests, {stats['retries']} retries, "
+            f"{stats['throttled']} rate limited"
+        )
+
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Export Hevy exercises and workouts")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=HEVY_FETCH_WORKERS,
+        help=f"Pages fetched concurrently (default: {HEVY_FETCH_WORKERS})",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only apply workouts changed since the last sync",
+    )
+    parser.add_argument(
+        "--format",
+        choices=["csv", "parquet"],
+        default="csv",
+        help="File format of the workout export (default: csv)",
+    )
+    args = parser.parse_args()
+
+    main(
+        max_workers=args.workers,
+        incremental=args.incremental,
+        file_format=args.format,
+    )
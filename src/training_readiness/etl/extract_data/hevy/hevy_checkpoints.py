@@ -0,0 +1,173 @@
+"""
+hevy_checkpoints.py
+
+Staging area for pages of a paginated Hevy endpoint, so an interrupted
+fetch resumes without downloading the pages it already has.
+- Each completed page is written to <staging>/<endpoint>/page_<n>.json
+  (atomically, so a crash never leaves a partial page behind)
+- manifest.json records the query and page count the pages belong to;
+  pages of a different query, an older page count or older than
+  HEVY_CHECKPOINT_MAX_AGE are discarded instead of resumed
+- Adding or deleting an item shifts every later page without changing the
+  page count, so staged pages are also discarded when the fresh first page
+  or a fresh copy of the last staged page lists other items than the staged
+  one; any item added or deleted above the last staged page moves its items
+- The staging directory is removed once the whole endpoint is fetched
+"""
+
+import json
+import os
+import shutil
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set
+
+# Staged pages older than this are fetched again, as the data has moved on
+HEVY_CHECKPOINT_MAX_AGE = timedelta(days=1)
+
+MANIFEST_FILE = "manifest.json"
+
+
+def item_key(item: Dict[str, Any]) -> str:
+    """Identity of a listed item: its id, or its content when it has none"""
+    if "id" in item:
+        return str(item["id"])
+    return json.dumps(item, sort_keys=True)
+
+
+def write_json_atomic(path: Path, data: Any) -> None:
+    """Write JSON to a temporary file and move it into place."""
+    temp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(temp_path, path)
+
+
+class PageCheckpoints:
+    """
+    Completed pages of one paginated query, staged on disk.
+
+    Args:
+        staging_dir: Directory holding the staged pages of all endpoints
+        endpoint: Endpoint the pages belong to (e.g. "workouts")
+        items_key: Key the items are listed under in each page
+        query: Query parameters identifying the fetch, including page size
+    """
+
+    def __init__(
+        self, staging_dir: Path, endpoint: str, items_key: str, query: Dict[str, Any]
+    ):
+        self.directory = Path(staging_dir) / endpoint.replace("/", "_")
+        self.items_key = items_key
+        self.query = query
+
+    def page_path(self, page: int) -> Path:
+        return self.directory / f"page_{page:05d}.json"
+
+    def start(
+        self,
+        page_count: Optional[int],
+        first_page: Dict[str, Any],
+        fetch_page: Callable[[int], Optional[Dict[str, Any]]],
+    ) -> Set[int]:
+        """
+        Resume the staged pages of this query, or start over.
+
+        Args:
+            page_count: Page count reported by the API for this fetch
+            first_page: First page as just fetched from the API
+            fetch_page: Fetches a fresh copy of a page, to check that the
+                last staged page has not moved
+
+        Returns:
+            Numbers of the staged pages valid for this fetch, to be read
+            with load() when their turn comes
+        """
+        manifest = self.read_manifest()
+        if (
+            manifest is None
+            or not self.resumable(manifest, page_count, first_page)
+            or not self.aligned(fetch_page)
+        ):
+            self.clear()
+            self.directory.mkdir(parents=True, exist_ok=True)
+            write_json_atomic(
+                self.directory / MANIFEST_FILE,
+                {
+                    "query": self.query,
+                    "page_count": page_count,
+                    "started": datetime.now(timezone.utc).isoformat(),
+                },
+            )
+            return set()
+
+        pages = {
+            int(path.stem.split("_")[1]) for path in self.directory.glob("page_*.json")
+        }
+        if pages:
+            print(f"Resuming from {len(pages)} staged pages in {self.directory}")
+        return pages
+
+    def load(self, page: int) -> Dict[str, Any]:
+        """Read a staged page."""
+        with open(self.page_path(page), encoding="utf-8") as f:
+            return json.load(f)
+
+    def read_manifest(self) -> Optional[Dict[str, Any]]:
+        path = self.directory / MANIFEST_FILE
+        if not path.exists():
+            return None
+        try:
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+        except ValueError:
+            return None
+
+    def resumable(
+        self,
+        manifest: Dict[str, Any],
+        page_count: Optional[int],
+        first_page: Dict[str, Any],
+    ) -> bool:
+        """Whether staged pages still line up with the current fetch."""
+        started = datetime.fromisoformat(manifest["started"])
+        if not (
+            manifest.get("query") == self.query
+            and manifest.get("page_count") == page_count
+            and datetime.now(timezone.utc) - started < HEVY_CHECKPOINT_MAX_AGE
+            and self.page_path(1).exists()
+        ):
+            return False
+
+        # New items at the top shift every page below them
+        return self.keys(self.load(1)) == self.keys(first_page)
+
+    def aligned(self, fetch_page: Callable[[int], Optional[Dict[str, Any]]]) -> bool:
+        """Whether the last staged page still lists the same items."""
+        pages = [int(path.stem.split("_")[1]) for path in self.directory.glob("page_*")]
+        last = max((page for page in pages if page > 1), default=None)
+        if last is None:
+            return True
+
+        # Items added or deleted anywhere above it shift the last staged page
+        staged = self.load(last)
+        fresh = fetch_page(last)
+        return fresh is not None and self.keys(fresh) == self.keys(staged)
+
+    def keys(self, data: Dict[str, Any]) -> List[str]:
+        return [item_key(item) for item in data.get(self.items_key, [])]
+
+    def started(self) -> Optional[datetime]:
+        """When the staged fetch started, or None without staged pages."""
+        manifest = self.read_manifest()
+        if manifest is None:
+            return None
+        return datetime.fromisoformat(manifest["started"])
+
+    def save(self, page: int, data: Dict[str, Any]) -> None:
+        """Commit a completed page."""
+        write_json_atomic(self.page_path(page), data)
+
+    def clear(self) -> None:
+        """Remove all staged pages of this query."""
+        shutil.rmtree(self.directory, ignore_errors=True)
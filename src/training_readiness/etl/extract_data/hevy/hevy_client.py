@@ -0,0 +1,205 @@
+"""
+hevy_client.py
+
+Shared HTTP client for the Hevy API.
+- One requests.Session, so connections are kept alive and pooled across pages
+- Retries 429 and 5xx responses and connection errors with exponential
+  backoff, waiting for Retry-After when the API sends it
+- A token bucket keeps the request rate under HEVY_REQUESTS_PER_SECOND for
+  all threads sharing the client
+- Counts requests, retries and throttled responses (see HevyClient.stats)
+"""
+
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+HEVY_API_URL = "https://api.hevyapp.com/v1"
+
+# Steady request rate and burst size of the token bucket
+HEVY_REQUESTS_PER_SECOND = 5.0
+HEVY_REQUEST_BURST = 10
+
+# Retries of a request after the first attempt, and the first backoff delay
+HEVY_MAX_RETRIES = 5
+HEVY_BACKOFF_SECONDS = 0.5
+HEVY_MAX_BACKOFF_SECONDS = 60.0
+
+HEVY_TIMEOUT_SECONDS = 30
+
+# Responses worth retrying: rate limited or a transient server error
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+
+class TokenBucket:
+    """Thread-safe token bucket; acquire() blocks until a token is free."""
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: int,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.clock = clock
+        self.sleep = sleep
+        self.updated = clock()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Take a token, waiting for one if needed; returns the time waited."""
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = self.clock()
+                self.tokens = min(
+                    self.capacity, self.tokens + (now - self.updated) * self.rate
+                )
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                wait = (1 - self.tokens) / self.rate
+            self.sleep(wait)
+            waited += wait
+
+
+def retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (seconds or an HTTP date)."""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+class HevyClient:
+    """
+    Pooled, rate-limited and retrying GET client for the Hevy API.
+
+    Args:
+        api_key: Hevy API key sent with every request
+        base_url: API root that endpoints are relative to
+        pool_size: Connections kept open, at least the number of fetch threads
+        rate: Steady requests per second across all threads
+        burst: Requests allowed at once before the rate applies
+        max_retries: Retries of a failing request before giving up
+        backoff: First backoff delay in seconds; doubled on each retry
+        timeout: Seconds to wait for a response
+        session: Session to use instead of a new requests.Session
+        sleep: Function used to wait, replaceable in tests
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str = HEVY_API_URL,
+        pool_size: int = 10,
+        rate: float = HEVY_REQUESTS_PER_SECOND,
+        burst: int = HEVY_REQUEST_BURST,
+        max_retries: int = HEVY_MAX_RETRIES,
+        backoff: float = HEVY_BACKOFF_SECONDS,
+        timeout: float = HEVY_TIMEOUT_SECONDS,
+        session: Optional[requests.Session] = None,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+        session.headers.update({"Accept": "application/json", "api-key": api_key})
+
+        self.session = session
+        self.base_url = base_url.rstrip("/")
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.sleep = sleep
+        self.bucket = TokenBucket(rate, burst, sleep=sleep)
+        self.counters = {
+            "requests": 0,
+            "responses": 0,
+            "retries": 0,
+            "throttled": 0,
+            "errors": 0,
+            "wait_seconds": 0.0,
+        }
+        self.counters_lock = threading.Lock()
+
+    def count(self, name: str, amount: float = 1) -> None:
+        """Add to one of the client's counters."""
+        with self.counters_lock:
+            self.counters[name] += amount
+
+    @property
+    def stats(self) -> Dict[str, float]:
+        """Snapshot of the request, retry and throttling counters."""
+        with self.counters_lock:
+            return dict(self.counters)
+
+    def backoff_seconds(self, attempt: int, retry_after: Optional[float]) -> float:
+        """Delay before retry number ``attempt`` (0-based)."""
+        if retry_after is not None:
+            return retry_after
+        return min(self.backoff * 2**attempt, HEVY_MAX_BACKOFF_SECONDS)
+
+    def get(self, url: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        """
+        GET a URL, retrying transient failures.
+
+        Returns:
+            The final response; 429/5xx are only returned once retries are
+            exhausted, and other statuses are returned as they are
+        """
+        attempt = 0
+        while True:
+            self.count("wait_seconds", self.bucket.acquire())
+            self.count("requests")
+            try:
+                response = self.session.get(url, params=params, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                self.count("errors")
+                if attempt >= self.max_retries:
+                    raise
+                retry_after = None
+            else:
+                self.count("responses")
+                if (
+                    response.status_code not in RETRY_STATUS_CODES
+                    or attempt >= self.max_retries
+                ):
+                    return response
+                if response.status_code == 429:
+                    self.count("throttled")
+                retry_after = retry_after_seconds(response.headers.get("Retry-After"))
+
+            delay = self.backoff_seconds(attempt, retry_after)
+            self.count("retries")
+            self.count("wait_seconds", delay)
+            self.sleep(delay)
+            attempt += 1
+
+    def close(self) -> None:
+        """Close the pooled connections."""
+        self.session.close()
+
+    def __enter__(self) -> "HevyClient":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
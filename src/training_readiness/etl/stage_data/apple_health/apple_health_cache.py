@@ -0,0 +1,162 @@
+"""
+Apple Health Cache
+
+Columnar cache of the rows extracted from an Apple Health export.
+
+Extracted rows are written to Parquet, one file per record type, under a
+directory named after the export's content hash. Re-running over the same
+export (for example while iterating on process_sleep_data) loads the cached
+columns instead of parsing the XML again. A new export has a new hash, so
+stale results are never reused.
+
+Layout:
+    <cache_dir>/<export hash>/<record type>.parquet
+"""
+
+import hashlib
+import os
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import pandas as pd
+
+from training_readiness.etl.stage_data.apple_health.apple_health_parser import (
+    extract_records,
+)
+from training_readiness.etl.timestamps import (
+    parse_apple_health_timestamp,
+    parse_apple_health_timestamps,
+)
+
+# Bump when collectors change the shape of the rows they produce
+CACHE_VERSION = "2"
+
+HASH_BLOCK_SIZE = 4 * 1024 * 1024
+
+
+def hash_export(path: str) -> str:
+    """
+    Hash the content of an export file.
+
+    Args:
+        path: Path to export.xml or export.zip
+
+    Returns:
+        Hex digest identifying the export content
+    """
+    digest = hashlib.sha256(CACHE_VERSION.encode())
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def cache_file(cache_dir: str, export_hash: str, record_type: str) -> str:
+    """Path of the cached rows of one record type"""
+    return os.path.join(cache_dir, export_hash, f"{record_type}.parquet")
+
+
+def load_cached_records(
+    cache_dir: str, export_hash: str, record_types: Iterable[str]
+) -> Optional[Dict[str, pd.DataFrame]]:
+    """
+    Load cached rows for every requested record type.
+
+    Args:
+        cache_dir: Root directory of the cache
+        export_hash: Content hash from hash_export
+        record_types: Record types that must all be cached
+
+    Returns:
+        Mapping of record type to DataFrame, or None if any type is missing
+    """
+    paths = {
+        record_type: cache_file(cache_dir, export_hash, record_type)
+        for record_type in record_types
+    }
+    if not all(os.path.exists(path) for path in paths.values()):
+        return None
+
+    return {record_type: pd.read_parquet(path) for record_type, path in paths.items()}
+
+
+def save_cached_records(
+    cache_dir: str, export_hash: str, results: Dict[str, List[Dict[str, Any]]]
+) -> Dict[str, pd.DataFrame]:
+    """
+    Write extracted rows to the cache.
+
+    Args:
+        cache_dir: Root directory of the cache
+        export_hash: Content hash from hash_export
+        results: Mapping of record type to extracted rows
+
+    Returns:
+        Mapping of record type to the cached DataFrame
+    """
+    os.makedirs(os.path.join(cache_dir, export_hash), exist_ok=True)
+
+    frames = {}
+    for record_type, rows in results.items():
+        df = pd.DataFrame(rows)
+        path = cache_file(cache_dir, export_hash, record_type)
+        # Write then rename so an interrupted run never leaves a partial file
+        df.to_parquet(f"{path}.tmp", index=False)
+        os.replace(f"{path}.tmp", path)
+        frames[record_type] = df
+
+    return frames
+
+
+def apply_high_water_marks(
+    results: Dict[str, pd.DataFrame], since: Optional[Dict[str, str]]
+) -> Dict[str, pd.DataFrame]:
+    """Drop cached rows that start before their record type's high-water mark"""
+    filtered = dict(results)
+
+    for record_type, mark in (since or {}).items():
+        df = filtered.get(record_type)
+        if not mark or df is None or df.empty:
+            continue
+        _, start = parse_apple_health_timestamps(df["start_date"])
+        keep = start >= parse_apple_health_timestamp(mark)
+        filtered[record_type] = df[keep].reset_index(drop=True)
+
+    return filtered
+
+
+def extract_records_cached(
+    source: str,
+    collectors: Dict[str, Callable[[Dict[str, str]], Optional[Dict]]],
+    cache_dir: str,
+    since: Optional[Dict[str, str]] = None,
+    extract: Callable[..., Dict[str, List[Dict[str, Any]]]] = extract_records,
+) -> Dict[str, pd.DataFrame]:
+    """
+    Extract record types from an export, reusing cached rows when available.
+
+    On a cache miss the full export is extracted with ``extract`` and cached,
+    so later runs can apply any high-water mark to the cached rows.
+
+    Args:
+        source: Path to export.xml or export.zip
+        collectors: Mapping of record type to collector function
+        cache_dir: Root directory of the cache
+        since: Optional mapping of record type to a high-water mark date
+        extract: Extraction function used on a cache miss
+
+    Returns:
+        Mapping of record type to a DataFrame of collected rows
+    """
+    export_hash = hash_export(source)
+
+    results = load_cached_records(cache_dir, export_hash, collectors)
+    if results is not None:
+        print(f"Loaded cached records for export {export_hash[:12]} from {cache_dir}")
+    else:
+        print(f"No cached records for export {export_hash[:12]} - parsing XML")
+        results = save_cached_records(
+            cache_dir, export_hash, extract(source, collectors)
+        )
+        print(f"Cached records for export {export_hash[:12]} in {cache_dir}")
+
+    return apply_high_water_marks(results, since)
@@ -0,0 +1,148 @@
+"""
+Apple Health Debug Trace
+
+Compact, bounded debug output for the Apple Health processors.
+
+With --debug a processor writes the records it worked on, with the columns
+needed to follow its grouping, as JSON Lines (one object per record) next to
+where it is run. Rows are selected with vectorized filters and written in
+chunks, so tracing a full export costs little more than processing it:
+- --debug-from / --debug-to keep records of a local date range
+- --debug-sample N keeps every Nth record
+- --debug-limit N caps the number of records written
+
+Example:
+    if debug:
+        write_debug_trace(df, "sleep_debug.jsonl", ["start_date", "session"], debug)
+"""
+
+import argparse
+from typing import Any, Dict, List, Optional, Union
+
+import pandas as pd
+
+# Records written when no limit is given
+DEBUG_TRACE_LIMIT = 100_000
+
+# Records converted to JSON at a time
+DEBUG_CHUNK_SIZE = 50_000
+
+
+def debug_options(
+    sample: int = 1,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    limit: Optional[int] = DEBUG_TRACE_LIMIT,
+) -> Dict[str, Any]:
+    """
+    Build the options of a debug trace.
+
+    Args:
+        sample: Keep every Nth selected record
+        start: First local date to trace (YYYY-MM-DD), inclusive
+        end: Last local date to trace (YYYY-MM-DD), inclusive
+        limit: Maximum number of records written; None for no limit
+
+    Returns:
+        Options to pass as a processor's ``debug`` argument
+    """
+    if sample < 1:
+        raise ValueError(f"Debug sample must be at least 1, got {sample}")
+    return {"sample": sample, "start": start, "end": end, "limit": limit}
+
+
+def select_debug_rows(
+    df: pd.DataFrame, date_column: str, options: Dict[str, Any]
+) -> pd.DataFrame:
+    """Apply the date range, sampling and limit of a debug trace"""
+    dates = df[date_column]
+    keep = pd.Series(True, index=df.index)
+    if options.get("start"):
+        keep &= dates >= pd.Timestamp(options["start"])
+    if options.get("end"):
+        keep &= dates < pd.Timestamp(options["end"]) + pd.Timedelta(days=1)
+
+    rows = df[keep.to_numpy()]
+    rows = rows.iloc[:: options.get("sample", 1)]
+    if options.get("limit") is not None:
+        rows = rows.iloc[: options["limit"]]
+    return rows
+
+
+def write_debug_trace(
+    df: pd.DataFrame,
+    path: str,
+    columns: List[str],
+    debug: Union[bool, Dict[str, Any]],
+    date_column: str = "date",
+) -> int:
+    """
+    Write the selected records of a processor as a JSON Lines trace.
+
+    Args:
+        df: Records as seen by the processor
+        path: Output file
+        columns: Columns to write; missing ones are skipped
+        debug: True for the default options, or options from debug_options
+        date_column: Local datetime column the date range applies to
+
+    Returns:
+        Number of records written
+    """
+    options = debug if isinstance(debug, dict) else debug_options()
+    rows = select_debug_rows(df, date_column, options)
+    rows = rows[[column for column in columns if column in rows]]
+
+    with open(path, "w") as f:
+        for start in range(0, len(rows), DEBUG_CHUNK_SIZE):
+            chunk = rows.iloc[start : start + DEBUG_CHUNK_SIZE]
+            # Each chunk ends with a newline, so chunks concatenate as lines
+            f.write(chunk.to_json(orient="records", lines=True, date_format="iso"))
+
+    print(f"Wrote {len(rows)} of {len(df)} records to debug trace: {path}")
+    return len(rows)
+
+
+def add_debug_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add --debug and the trace selection flags to a loader's parser"""
+    parser.add_argument(
+        "--debug",
+        action="store_true",
+        help="Write a JSON Lines trace of the processed records",
+    )
+    parser.add_argument(
+        "--debug-from",
+        metavar="YYYY-MM-DD",
+        help="Only trace records on or after this local date",
+    )
+    parser.add_argument(
+        "--debug-to",
+        metavar="YYYY-MM-DD",
+        help="Only trace records on or before this local date",
+    )
+    parser.add_argument(
+        "--debug-sample",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Only trace every Nth record (default: 1)",
+    )
+    parser.add_argument(
+        "--debug-limit",
+        type=int,
+        default=DEBUG_TRACE_LIMIT,
+        metavar="N",
+        help=f"Trace at most N records (default: {DEBUG_TRACE_LIMIT})",
+    )
+
+
+def debug_options_from_args(args: argparse.Namespace) -> Union[bool, Dict[str, Any]]:
+    """Options for the processors' ``debug`` argument, or False when off"""
+    if not args.debug:
+        return False
+    return debug_options(
+        sample=args.debug_sample,
+        start=args.debug_from,
+        end=args.debug_to,
+        limit=args.debug_limit,
+    )
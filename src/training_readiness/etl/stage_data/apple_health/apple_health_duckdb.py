@@ -0,0 +1,120 @@
+"""
+Apple Health DuckDB Output
+
+Upserts processed Apple Health results into typed tables of the project's
+DuckDB database, as an alternative to timestamped CSV files.
+
+Each metric describes its table with a spec:
+
+    SLEEP_ANALYSIS_TABLE = {
+        "table": "apple_sleep_sessions",
+        "key": "sleep_start",
+        "columns": {"Sleep_Start": ("sleep_start", "TIMESTAMP"), ...},
+    }
+
+``columns`` maps the analysis output columns to table columns and their SQL
+types, and ``key`` is the table's primary key. Output dates are parsed once,
+with the format the processors write them in, and the whole frame is
+inserted in one statement; rows whose key already exists are replaced, so
+re-runs and incremental runs leave a single deduplicated table.
+
+Example:
+    upsert_analysis(DATABASE_PATH, process_sleep_data(rows), SLEEP_ANALYSIS_TABLE)
+"""
+
+import os
+from typing import Any, Dict
+
+import duckdb
+import pandas as pd
+
+# The database shared with the TrainingPeaks staging scripts
+DATABASE_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "training_readiness.duckdb"
+)
+
+# Formats the processors write dates and times in
+ANALYSIS_DATE_FORMAT = "%m/%d/%Y"
+ANALYSIS_TIMESTAMP_FORMAT = "%m/%d/%Y %H:%M:%S"
+
+# Name the incoming frame is registered under while it is inserted
+INCOMING_VIEW = "incoming_analysis"
+
+
+def typed_analysis(data: Any, table: Dict[str, Any]) -> pd.DataFrame:
+    """
+    Convert analysis output into a frame with the table's names and types.
+
+    Args:
+        data: Analysis DataFrame (or list of row dicts) from a processor
+        table: Table spec of the metric
+
+    Returns:
+        DataFrame with one column per output column present in ``data``,
+        deduplicated on the key (last row wins)
+    """
+    data = pd.DataFrame(data)
+    typed = {}
+
+    for column, (name, sql_type) in table["columns"].items():
+        if column not in data:
+            continue
+
+        values = data[column]
+        if sql_type == "DATE":
+            typed[name] = pd.to_datetime(values, format=ANALYSIS_DATE_FORMAT).dt.date
+        elif sql_type == "TIMESTAMP":
+            typed[name] = pd.to_datetime(values, format=ANALYSIS_TIMESTAMP_FORMAT)
+        elif sql_type in ("INTEGER", "BIGINT"):
+            typed[name] = pd.to_numeric(values).astype("Int64")
+        elif sql_type == "DOUBLE":
+            typed[name] = pd.to_numeric(values).astype("float64")
+        else:
+            typed[name] = values.astype("string")
+
+    typed = pd.DataFrame(typed, index=data.index)
+    return typed.drop_duplicates(table["key"], keep="last").reset_index(drop=True)
+
+
+def create_analysis_table(con: Any, table: Dict[str, Any]) -> None:
+    """Create the metric's table if it does not exist yet"""
+    columns = ",\n    ".join(
+        f"{name} {sql_type}" for name, sql_type in table["columns"].values()
+    )
+    con.execute(
+        f"CREATE TABLE IF NOT EXISTS {table['table']} (\n"
+        f"    {columns},\n"
+        f"    PRIMARY KEY ({table['key']})\n"
+        ")"
+    )
+
+
+def upsert_analysis(database: str, data: Any, table: Dict[str, Any]) -> int:
+    """
+    Insert analysis output into its DuckDB table, replacing rows by key.
+
+    Args:
+        database: Path to the DuckDB database file
+        data: Analysis DataFrame (or list of row dicts) from a processor
+        table: Table spec of the metric
+
+    Returns:
+        Number of rows in the table afterwards
+    """
+    typed = typed_analysis(data, table)
+    print(f"Upserting {len(typed)} rows into {table['table']} in: {database}")
+
+    with duckdb.connect(database) as con:
+        create_analysis_table(con, table)
+        con.register(INCOMING_VIEW, typed)
+        try:
+            con.execute(
+                f"INSERT OR REPLACE INTO {table['table']} BY NAME "
+                f"SELECT * FROM {INCOMING_VIEW}"
+            )
+        finally:
+            con.unregister(INCOMING_VIEW)
+        (count,) = con.execute(f"SELECT count(*) FROM {table['table']}").fetchone()
+
+    print(f"Table {table['table']} now holds {count} rows")
+    return count
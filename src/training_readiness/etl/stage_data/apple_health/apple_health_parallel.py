@@ -0,0 +1,211 @@
+"""
+Apple Health Parallel Parser
+
+Parses an unpacked export.xml on a process pool.
+
+The file is split into byte ranges that each start at a top-level
+``<Record`` element. Every range is parsed in its own process by feeding
+its bytes to an XML pull parser wrapped in a synthetic root, and the typed
+rows produced by the collectors are merged back in file order. Extraction
+therefore scales with the number of cores instead of being bound to the
+single core of a sequential parse. Ranges are filtered with lxml when it is
+installed.
+
+Archives (export.zip) cannot be read by byte range and small exports are not
+worth splitting; both are parsed sequentially.
+"""
+
+import mmap
+import os
+import xml.etree.ElementTree as ET
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from training_readiness.etl.stage_data.apple_health.apple_health_parser import (
+    collect_record,
+    READ_SIZE,
+    extract_records,
+    filter_records,
+    lxml_etree,
+    parse_high_water_marks,
+    top_level_elements,
+)
+
+# Bytes of export.xml handled by one task; ranges are dispatched to the pool
+CHUNK_SIZE = 64 * 1024 * 1024
+
+# lxml parse errors are re-raised as ET.ParseError
+LXML_PARSE_ERRORS = (lxml_etree.XMLSyntaxError,) if lxml_etree is not None else ()
+
+ROOT_START = b"<HealthData>"
+ROOT_END = b"</HealthData>"
+
+
+def find_record_boundaries(
+    xml_file_path: str, chunk_size: int = CHUNK_SIZE
+) -> List[Tuple[int, int]]:
+    """
+    Split export.xml into byte ranges that start at top-level Record elements.
+
+    Apple exports are pretty-printed, so a top-level Record is recognized by
+    the indentation of the first Record in the file. Records nested inside a
+    Correlation are indented deeper and never start a range.
+
+    Args:
+        xml_file_path: Path to an unpacked export.xml
+        chunk_size: Approximate number of bytes per range
+
+    Returns:
+        List of (start, end) byte offsets; empty when the file has no Records
+    """
+    with open(xml_file_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return []
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            first = mm.find(b"<Record")
+            data_end = mm.rfind(ROOT_END)
+            if first == -1 or data_end == -1:
+                return []
+
+            line_start = mm.rfind(b"\n", 0, first) + 1
+            indent = mm[line_start:first]
+            if indent.strip():
+                # Not pretty-printed: any Record start is a candidate
+                marker, skip = b"<Record", 0
+            else:
+                marker, skip = b"\n" + indent + b"<Record", 1 + len(indent)
+
+            starts = [first]
+            while True:
+                found = mm.find(marker, starts[-1] + chunk_size, data_end)
+                if found == -1:
+                    break
+                starts.append(found + skip)
+
+    return list(zip(starts, starts[1:] + [data_end]))
+
+
+def _iter_range_blocks(xml_file_path: str, start: int, end: int) -> Iterator[bytes]:
+    """Yield the bytes of one range wrapped in a synthetic root"""
+    yield ROOT_START
+
+    # Reading in blocks bounds memory per worker
+    with open(xml_file_path, "rb") as f:
+        f.seek(start)
+        remaining = end - start
+        while remaining > 0:
+            block = f.read(min(READ_SIZE, remaining))
+            if not block:
+                break
+            remaining -= len(block)
+            yield block
+
+    yield ROOT_END
+
+
+def _iter_range_events(
+    xml_file_path: str, start: int, end: int
+) -> Iterator[Tuple[str, ET.Element]]:
+    """Yield parse events for one byte range wrapped in a synthetic root"""
+    parser = ET.XMLPullParser(events=("start", "end"))
+    for block in _iter_range_blocks(xml_file_path, start, end):
+        parser.feed(block)
+        yield from parser.read_events()
+
+    parser.close()
+    yield from parser.read_events()
+
+
+def _iter_range_records(
+    xml_file_path: str, start: int, end: int, record_types: set
+) -> Iterator[Dict[str, str]]:
+    """Yield the attributes of the wanted top-level Records of one range"""
+    if lxml_etree is not None:
+        blocks = _iter_range_blocks(xml_file_path, start, end)
+        yield from filter_records(blocks, record_types)
+        return
+
+    events = _iter_range_events(xml_file_path, start, end)
+    for elem in top_level_elements(events, {"Record"}):
+        if elem.get("type") in record_types:
+            yield dict(elem.attrib)
+
+
+def _extract_range(
+    task: Tuple[
+        str,
+        int,
+        int,
+        Dict[str, Callable[[Dict[str, str]], Optional[Dict]]],
+        Optional[Dict[str, str]],
+    ],
+) -> Dict[str, List[Dict[str, Any]]]:
+    """Collect the records of one byte range (runs in a worker process)"""
+    xml_file_path, start, end, collectors, since = task
+    results: Dict[str, List[Dict[str, Any]]] = {
+        record_type: [] for record_type in collectors
+    }
+    marks = parse_high_water_marks(since)
+
+    try:
+        for record in _iter_range_records(xml_file_path, start, end, set(collectors)):
+            collect_record(record, collectors, marks, results)
+    except LXML_PARSE_ERRORS as e:
+        # lxml errors cannot be pickled back to the parent process
+        raise ET.ParseError(str(e)) from None
+
+    return results
+
+
+def extract_records_parallel(
+    xml_file_path: str,
+    collectors: Dict[str, Callable[[Dict[str, str]], Optional[Dict]]],
+    since: Optional[Dict[str, str]] = None,
+    workers: Optional[int] = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Extract several record types from export.xml using a process pool.
+
+    Produces the same rows, in the same order, as extract_records. Collectors
+    must be module-level functions so they can be sent to worker processes.
+
+    Args:
+        xml_file_path: Path to export.xml (export.zip is parsed sequentially)
+        collectors: Mapping of record type to collector function
+        since: Optional mapping of record type to a high-water mark date
+        workers: Number of worker processes (defaults to the CPU count)
+        chunk_size: Approximate number of bytes parsed per task
+
+    Returns:
+        Mapping of record type to the list of collected rows
+    """
+    if zipfile.is_zipfile(xml_file_path):
+        print("Export is an archive - parsing sequentially")
+        return extract_records(xml_file_path, collectors, since=since)
+
+    ranges = find_record_boundaries(xml_file_path, chunk_size)
+    if len(ranges) <= 1:
+        return extract_records(xml_file_path, collectors, since=since)
+
+    print(f"Parsing {len(ranges)} chunks of export.xml in parallel")
+    tasks = [(xml_file_path, start, end, collectors, since) for start, end in ranges]
+
+    results: Dict[str, List[Dict[str, Any]]] = {
+        record_type: [] for record_type in collectors
+    }
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # map() returns chunk results in file order
+            for chunk_results in pool.map(_extract_range, tasks):
+                for record_type, rows in chunk_results.items():
+                    results[record_type].extend(rows)
+    except ET.ParseError as e:
+        # A range that does not start at a top-level element cannot be parsed
+        # on its own; the sequential parser handles any layout
+        print(f"Parallel parsing failed ({e}) - parsing sequentially")
+        return extract_records(xml_file_path, collectors, since=since)
+
+    return results
@@ -0,0 +1,393 @@
+"""
+Apple Health Parser
+
+Streaming reader for the Apple Health export.xml file.
+
+The full export is several GB for multi-year histories, so it is never loaded
+as a tree. Top-level elements are visited one at a time with ``iterparse`` and
+cleared as soon as they have been handled, which keeps peak memory flat
+regardless of the export size.
+
+The export can be read straight from the phone's export.zip: export.xml is
+decompressed as it is parsed, so it never has to be unpacked to disk.
+
+When lxml is installed it is used as a fast path. Records are filtered on
+their tag and ``type`` attribute by a parser target, so no tree is built for
+the many records that are not wanted; other elements (e.g. Workouts) are
+built by a parser target only when their tag is wanted. The stdlib
+ElementTree parser is used otherwise; both paths yield the same output.
+
+Example:
+    for record in iter_records(xml_file, {"HKQuantityTypeIdentifierRestingHeartRate"}):
+        print(record["startDate"], record["value"])
+
+    # Several metrics from a single scan of the file
+    results = extract_records(xml_file, {SLEEP_ANALYSIS_TYPE: collect_sleep_record})
+"""
+
+import os
+import xml.etree.ElementTree as ET
+import zipfile
+from contextlib import contextmanager
+from datetime import datetime
+from typing import (
+    IO,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
+
+from training_readiness.etl.timestamps import parse_apple_health_timestamp
+
+try:
+    from lxml import etree as lxml_etree
+except ImportError:  # pragma: no cover - lxml is a declared dependency
+    lxml_etree = None
+
+SLEEP_ANALYSIS_TYPE = "HKCategoryTypeIdentifierSleepAnalysis"
+RESTING_HEART_RATE_TYPE = "HKQuantityTypeIdentifierRestingHeartRate"
+HEART_RATE_TYPE = "HKQuantityTypeIdentifierHeartRate"
+HRV_SDNN_TYPE = "HKQuantityTypeIdentifierHeartRateVariabilitySDNN"
+RESPIRATORY_RATE_TYPE = "HKQuantityTypeIdentifierRespiratoryRate"
+WRIST_TEMPERATURE_TYPE = "HKQuantityTypeIdentifierAppleSleepingWristTemperature"
+OXYGEN_SATURATION_TYPE = "HKQuantityTypeIdentifierOxygenSaturation"
+STEP_COUNT_TYPE = "HKQuantityTypeIdentifierStepCount"
+ACTIVE_ENERGY_TYPE = "HKQuantityTypeIdentifierActiveEnergyBurned"
+EXERCISE_TIME_TYPE = "HKQuantityTypeIdentifierAppleExerciseTime"
+
+# Unit conversion factors to hours, meters and kilocalories
+DURATION_UNITS = {"s": 1 / 3600, "min": 1 / 60, "hr": 1.0}
+DISTANCE_UNITS = {"m": 1.0, "km": 1000.0, "mi": 1609.344, "yd": 0.9144, "ft": 0.3048}
+ENERGY_UNITS = {"kcal": 1.0, "Cal": 1.0, "cal": 0.001, "kJ": 1 / 4.184}
+
+EXPORT_XML_NAME = "export.xml"
+EXPORT_ZIP_NAME = "export.zip"
+
+# Bytes fed to the lxml parser at a time
+READ_SIZE = 1024 * 1024
+
+
+def find_export_file(raw_dir: str) -> str:
+    """
+    Locate the Apple Health export in a raw data directory.
+
+    The phone's export.zip is preferred; an unpacked
+    apple_health_export/export.xml is used when no archive is present.
+
+    Args:
+        raw_dir: Directory holding the raw Apple Health export
+
+    Returns:
+        Path to export.zip or export.xml
+    """
+    zip_path = os.path.join(raw_dir, EXPORT_ZIP_NAME)
+    if os.path.exists(zip_path):
+        return zip_path
+    return os.path.join(raw_dir, "apple_health_export", EXPORT_XML_NAME)
+
+
+@contextmanager
+def open_export(path: str) -> Iterator[IO[bytes]]:
+    """
+    Open export.xml for streaming, directly from export.zip when given one.
+
+    Args:
+        path: Path to export.xml or to the export.zip archive
+
+    Yields:
+        Binary file object positioned at the start of export.xml
+
+    Raises:
+        FileNotFoundError: If the archive does not contain export.xml
+    """
+    if not zipfile.is_zipfile(path):
+        with open(path, "rb") as f:
+            yield f
+        return
+
+    with zipfile.ZipFile(path) as archive:
+        # Exports contain apple_health_export/export.xml next to export_cda.xml
+        members = [
+            name
+            for name in archive.namelist()
+            if os.path.basename(name) == EXPORT_XML_NAME
+        ]
+        if not members:
+            raise FileNotFoundError(f"{EXPORT_XML_NAME} not found in archive: {path}")
+
+        with archive.open(min(members, key=len)) as f:
+            yield f
+
+
+def iter_elements(source: Any, tags: Iterable[str]) -> Iterator[ET.Element]:
+    """
+    Stream the top-level elements of an Apple Health export.
+
+    Each yielded element is fully parsed (including its children) and is
+    cleared from memory once the caller moves on to the next element.
+
+    Args:
+        source: Path to export.xml or export.zip, or a binary file object
+        tags: Element tags to yield (e.g. "Record", "Workout")
+
+    Yields:
+        Matching top-level elements
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open_export(source) as f:
+            yield from _iterparse_top_level(f, set(tags))
+    else:
+        yield from _iterparse_top_level(source, set(tags))
+
+
+def _iterparse_top_level(f: IO[bytes], tags: set) -> Iterator[ET.Element]:
+    """Yield matching top-level elements of an open export"""
+    if lxml_etree is not None:
+        return _lxml_top_level_elements(f, tags)
+    return top_level_elements(ET.iterparse(f, events=("start", "end")), tags)
+
+
+def _lxml_top_level_elements(f: IO[bytes], tags: set) -> Iterator[ET.Element]:
+    """
+    Yield matching top-level elements using an lxml parser target.
+
+    Only the wanted elements are built, as standalone ElementTree elements;
+    everything else is skipped as it is parsed. Apple writes all Records
+    before the first Workout, so a tree holding the skipped elements until
+    the next match would grow with the whole export.
+    """
+    target = _ElementFilter(tags)
+    parser = lxml_etree.XMLParser(target=target, huge_tree=True)
+
+    for block in iter_blocks(f):
+        parser.feed(block)
+        elements, target.elements = target.elements, []
+        for elem in elements:
+            yield elem
+            elem.clear()
+
+    parser.close()
+    for elem in target.elements:
+        yield elem
+        elem.clear()
+
+
+def top_level_elements(
+    events: Iterable[Tuple[str, ET.Element]], tags: set
+) -> Iterator[ET.Element]:
+    """
+    Yield matching top-level elements from a stream of start/end events.
+
+    The first event must be the start of the document root. Every top-level
+    element is cleared once handled so the tree never grows.
+
+    Args:
+        events: (event, element) pairs from iterparse or XMLPullParser
+        tags: Element tags to yield
+
+    Yields:
+        Matching top-level elements
+    """
+    events = iter(events)
+    _, root = next(events)
+
+    depth = 0
+    for event, elem in events:
+        if event == "start":
+            depth += 1
+            continue
+
+        depth -= 1
+        if depth == 0:
+            if elem.tag in tags:
+                yield elem
+            # Drop every handled top-level element so the tree never grows
+            elem.clear()
+            root.clear()
+
+
+def iter_records(
+    source: Any, record_types: Optional[Iterable[str]] = None
+) -> Iterator[Dict[str, str]]:
+    """
+    Stream the attributes of ``Record`` elements from an Apple Health export.
+
+    Args:
+        source: Path to export.xml or export.zip, or a binary file object
+        record_types: Record ``type`` values to keep; all records when None
+
+    Yields:
+        Attribute dictionary of each matching record
+    """
+    wanted = set(record_types) if record_types is not None else None
+
+    if lxml_etree is not None:
+        if isinstance(source, (str, os.PathLike)):
+            with open_export(source) as f:
+                yield from filter_records(iter_blocks(f), wanted)
+        else:
+            yield from filter_records(iter_blocks(source), wanted)
+        return
+
+    for elem in iter_elements(source, ("Record",)):
+        if wanted is None or elem.get("type") in wanted:
+            yield dict(elem.attrib)
+
+
+def iter_blocks(f: IO[bytes], size: int = READ_SIZE) -> Iterator[bytes]:
+    """Read an open file in blocks of ``size`` bytes"""
+    return iter(lambda: f.read(size), b"")
+
+
+class _RecordFilter:
+    """lxml parser target keeping the attributes of wanted top-level Records"""
+
+    def __init__(self, record_types: Optional[set]):
+        self.record_types = record_types
+        self.depth = 0
+        self.records: List[Dict[str, str]] = []
+
+    def start(self, tag: str, attrib: Dict[str, str]) -> None:
+        self.depth += 1
+        if (
+            self.depth == 2
+            and tag == "Record"
+            and (self.record_types is None or attrib.get("type") in self.record_types)
+        ):
+            self.records.append(dict(attrib))
+
+    def end(self, tag: str) -> None:
+        self.depth -= 1
+
+    def close(self) -> None:
+        pass
+
+
+class _ElementFilter:
+    """lxml parser target building the wanted top-level elements"""
+
+    def __init__(self, tags: set):
+        self.tags = tags
+        self.depth = 0
+        self.builder: Optional[ET.TreeBuilder] = None
+        self.elements: List[ET.Element] = []
+
+    def start(self, tag: str, attrib: Dict[str, str]) -> None:
+        self.depth += 1
+        if self.builder is None and self.depth == 2 and tag in self.tags:
+            self.builder = ET.TreeBuilder()
+        if self.builder is not None:
+            self.builder.start(tag, dict(attrib))
+
+    def data(self, data: str) -> None:
+        if self.builder is not None:
+            self.builder.data(data)
+
+    def end(self, tag: str) -> None:
+        if self.builder is not None:
+            elem = self.builder.end(tag)
+            if self.depth == 2:
+                self.elements.append(elem)
+                self.builder = None
+        self.depth -= 1
+
+    def close(self) -> None:
+        pass
+
+
+def filter_records(
+    blocks: Iterable[bytes], record_types: Optional[set] = None
+) -> Iterator[Dict[str, str]]:
+    """
+    Stream the attributes of top-level Records using an lxml parser target.
+
+    Elements are never built: the target sees each start tag with its
+    attributes and keeps only Records of the wanted types. Requires lxml.
+
+    Args:
+        blocks: Byte blocks of a complete XML document
+        record_types: Record ``type`` values to keep; all records when None
+
+    Yields:
+        Attribute dictionary of each matching record
+    """
+    target = _RecordFilter(record_types)
+    parser = lxml_etree.XMLParser(target=target, huge_tree=True)
+
+    for block in blocks:
+        parser.feed(block)
+        records, target.records = target.records, []
+        yield from records
+
+    parser.close()
+    yield from target.records
+
+
+def extract_records(
+    source: Any,
+    collectors: Dict[str, Callable[[Dict[str, str]], Optional[Dict]]],
+    since: Optional[Dict[str, str]] = None,
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Extract several record types from an Apple Health export in one pass.
+
+    Each matching record is dispatched to the collector registered for its
+    type. A collector converts the raw attributes into an output row, or
+    returns None to skip the record.
+
+    Args:
+        source: Path to export.xml or export.zip, or a binary file object
+        collectors: Mapping of record type to collector function
+        since: Optional mapping of record type to a high-water mark date;
+            records of that type starting before the mark are skipped
+
+    Returns:
+        Mapping of record type to the list of collected rows
+    """
+    results: Dict[str, List[Dict[str, Any]]] = {
+        record_type: [] for record_type in collectors
+    }
+    marks = parse_high_water_marks(since)
+
+    for record in iter_records(source, collectors):
+        collect_record(record, collectors, marks, results)
+
+    return results
+
+
+def parse_high_water_marks(
+    since: Optional[Dict[str, str]],
+) -> Dict[str, datetime]:
+    """Parse a mapping of record type to high-water mark date"""
+    return {
+        record_type: parse_apple_health_timestamp(mark)
+        for record_type, mark in (since or {}).items()
+        if mark
+    }
+
+
+def collect_record(
+    record: Dict[str, str],
+    collectors: Dict[str, Callable[[Dict[str, str]], Optional[Dict]]],
+    marks: Dict[str, datetime],
+    results: Dict[str, List[Dict[str, Any]]],
+) -> None:
+    """Dispatch one record to the collector of its type, honoring its mark"""
+    record_type = record.get("type")
+    if record_type not in collectors:
+        return
+
+    mark = marks.get(record_type)
+    if mark is not None:
+        start_date = parse_apple_health_timestamp(record.get("startDate"))
+        if start_date is None or start_date < mark:
+            return
+
+    row = collectors[record_type](record)
+    if row is not None:
+        results[record_type].append(row)
@@ -0,0 +1,232 @@
+"""
+Apple Health Scanner
+
+Byte-level extraction of a few targeted record types from export.xml.
+
+Most of an export is heart-rate, step and energy samples. When only one or
+two record types are needed, the file is memory-mapped and searched for the
+``type="..."`` marker of each requested type; the attributes of each matching
+top-level ``<Record`` start tag are then read directly from the bytes.
+Elements are never built for the rest of the file.
+
+The scanner relies on the layout of Apple's exports: attributes are double
+quoted and Records are only nested inside Correlation elements. Anything it
+cannot read raises ScanError, and extract_records_scanned falls back to the
+XML parser, so the output is always the same as extract_records.
+"""
+
+import bisect
+import heapq
+import mmap
+import os
+import re
+import zipfile
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from training_readiness.etl.stage_data.apple_health.apple_health_parser import (
+    collect_record,
+    extract_records,
+    parse_high_water_marks,
+)
+
+RECORD_START = b"<Record"
+CORRELATION_START = b"<Correlation"
+CORRELATION_END = b"</Correlation>"
+TYPE_PREFIX = b'type="'
+
+ATTRIBUTE_PATTERN = re.compile(rb'\s+([A-Za-z_][\w.:-]*)="([^"<]*)"')
+TAG_END_PATTERN = re.compile(rb"\s*/?>")
+WHITESPACE_PATTERN = re.compile(r"[\t\n\r]")
+REFERENCE_PATTERN = re.compile(r"&([^;&]*);")
+
+XML_ENTITIES = {"lt": "<", "gt": ">", "amp": "&", "quot": '"', "apos": "'"}
+
+
+class ScanError(ValueError):
+    """Raised when the export cannot be read without a full XML parse"""
+
+
+def _replace_reference(match: "re.Match[str]") -> str:
+    """Resolve one XML entity or character reference"""
+    name = match.group(1)
+    if name in XML_ENTITIES:
+        return XML_ENTITIES[name]
+    if name.startswith(("#x", "#X")):
+        return chr(int(name[2:], 16))
+    if name.startswith("#") and name[1:].isdigit():
+        return chr(int(name[1:]))
+    raise ScanError(f"Unsupported entity reference: &{name};")
+
+
+def decode_attribute(raw: bytes) -> str:
+    """Decode an attribute value the way an XML parser reports it"""
+    value = raw.decode("utf-8")
+    if "\r" in value or "\n" in value or "\t" in value:
+        # Line ends are normalized, then whitespace becomes a space
+        value = WHITESPACE_PATTERN.sub(" ", value.replace("\r\n", "\n"))
+    if "&" in value:
+        value = REFERENCE_PATTERN.sub(_replace_reference, value)
+    return value
+
+
+def parse_start_tag(data: Any, start: int) -> Dict[str, str]:
+    """
+    Read the attributes of the ``<Record`` start tag at ``start``.
+
+    Args:
+        data: Export bytes (bytes or mmap)
+        start: Offset of the ``<`` opening the tag
+
+    Returns:
+        Attribute dictionary of the Record
+
+    Raises:
+        ScanError: If the tag does not have the expected layout
+    """
+    attrib = {}
+    pos = start + len(RECORD_START)
+    while True:
+        match = ATTRIBUTE_PATTERN.match(data, pos)
+        if match is None:
+            break
+        attrib[match.group(1).decode("utf-8")] = decode_attribute(match.group(2))
+        pos = match.end()
+
+    if TAG_END_PATTERN.match(data, pos) is None:
+        raise ScanError(f"Unexpected markup in Record at byte {start}")
+    return attrib
+
+
+def find_correlations(data: Any) -> Tuple[List[int], List[int]]:
+    """Return the start and end offsets of every Correlation element"""
+    starts, ends = [], []
+    pos = data.find(CORRELATION_START)
+    while pos != -1:
+        end = data.find(CORRELATION_END, pos)
+        if end == -1:
+            raise ScanError(f"Unclosed Correlation at byte {pos}")
+        starts.append(pos)
+        ends.append(end)
+        pos = data.find(CORRELATION_START, end)
+    return starts, ends
+
+
+def find_record_starts(
+    data: Any, record_type: str, correlations: Tuple[List[int], List[int]]
+) -> List[int]:
+    """
+    Find the start offsets of the top-level Records of one type.
+
+    Args:
+        data: Export bytes (bytes or mmap)
+        record_type: Record ``type`` value to locate
+        correlations: Correlation offsets from find_correlations; Records
+            inside them are skipped
+
+    Returns:
+        Ascending offsets of the ``<Record`` tags of that type
+
+    Raises:
+        ScanError: If the type appears other than as a ``type="..."`` value
+    """
+    value = record_type.encode("utf-8")
+    if data.find(value + b"'") != -1:
+        raise ScanError(f"Single-quoted {record_type}")
+
+    # Every occurrence of the quoted type is checked, so that a Record written
+    # in an unexpected layout is never silently skipped
+    marker = value + b'"'
+    correlation_starts, correlation_ends = correlations
+
+    starts = []
+    pos = data.find(marker)
+    while pos != -1:
+        if data[pos - len(TYPE_PREFIX) : pos] != TYPE_PREFIX:
+            raise ScanError(f"Unexpected reference to {record_type} at byte {pos}")
+
+        start = data.rfind(b"<", 0, pos)
+        name_end = start + len(RECORD_START)
+        # Other elements (e.g. WorkoutStatistics) carry quantity types too
+        if (
+            start != -1
+            and data[pos - len(TYPE_PREFIX) - 1 : pos - len(TYPE_PREFIX)].isspace()
+            and data[start:name_end] == RECORD_START
+            and data[name_end : name_end + 1].isspace()
+        ):
+            index = bisect.bisect_right(correlation_starts, start) - 1
+            if index < 0 or correlation_ends[index] < start:
+                starts.append(start)
+        pos = data.find(marker, pos + len(marker))
+    return starts
+
+
+def scan_records(
+    xml_file_path: str, record_types: Iterable[str]
+) -> Iterator[Dict[str, str]]:
+    """
+    Stream the attributes of top-level Records of the requested types.
+
+    Records are yielded in file order, as iter_records does.
+
+    Args:
+        xml_file_path: Path to an unpacked export.xml
+        record_types: Record ``type`` values to extract
+
+    Yields:
+        Attribute dictionary of each matching record
+
+    Raises:
+        ScanError: If the export cannot be scanned
+    """
+    with open(xml_file_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise ScanError(f"Empty export: {xml_file_path}")
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            correlations = find_correlations(mm)
+            starts = heapq.merge(
+                *(
+                    find_record_starts(mm, record_type, correlations)
+                    for record_type in record_types
+                )
+            )
+            for start in starts:
+                yield parse_start_tag(mm, start)
+
+
+def extract_records_scanned(
+    xml_file_path: str,
+    collectors: Dict[str, Callable[[Dict[str, str]], Optional[Dict]]],
+    since: Optional[Dict[str, str]] = None,
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Extract several record types from export.xml with the byte scanner.
+
+    Produces the same rows, in the same order, as extract_records. Archives
+    and exports the scanner cannot read are parsed as XML instead.
+
+    Args:
+        xml_file_path: Path to export.xml (export.zip is parsed as XML)
+        collectors: Mapping of record type to collector function
+        since: Optional mapping of record type to a high-water mark date
+
+    Returns:
+        Mapping of record type to the list of collected rows
+    """
+    if zipfile.is_zipfile(xml_file_path):
+        print("Export is an archive - parsing XML")
+        return extract_records(xml_file_path, collectors, since=since)
+
+    results: Dict[str, List[Dict[str, Any]]] = {
+        record_type: [] for record_type in collectors
+    }
+    marks = parse_high_water_marks(since)
+
+    try:
+        for record in scan_records(xml_file_path, collectors):
+            collect_record(record, collectors, marks, results)
+    except ScanError as e:
+        print(f"Byte scan failed ({e}) - parsing XML")
+        return extract_records(xml_file_path, collectors, since=since)
+
+    return results
@@ -0,0 +1,43 @@
+"""
+Apple Health Sources
+
+Ranks the devices and apps that wrote overlapping Apple Health records.
+
+A watch, a phone and third-party apps often record the same time. Metric
+loaders resolve such overlaps by keeping the record of the best-ranked
+source: the first source whose name contains an entry of the priority list,
+with the remaining sources following, ordered by name.
+"""
+
+from typing import Iterable, Sequence
+
+import numpy as np
+import pandas as pd
+
+# Sources matched by name in this order win overlaps; others rank after them
+SOURCE_PRIORITY = ("Apple Watch",)
+
+
+def source_ranks(
+    source_names: Iterable[str], source_priority: Sequence[str] = SOURCE_PRIORITY
+) -> np.ndarray:
+    """
+    Rank the source of each record; the lowest rank wins an overlap.
+
+    Args:
+        source_names: sourceName of each record; missing names rank as ""
+        source_priority: Source name fragments in order of preference
+
+    Returns:
+        int64 rank of each record
+    """
+    names = pd.Series(source_names, dtype=object).fillna("")
+    codes, sources = pd.factorize(names, sort=True)
+
+    priorities = []
+    for source in sources:
+        matches = [i for i, name in enumerate(source_priority) if name in source]
+        priorities.append(matches[0] if matches else len(source_priority))
+
+    # Sources of equal priority are ordered by name
+    return np.array(priorities, dtype=np.int64)[codes] * len(sources) + codes
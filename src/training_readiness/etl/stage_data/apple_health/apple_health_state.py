@@ -0,0 +1,91 @@
+"""
+Apple Health State
+
+Persists what has already been ingested from Apple Health exports so that
+re-runs only process records newer than the previous run.
+- High-water marks: JSON mapping of record type to the startDate from which
+  the next run re-collects records
+- Stored results: one CSV per metric that newly processed rows are merged into
+
+Each export holds the complete history, so a mark is placed at a boundary the
+metric can resume from cleanly (the start of the last sleep session, midnight
+of the last resting HR day). The rows rebuilt from that point replace the
+stored rows with the same key.
+"""
+
+import json
+import os
+from typing import Dict, Optional
+
+import pandas as pd
+
+STATE_FILE_NAME = "apple_health_state.json"
+
+
+def load_high_water_marks(state_file: str) -> Dict[str, str]:
+    """
+    Load the high-water mark of each record type.
+
+    Args:
+        state_file: Path to the JSON state file
+
+    Returns:
+        Mapping of record type to startDate; empty when no state exists yet
+    """
+    if not os.path.exists(state_file):
+        print(f"No ingestion state found at {state_file} - processing full export")
+        return {}
+
+    with open(state_file, "r", encoding="utf-8") as f:
+        marks = json.load(f)
+
+    print(f"Loaded high-water marks for {len(marks)} record types from {state_file}")
+    return marks
+
+
+def save_high_water_marks(state_file: str, marks: Dict[str, str]) -> None:
+    """
+    Save the high-water mark of each record type.
+
+    Args:
+        state_file: Path to the JSON state file
+        marks: Mapping of record type to startDate
+    """
+    # Write to a temporary file first so a crash never leaves partial state
+    temp_file = f"{state_file}.tmp"
+    with open(temp_file, "w", encoding="utf-8") as f:
+        json.dump(marks, f, indent=2, sort_keys=True)
+    os.replace(temp_file, state_file)
+
+    print(f"Saved high-water marks for {len(marks)} record types to {state_file}")
+
+
+def merge_analysis(
+    output_file: str, new_data: pd.DataFrame, key: Optional[str]
+) -> pd.DataFrame:
+    """
+    Merge newly processed rows into the stored results of a metric.
+
+    Stored rows whose key appears in the new rows are replaced; new rows are
+    appended after the stored ones, which keeps the file in date order since
+    new rows always start at or after the previous high-water mark.
+
+    Args:
+        output_file: Path to the stored CSV results
+        new_data: Newly processed rows
+        key: Column identifying a row (e.g. "Sleep_Start"); when None the new
+            rows are simply appended
+
+    Returns:
+        Merged DataFrame to be written back to output_file
+    """
+    new_df = pd.DataFrame(new_data)
+    if not os.path.exists(output_file):
+        return new_df
+
+    existing = pd.read_csv(output_file, dtype=str if key is None else {key: str})
+    if key is not None:
+        existing = existing[~existing[key].isin(new_df[key])]
+
+    print(f"Merging {len(new_df)} new rows into {len(existing)} stored rows")
+    return pd.concat([existing, new_df], ignore_index=True)
@@ -0,0 +1,367 @@
+"""
+load_activity_data.py
+
+Loads Apple Health step count, active energy and exercise time samples.
+- Per-day totals -> cleaned/apple_activity_analysis_<timestamp>.csv
+
+Like heart rate, these are millions of samples in a multi-year export, so
+they are streamed in chunks into compact arrays (int64 UTC seconds, int16
+UTC offset minutes, int16 source, float32 value in the output unit) instead
+of row dictionaries.
+
+The iPhone and the Apple Watch both count steps and energy while they are
+carried together, so summing every sample double counts. Sources are ranked
+by ACTIVITY_SOURCE_PRIORITY and each sample only keeps the share of its
+value that falls outside the time already covered by better-ranked sources,
+which is how Health itself arrives at its daily totals. Samples are bucketed
+into the local day of their start.
+"""
+
+import numpy as np
+import pandas as pd
+from datetime import datetime
+import os
+import sys
+import argparse
+
+# Add the src directory to the path so we can import the module
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../../../../../src"))
+
+from training_readiness.etl.stage_data.apple_health.apple_health_parser import (  # noqa: E402
+    ACTIVE_ENERGY_TYPE,
+    DURATION_UNITS,
+    ENERGY_UNITS,
+    EXERCISE_TIME_TYPE,
+    STEP_COUNT_TYPE,
+    find_export_file,
+    iter_records,
+)
+from training_readiness.etl.stage_data.apple_health.apple_health_sources import (  # noqa: E402
+    source_ranks,
+)
+from training_readiness.etl.timestamps import (  # noqa: E402
+    parse_apple_health_timestamps,
+)
+
+# Record type -> output column and factors converting its units to the column's
+ACTIVITY_METRICS = {
+    STEP_COUNT_TYPE: ("Step_Count", {"count": 1.0}),
+    ACTIVE_ENERGY_TYPE: ("Active_Energy_Kcal", ENERGY_UNITS),
+    EXERCISE_TIME_TYPE: (
+        "Exercise_Minutes",
+        {unit: factor * 60 for unit, factor in DURATION_UNITS.items()},
+    ),
+}
+
+ACTIVITY_COLUMNS = ["Activity_Date"] + [
+    column for column, _ in ACTIVITY_METRICS.values()
+]
+
+# Sources matched by name in this order win overlaps; others rank after them
+ACTIVITY_SOURCE_PRIORITY = ("Apple Watch", "iPhone")
+
+# Samples converted to arrays at a time while streaming the export
+SAMPLE_CHUNK_SIZE = 100_000
+
+ACTIVITY_SAMPLE_DTYPES = {
+    "metric": "int8",
+    "source": "int16",
+    "start_utc": "int64",
+    "end_utc": "int64",
+    "offset_minutes": "int16",
+    "value": "float32",
+}
+
+
+def compact_activity_samples(metrics, sources, start_dates, end_dates, values):
+    """Convert a chunk of activity samples into compact arrays"""
+    local, start_utc = parse_apple_health_timestamps(start_dates)
+    _, end_utc = parse_apple_health_timestamps(end_dates)
+
+    local_seconds = local.to_numpy().astype("datetime64[s]").astype(np.int64)
+    start_seconds = start_utc.dt.tz_localize(None).to_numpy().astype("datetime64[s]")
+    start_seconds = start_seconds.astype(np.int64)
+    end_seconds = end_utc.dt.tz_localize(None).to_numpy().astype("datetime64[s]")
+    end_seconds = end_seconds.astype(np.int64)
+
+    return pd.DataFrame(
+        {
+            "metric": np.asarray(metrics, dtype=np.int8),
+            "source": np.asarray(sources, dtype=np.int16),
+            "start_utc": start_seconds,
+            "end_utc": np.maximum(end_seconds, start_seconds),
+            "offset_minutes": ((local_seconds - start_seconds) // 60).astype(np.int16),
+            "value": np.asarray(values, dtype=np.float32),
+        }
+    )
+
+
+def extract_activity_samples(xml_file_path, chunk_size=SAMPLE_CHUNK_SIZE):
+    """
+    Stream activity samples from Apple Health XML export into compact arrays.
+
+    Returns:
+        Tuple of (samples, source_names): ``metric`` indexes the record types
+        of ACTIVITY_METRICS and ``source`` indexes source_names
+    """
+    print(f"Reading Apple Health export from: {xml_file_path}")
+
+    if not os.path.exists(xml_file_path):
+        raise FileNotFoundError(f"XML file not found: {xml_file_path}")
+
+    metric_codes = {
+        record_type: code for code, record_type in enumerate(ACTIVITY_METRICS)
+    }
+    unit_factors = [units for _, units in ACTIVITY_METRICS.values()]
+    source_codes = {}
+
+    chunks = []
+    metrics, sources, start_dates, end_dates, values = [], [], [], [], []
+    for record in iter_records(xml_file_path, ACTIVITY_METRICS):
+        start_date = record.get("startDate")
+        value = record.get("value")
+        metric = metric_codes[record.get("type")]
+        factor = unit_factors[metric].get(record.get("unit"))
+
+        # Only keep samples with a date, a value and a known unit
+        if not (start_date and value) or factor is None:
+            continue
+
+        source_name = record.get("sourceName", "")
+        metrics.append(metric)
+        sources.append(source_codes.setdefault(source_name, len(source_codes)))
+        start_dates.append(start_date)
+        end_dates.append(record.get("endDate") or start_date)
+        values.append(float(value) * factor)
+        if len(metrics) >= chunk_size:
+            chunks.append(
+                compact_activity_samples(
+                    metrics, sources, start_dates, end_dates, values
+                )
+            )
+            metrics, sources, start_dates, end_dates, values = [], [], [], [], []
+
+    if metrics:
+        chunks.append(
+            compact_activity_samples(metrics, sources, start_dates, end_dates, values)
+        )
+
+    if chunks:
+        samples = pd.concat(chunks, ignore_index=True)
+    else:
+        samples = pd.DataFrame(
+            {
+                column: pd.Series(dtype=dtype)
+                for column, dtype in ACTIVITY_SAMPLE_DTYPES.items()
+            }
+        )
+
+    print(f"Extracted {len(samples)} activity samples from XML")
+    return samples, list(source_codes)
+
+
+def merge_intervals(start, end):
+    """
+    Union of intervals as disjoint intervals.
+
+    Args:
+        start: Interval starts, sorted ascending
+        end: Interval ends
+
+    Returns:
+        Tuple of (starts, ends) of the disjoint intervals, sorted ascending
+    """
+    if len(start) == 0:
+        return start, end
+
+    # An interval opens a new block when it starts after every earlier end
+    reach = np.maximum.accumulate(end)
+    opens = np.flatnonzero(np.r_[True, start[1:] > reach[:-1]])
+    return start[opens], np.maximum.reduceat(end, opens)
+
+
+def uncovered_fraction(start, end, cover_start, cover_end):
+    """
+    Share of each interval outside a set of disjoint intervals.
+
+    Instantaneous samples (start == end) are either fully covered or not.
+    """
+    if len(cover_start) == 0:
+        return np.ones(len(start))
+
+    # Covered time before each block, so coverage up to t is found by bisection
+    lengths = cover_end - cover_start
+    before = np.r_[0, np.cumsum(lengths)[:-1]]
+
+    def covered_until(t):
+        block = np.searchsorted(cover_start, t, side="right") - 1
+        found = np.maximum(block, 0)
+        inside = np.clip(t - cover_start[found], 0, lengths[found])
+        return np.where(block >= 0, before[found] + inside, 0), block, found
+
+    end_covered, _, _ = covered_until(end)
+    start_covered, block, found = covered_until(start)
+    covered = end_covered - start_covered
+    duration = end - start
+    in_block = (block >= 0) & (start < cover_end[found])
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        fraction = 1 - covered / duration
+    return np.where(duration > 0, fraction, np.where(in_block, 0.0, 1.0))
+
+
+def deduplicate_activity_sources(
+    samples, source_names, source_priority=ACTIVITY_SOURCE_PRIORITY
+):
+    """
+    Scale each sample down to the share not covered by better-ranked sources.
+
+    Args:
+        samples: Compact samples from extract_activity_samples
+        source_names: Source names indexed by the samples' ``source``
+        source_priority: Substrings of source names, best first
+
+    Returns:
+        The samples sorted by metric and start, without exact repeats and
+        with deduplicated values as float64
+    """
+    # Sorting on every column, metric and start first, also puts samples
+    # exported twice next to each other
+    columns = ["metric", "start_utc", "end_utc", "source", "offset_minutes", "value"]
+    order = np.lexsort([samples[column].to_numpy() for column in columns[::-1]])
+    samples = samples.iloc[order]
+    repeated = np.ones(len(samples), dtype=bool)
+    for column in columns:
+        values = samples[column].to_numpy()
+        repeated[1:] &= values[1:] == values[:-1]
+    repeated[:1] = False
+    samples = samples[~repeated]
+
+    name_ranks = source_ranks(source_names, source_priority)
+    ranks = name_ranks[samples["source"].to_numpy()]
+    start = samples["start_utc"].to_numpy()
+    end = samples["end_utc"].to_numpy()
+    metrics = samples["metric"].to_numpy()
+    value = samples["value"].to_numpy().astype(np.float64)
+
+    for metric in np.unique(metrics):
+        of_metric = metrics == metric
+        covered = np.zeros(len(samples), dtype=bool)
+
+        for rank in np.unique(ranks[of_metric]):
+            current = of_metric & (ranks == rank)
+            cover_start, cover_end = merge_intervals(start[covered], end[covered])
+            value[current] *= uncovered_fraction(
+                start[current], end[current], cover_start, cover_end
+            )
+            covered |= current
+
+    return samples.assign(value=value)
+
+
+def process_activity_data(
+    samples, source_names, source_priority=ACTIVITY_SOURCE_PRIORITY
+):
+    """
+    Total activity samples per local day.
+
+    Args:
+        samples: Compact samples from extract_activity_samples
+        source_names: Source names indexed by the samples' ``source``
+        source_priority: Substrings of source names, best first
+
+    Returns:
+        DataFrame with one row per local day that has samples
+    """
+    print("Processing activity data...")
+
+    if len(samples) == 0:
+        print("No activity data found in XML export")
+        return pd.DataFrame(columns=ACTIVITY_COLUMNS)
+
+    samples = deduplicate_activity_sources(samples, source_names, source_priority)
+
+    local_seconds = (
+        samples["start_utc"].to_numpy()
+        + samples["offset_minutes"].to_numpy().astype(np.int64) * 60
+    )
+    totals = (
+        pd.DataFrame(
+            {
+                "day": local_seconds // 86400,
+                "metric": samples["metric"].to_numpy(),
+                "value": samples["value"].to_numpy(),
+            }
+        )
+        .groupby(["day", "metric"], sort=True)["value"]
+        .sum()
+        .unstack(fill_value=0.0)
+        .reindex(columns=range(len(ACTIVITY_METRICS)), fill_value=0.0)
+    )
+
+    output_data = pd.DataFrame(
+        {
+            "Activity_Date": pd.to_datetime(totals.index * 86400, unit="s").strftime(
+                "%m/%d/%Y"
+            )
+        }
+    )
+    for metric, (column, _) in enumerate(ACTIVITY_METRICS.values()):
+        output_data[column] = totals[metric].round(1).to_numpy()
+    output_data["Step_Count"] = output_data["Step_Count"].round().astype("int64")
+
+    print(f"Processed {len(output_data)} days of activity data")
+    return output_data[ACTIVITY_COLUMNS]
+
+
+def save_activity_analysis(output_data, output_file="activity_analysis.csv"):
+    """Save processed activity data to CSV file"""
+    print(f"Saving activity analysis to: {output_file}")
+
+    pd.DataFrame(output_data, columns=ACTIVITY_COLUMNS).to_csv(output_file, index=False)
+
+    print(f"Successfully saved {len(output_data)} activity days to {output_file}")
+
+
+def main():
+    """Main function to process Apple Health activity samples"""
+    # Get the directory where this script is located
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+
+    # Read export.zip as delivered by the phone, or an unpacked export.xml
+    xml_file = find_export_file(os.path.join(script_dir, "raw"))
+
+    # Generate timestamped filename
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    output_file = os.path.join(
+        script_dir, f"cleaned/apple_activity_analysis_{timestamp}.csv"
+    )
+
+    try:
+        # Extract activity samples from XML
+        samples, source_names = extract_activity_samples(xml_file)
+
+        if len(samples) == 0:
+            print("No activity data found in the XML export")
+            return
+
+        # Total the deduplicated samples per day
+        output_data = process_activity_data(samples, source_names)
+
+        # Save the analysis
+        save_activity_analysis(output_data, output_file)
+
+        print("Activity data processing completed successfully!")
+
+    except Exception as e:
+        print(f"Error processing activity data: {str(e)}")
+        raise
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Process Apple Health steps, active energy and exercise time"
+    )
+    parser.parse_args()
+
+    main()
@@ -0,0 +1,352 @@
+"""
+load_apple_health_data.py
+
+Loads every registered Apple Health metric from a single pass over export.xml.
+- Sleep analysis -> cleaned/apple_sleep_analysis_<timestamp>.csv
+- Resting heart rate -> cleaned/apple_resting_hr_analysis_<timestamp>.csv
+- HRV (SDNN) with rolling baselines -> cleaned/apple_hrv_analysis_<timestamp>.csv
+
+Each Record is dispatched to the collector of its metric while the file is
+streamed, so adding a metric does not add another scan of the export. New
+metrics are added with register_metric().
+
+With --workers N, an unpacked export.xml is split into byte ranges that are
+parsed on N processes (see apple_health_parallel).
+
+With --scan, the export is searched byte-wise for the registered record
+types instead of being parsed as XML (see apple_health_scanner).
+
+With --cache, extracted rows are kept in a Parquet cache keyed by the
+export's content hash (see apple_health_cache), so re-runs over the same
+export skip the XML entirely.
+
+With --incremental, only records at or after each metric's high-water mark
+(see apple_health_state) are processed and merged into
+cleaned/apple_<metric>_analysis.csv instead of a new timestamped file.
+
+With --duckdb, metrics registered with a table are upserted into typed
+tables of training_readiness.duckdb instead (see apple_health_duckdb).
+"""
+
+from datetime import datetime
+from functools import partial
+import os
+import sys
+import argparse
+
+# Add the src directory to the path so we can import the module
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../../../../../src"))
+
+from training_readiness.etl.stage_data.apple_health.apple_health_parser import (  # noqa: E402
+    HRV_SDNN_TYPE,
+    RESTING_HEART_RATE_TYPE,
+    SLEEP_ANALYSIS_TYPE,
+    extract_records,
+    find_export_file,
+)
+from training_readiness.etl.stage_data.apple_health.apple_health_cache import (  # noqa: E402
+    extract_records_cached,
+)
+from training_readiness.etl.stage_data.apple_health.apple_health_debug import (  # noqa: E402
+    add_debug_arguments,
+    debug_options_from_args,
+)
+from training_readiness.etl.stage_data.apple_health.apple_health_duckdb import (  # noqa: E402
+    DATABASE_PATH,
+    upsert_analysis,
+)
+from training_readiness.etl.stage_data.apple_health.apple_health_parallel import (  # noqa: E402
+    extract_records_parallel,
+)
+from training_readiness.etl.stage_data.apple_health.apple_health_scanner import (  # noqa: E402
+    extract_records_scanned,
+)
+from training_readiness.etl.stage_data.apple_health.apple_health_state import (  # noqa: E402
+    STATE_FILE_NAME,
+    load_high_water_marks,
+    merge_analysis,
+    save_high_water_marks,
+)
+from training_readiness.etl.stage_data.apple_health.load_sleep_data import (  # noqa: E402
+    SLEEP_ANALYSIS_TABLE,
+    collect_sleep_record,
+    process_sleep_data,
+    save_sleep_analysis,
+    sleep_high_water_mark,
+)
+from training_readiness.etl.stage_data.apple_health.load_resting_hr_data import (  # noqa: E402
+    RESTING_HR_TABLE,
+    collect_resting_hr_record,
+    process_resting_hr_data,
+    resting_hr_high_water_mark,
+    save_resting_hr_analysis,
+)
+from training_readiness.etl.stage_data.apple_health.load_hrv_data import (  # noqa: E402
+    collect_hrv_record,
+    hrv_high_water_mark,
+    merge_hrv_analysis,
+    process_hrv_data,
+    save_hrv_analysis,
+)
+
+# Registered metrics keyed by Apple Health record type
+METRICS = {}
+
+
+def register_metric(
+    name,
+    record_type,
+    collector,
+    processor,
+    saver,
+    key=None,
+    high_water_mark=None,
+    merge=None,
+    table=None,
+):
+    """
+    Register an Apple Health metric for single-pass extraction.
+
+    Args:
+        name: Short metric name used in output filenames (e.g. "sleep")
+        record_type: Apple Health Record type to collect
+        collector: Converts a Record's attributes into a row (or None to skip)
+        processor: Turns the collected rows into analysis output
+        saver: Writes the analysis output to a file
+        key: Output column identifying a row when merging incremental runs
+        high_water_mark: Returns the startDate an incremental run resumes
+            from, given the collected rows
+        merge: Merges incremental output into the stored results; defaults
+            to merge_analysis, which replaces stored rows by key
+        table: DuckDB table spec for --duckdb output (see apple_health_duckdb)
+    """
+    METRICS[record_type] = {
+        "name": name,
+        "collector": collector,
+        "processor": processor,
+        "saver": saver,
+        "key": key,
+        "high_water_mark": high_water_mark,
+        "merge": merge,
+        "table": table,
+    }
+
+
+register_metric(
+    "sleep",
+    SLEEP_ANALYSIS_TYPE,
+    collect_sleep_record,
+    process_sleep_data,
+    save_sleep_analysis,
+    key="Sleep_Start",
+    high_water_mark=sleep_high_water_mark,
+    table=SLEEP_ANALYSIS_TABLE,
+)
+register_metric(
+    "resting_hr",
+    RESTING_HEART_RATE_TYPE,
+    collect_resting_hr_record,
+    process_resting_hr_data,
+    save_resting_hr_analysis,
+    key="Resting_HR_Date",
+    high_water_mark=resting_hr_high_water_mark,
+    table=RESTING_HR_TABLE,
+)
+register_metric(
+    "hrv",
+    HRV_SDNN_TYPE,
+    collect_hrv_record,
+    process_hrv_data,
+    save_hrv_analysis,
+    key="HRV_Date",
+    high_water_mark=hrv_high_water_mark,
+    merge=merge_hrv_analysis,
+)
+
+
+def extract_apple_health_data(
+    xml_file_path, metrics=None, since=None, workers=None, cache_dir=None, scan=False
+):
+    """Extract all registered metrics from Apple Health XML export in one pass
+
+    ``since`` maps record types to high-water marks; older records are skipped.
+    With ``scan`` the records are located by a byte scan instead of an XML
+    parse; otherwise, with more than one worker the file is parsed in parallel
+    chunks. With a cache directory previously extracted rows of the same
+    export are reused.
+    """
+    metrics = METRICS if metrics is None else metrics
+    print(f"Reading Apple Health export from: {xml_file_path}")
+
+    if not os.path.exists(xml_file_path):
+        raise FileNotFoundError(f"XML file not found: {xml_file_path}")
+
+    collectors = {
+        record_type: metric["collector"] for record_type, metric in metrics.items()
+    }
+    if scan:
+        extract = extract_records_scanned
+    elif workers is not None and workers > 1:
+        extract = partial(extract_records_parallel, workers=workers)
+    else:
+        extract = extract_records
+
+    if cache_dir is not None:
+        results = extract_records_cached(
+            xml_file_path, collectors, cache_dir, since=since, extract=extract
+        )
+    else:
+        results = extract(xml_file_path, collectors, since=since)
+
+    for record_type, metric in metrics.items():
+        print(
+            f"Extracted {len(results[record_type])} {metric['name']} records from XML"
+        )
+
+    return results
+
+
+def process_apple_health_data(
+    results, output_dir, metrics=None, debug=False, incremental=False, database=None
+):
+    """Run each metric's processor on its extracted rows and save the output
+
+    In incremental mode the output is merged into the metric's stored results
+    instead of being written to a new timestamped file. With a database, the
+    output of metrics that have a table is upserted into it instead.
+    """
+    metrics = METRICS if metrics is None else metrics
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    output_files = {}
+
+    for record_type, metric in metrics.items():
+        rows = results.get(record_type)
+        if rows is None or len(rows) == 0:
+            print(f"No {metric['name']} data found in the XML export")
+            continue
+
+        output_data = metric["processor"](rows, debug=debug)
+        if len(output_data) == 0:
+            print(f"No valid {metric['name']} records found after processing")
+            continue
+
+        if database is not None and metric.get("table") is not None:
+            upsert_analysis(database, output_data, metric["table"])
+            output_files[record_type] = database
+            continue
+
+        if incremental:
+            output_file = os.path.join(
+                output_dir, f"apple_{metric['name']}_analysis.csv"
+            )
+            merge = metric.get("merge") or merge_analysis
+            output_data = merge(output_file, output_data, metric["key"])
+        else:
+            output_file = os.path.join(
+                output_dir, f"apple_{metric['name']}_analysis_{timestamp}.csv"
+            )
+        metric["saver"](output_data, output_file)
+        output_files[record_type] = output_file
+
+    return output_files
+
+
+def update_high_water_marks(results, marks, metrics=None):
+    """Advance the high-water mark of every metric that collected new rows"""
+    metrics = METRICS if metrics is None else metrics
+    updated = dict(marks or {})
+
+    for record_type, metric in metrics.items():
+        rows = results.get(record_type)
+        if rows is not None and len(rows) > 0 and metric["high_water_mark"] is not None:
+            mark = metric["high_water_mark"](rows)
+            if mark is not None:
+                updated[record_type] = mark
+
+    return updated
+
+
+def main(
+    debug=False, incremental=False, workers=None, cache=False, scan=False, database=None
+):
+    """Main function to process all registered Apple Health metrics"""
+    # Get the directory where this script is located
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+
+    # Read export.zip as delivered by the phone, or an unpacked export.xml
+    xml_file = find_export_file(os.path.join(script_dir, "raw"))
+    output_dir = os.path.join(script_dir, "cleaned")
+    os.makedirs(output_dir, exist_ok=True)
+
+    state_file = os.path.join(output_dir, STATE_FILE_NAME)
+    cache_dir = os.path.join(script_dir, "cache") if cache else None
+
+    try:
+        since = load_high_water_marks(state_file) if incremental else None
+
+        results = extract_apple_health_data(
+            xml_file, since=since, workers=workers, cache_dir=cache_dir, scan=scan
+        )
+        process_apple_health_data(
+            results,
+            output_dir,
+            debug=debug,
+            incremental=incremental,
+            database=database,
+        )
+
+        if incremental:
+            save_high_water_marks(state_file, update_high_water_marks(results, since))
+
+        print("Apple Health data processing completed successfully!")
+
+    except Exception as e:
+        print(f"Error processing Apple Health data: {str(e)}")
+        raise
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Process all Apple Health metrics from XML export in one pass"
+    )
+    add_debug_arguments(parser)
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only process records newer than the previous run and merge them",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Parse export.xml on this many processes (default: sequential)",
+    )
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="Reuse extracted records cached for the same export",
+    )
+    parser.add_argument(
+        "--scan",
+        action="store_true",
+        help="Scan export.xml for the registered record types instead of parsing XML",
+    )
+    parser.add_argument(
+        "--duckdb",
+        nargs="?",
+        const=DATABASE_PATH,
+        default=None,
+        metavar="DATABASE",
+        help="Upsert results into DuckDB tables instead of writing CSVs "
+        "(default database: stage_data/training_readiness.duckdb)",
+    )
+    args = parser.parse_args()
+
+    main(
+        debug=debug_options_from_args(args),
+        incremental=args.incremental,
+        workers=args.workers,
+        cache=args.cache,
+        scan=args.scan,
+        database=args.duckdb,
+    )
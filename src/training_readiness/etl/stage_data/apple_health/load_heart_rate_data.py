@@ -0,0 +1,302 @@
+"""
+load_heart_rate_data.py
+
+Loads Apple Health heart rate samples (HKQuantityTypeIdentifierHeartRate).
+- Per-minute aggregates -> cleaned/apple_heart_rate_minutes_<timestamp>.csv
+- Per-day aggregates and time in zones -> cleaned/apple_heart_rate_daily_<timestamp>.csv
+
+A multi-year export holds millions of samples, so they are not kept as row
+dictionaries. Samples are streamed in chunks whose dates are converted in one
+vectorized call and stored as compact arrays (int64 UTC seconds, int16 UTC
+offset minutes, float32 bpm), about 14 bytes per sample. Minute and daily
+aggregates are reduced straight from the sorted arrays (int32 local minutes,
+int8 zones and durations), without a per-sample DataFrame.
+
+Each sample counts toward its zone for the time until the next sample,
+capped at MAX_SAMPLE_GAP_SECONDS so that sparse resting samples do not
+stretch across gaps. Zones are fractions of the maximum heart rate (--max-hr).
+"""
+
+import numpy as np
+import pandas as pd
+from datetime import datetime
+import os
+import sys
+import argparse
+
+# Add the src directory to the path so we can import the module
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../../../../../src"))
+
+from training_readiness.etl.stage_data.apple_health.apple_health_parser import (  # noqa: E402
+    HEART_RATE_TYPE,
+    find_export_file,
+    iter_records,
+)
+from training_readiness.etl.timestamps import (  # noqa: E402
+    parse_apple_health_timestamps,
+)
+
+HEART_RATE_STAT_COLUMNS = [
+    "Heart_Rate_Min",
+    "Heart_Rate_Mean",
+    "Heart_Rate_Max",
+    "Heart_Rate_Count",
+]
+
+# Lower bound of zones 1-5 as a fraction of the maximum heart rate
+HEART_RATE_ZONES = (0.5, 0.6, 0.7, 0.8, 0.9)
+ZONE_COLUMNS = [f"Zone_{zone}_Minutes" for zone in range(1, len(HEART_RATE_ZONES) + 1)]
+
+HEART_RATE_MINUTE_COLUMNS = ["Heart_Rate_Minute"] + HEART_RATE_STAT_COLUMNS
+HEART_RATE_DAILY_COLUMNS = ["Heart_Rate_Date"] + HEART_RATE_STAT_COLUMNS + ZONE_COLUMNS
+
+DEFAULT_MAX_HEART_RATE = 190
+
+# Longest time a single sample is counted for in time-in-zone totals
+MAX_SAMPLE_GAP_SECONDS = 60
+
+# Samples converted to arrays at a time while streaming the export
+SAMPLE_CHUNK_SIZE = 100_000
+
+SAMPLE_DTYPES = {"utc_seconds": "int64", "offset_minutes": "int16", "bpm": "float32"}
+
+
+def compact_heart_rate_samples(start_dates, values):
+    """Convert a chunk of sample dates and values into compact arrays"""
+    local, utc = parse_apple_health_timestamps(start_dates)
+    local_seconds = local.to_numpy().astype("datetime64[s]").astype(np.int64)
+    utc_seconds = utc.dt.tz_localize(None).to_numpy().astype("datetime64[s]")
+    utc_seconds = utc_seconds.astype(np.int64)
+
+    return pd.DataFrame(
+        {
+            "utc_seconds": utc_seconds,
+            "offset_minutes": ((local_seconds - utc_seconds) // 60).astype(np.int16),
+            "bpm": np.asarray(values, dtype=np.float32),
+        }
+    )
+
+
+def extract_heart_rate_samples(xml_file_path, chunk_size=SAMPLE_CHUNK_SIZE):
+    """Stream heart rate samples from Apple Health XML export into compact arrays"""
+    print(f"Reading Apple Health export from: {xml_file_path}")
+
+    if not os.path.exists(xml_file_path):
+        raise FileNotFoundError(f"XML file not found: {xml_file_path}")
+
+    chunks = []
+    start_dates, values = [], []
+    for record in iter_records(xml_file_path, (HEART_RATE_TYPE,)):
+        start_date = record.get("startDate")
+        value = record.get("value")
+
+        # Only keep samples with a date and a value
+        if not (start_date and value):
+            continue
+
+        start_dates.append(start_date)
+        values.append(float(value))
+        if len(start_dates) >= chunk_size:
+            chunks.append(compact_heart_rate_samples(start_dates, values))
+            start_dates, values = [], []
+
+    if start_dates:
+        chunks.append(compact_heart_rate_samples(start_dates, values))
+
+    if chunks:
+        samples = pd.concat(chunks, ignore_index=True)
+    else:
+        samples = pd.DataFrame(
+            {column: pd.Series(dtype=dtype) for column, dtype in SAMPLE_DTYPES.items()}
+        )
+
+    print(f"Extracted {len(samples)} heart rate samples from XML")
+    return samples
+
+
+def heart_rate_zone_bounds(max_hr=DEFAULT_MAX_HEART_RATE):
+    """Lower bound in bpm of each heart rate zone"""
+    return np.array(HEART_RATE_ZONES) * max_hr
+
+
+def process_heart_rate_data(samples, max_hr=DEFAULT_MAX_HEART_RATE):
+    """
+    Aggregate heart rate samples per local minute and per local day.
+
+    Args:
+        samples: Compact samples from extract_heart_rate_samples
+        max_hr: Maximum heart rate the zones are relative to
+
+    Returns:
+        Tuple of (minute_data, daily_data) DataFrames
+    """
+    print("Processing heart rate data...")
+
+    if len(samples) == 0:
+        print("No heart rate data found in XML export")
+        return (
+            pd.DataFrame(columns=HEART_RATE_MINUTE_COLUMNS),
+            pd.DataFrame(columns=HEART_RATE_DAILY_COLUMNS),
+        )
+
+    # Sources (watch, phone, straps) interleave, so order samples in time
+    order = np.argsort(samples["utc_seconds"].to_numpy(), kind="stable")
+    utc_seconds = samples["utc_seconds"].to_numpy()[order]
+    offset_minutes = samples["offset_minutes"].to_numpy()[order]
+    bpm = samples["bpm"].to_numpy()[order]
+
+    # Each sample lasts until the next one, up to the maximum gap (in seconds)
+    gaps = np.diff(utc_seconds, append=utc_seconds[-1] + MAX_SAMPLE_GAP_SECONDS)
+    durations = np.minimum(gaps, MAX_SAMPLE_GAP_SECONDS).astype(np.int8)
+    del gaps
+
+    # Local minutes since the epoch fit in int32 until the year 6053
+    minutes = (utc_seconds // 60 + offset_minutes).astype(np.int32)
+    del utc_seconds, offset_minutes
+
+    # Zone 0 is below zone 1 and is not reported
+    zones = np.searchsorted(heart_rate_zone_bounds(max_hr), bpm, side="right")
+    zones = zones.astype(np.int8)
+
+    # A change of UTC offset (travel, DST) can put local minutes out of order
+    if np.any(minutes[1:] < minutes[:-1]):
+        order = np.argsort(minutes, kind="stable")
+        minutes, bpm = minutes[order], bpm[order]
+        durations, zones = durations[order], zones[order]
+    del order
+
+    # Minute aggregates over runs of equal minutes in the sorted arrays
+    minute_starts = run_starts(minutes)
+    minute_keys = minutes[minute_starts]
+    minute_stats = dict(
+        min=np.minimum.reduceat(bpm, minute_starts),
+        sum=np.add.reduceat(bpm, minute_starts, dtype=np.float64),
+        max=np.maximum.reduceat(bpm, minute_starts),
+        count=np.diff(minute_starts, append=len(bpm)),
+    )
+
+    # Days are runs of whole minutes, so they reduce the minute aggregates
+    minute_days = minute_keys // 1440
+    day_starts = run_starts(minute_days)
+    day_keys = minute_days[day_starts]
+    daily_stats = dict(
+        min=np.minimum.reduceat(minute_stats["min"], day_starts),
+        sum=np.add.reduceat(minute_stats["sum"], day_starts),
+        max=np.maximum.reduceat(minute_stats["max"], day_starts),
+        count=np.add.reduceat(minute_stats["count"], day_starts),
+    )
+
+    minute_data = summarize_heart_rate(minute_stats)
+    minute_data.insert(
+        0,
+        "Heart_Rate_Minute",
+        pd.to_datetime(minute_keys.astype(np.int64) * 60, unit="s").strftime(
+            "%m/%d/%Y %H:%M"
+        ),
+    )
+
+    daily_data = summarize_heart_rate(daily_stats)
+    daily_data.insert(
+        0,
+        "Heart_Rate_Date",
+        pd.to_datetime(day_keys.astype(np.int64) * 86400, unit="s").strftime(
+            "%m/%d/%Y"
+        ),
+    )
+
+    # Seconds in each (day, zone), counted in one pass over the samples
+    zone_count = len(HEART_RATE_ZONES) + 1
+    sample_days = np.searchsorted(day_keys, minutes // 1440).astype(np.int32)
+    zone_seconds = np.bincount(
+        sample_days * zone_count + zones,
+        weights=durations,
+        minlength=len(day_keys) * zone_count,
+    ).reshape(len(day_keys), zone_count)
+    for zone, column in enumerate(ZONE_COLUMNS, start=1):
+        daily_data[column] = np.round(zone_seconds[:, zone] / 60, 2)
+
+    print(
+        f"Processed {len(minute_data)} minutes and {len(daily_data)} days "
+        "of heart rate data"
+    )
+    return minute_data[HEART_RATE_MINUTE_COLUMNS], daily_data[HEART_RATE_DAILY_COLUMNS]
+
+
+def run_starts(keys):
+    """Index of the first element of each run of equal values in sorted keys"""
+    return np.flatnonzero(np.diff(keys, prepend=keys[0] - 1))
+
+
+def summarize_heart_rate(stats):
+    """Min, mean, max and sample count of bpm for each time bucket"""
+    return pd.DataFrame(
+        {
+            "Heart_Rate_Min": np.round(stats["min"].astype(np.float64), 1),
+            "Heart_Rate_Mean": np.round(stats["sum"] / stats["count"], 1),
+            "Heart_Rate_Max": np.round(stats["max"].astype(np.float64), 1),
+            "Heart_Rate_Count": stats["count"].astype(np.int64),
+        }
+    )
+
+
+def save_heart_rate_analysis(output_data, output_file="heart_rate_analysis.csv"):
+    """Save processed heart rate data to CSV file"""
+    print(f"Saving heart rate analysis to: {output_file}")
+
+    pd.DataFrame(output_data).to_csv(output_file, index=False)
+
+    print(f"Successfully saved {len(output_data)} heart rate rows to {output_file}")
+
+
+def main(max_hr=DEFAULT_MAX_HEART_RATE):
+    """Main function to process Apple Health heart rate samples"""
+    # Get the directory where this script is located
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+
+    # Read export.zip as delivered by the phone, or an unpacked export.xml
+    xml_file = find_export_file(os.path.join(script_dir, "raw"))
+
+    # Generate timestamped filenames
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    minute_file = os.path.join(
+        script_dir, f"cleaned/apple_heart_rate_minutes_{timestamp}.csv"
+    )
+    daily_file = os.path.join(
+        script_dir, f"cleaned/apple_heart_rate_daily_{timestamp}.csv"
+    )
+
+    try:
+        # Extract heart rate samples from XML
+        samples = extract_heart_rate_samples(xml_file)
+
+        if len(samples) == 0:
+            print("No heart rate data found in the XML export")
+            return
+
+        # Aggregate the samples per minute and per day
+        minute_data, daily_data = process_heart_rate_data(samples, max_hr=max_hr)
+
+        # Save the analysis
+        save_heart_rate_analysis(minute_data, minute_file)
+        save_heart_rate_analysis(daily_data, daily_file)
+
+        print("Heart rate data processing completed successfully!")
+
+    except Exception as e:
+        print(f"Error processing heart rate data: {str(e)}")
+        raise
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Process Apple Health heart rate samples from XML export"
+    )
+    parser.add_argument(
+        "--max-hr",
+        type=int,
+        default=DEFAULT_MAX_HEART_RATE,
+        help=f"Maximum heart rate for zones (default: {DEFAULT_MAX_HEART_RATE})",
+    )
+    args = parser.parse_args()
+
+    main(max_hr=args.max_hr)
@@ -0,0 +1,278 @@
+import numpy as np
+import pandas as pd
+from datetime import datetime
+import os
+import sys
+import argparse
+
+# Add the src directory to the path so we can import the module
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../../../../../src"))
+
+from training_readiness.etl.stage_data.apple_health.apple_health_cache import (  # noqa: E402
+    extract_records_cached,
+)
+from training_readiness.etl.stage_data.apple_health.apple_health_debug import (  # noqa: E402
+    add_debug_arguments,
+    debug_options_from_args,
+    write_debug_trace,
+)
+from training_readiness.etl.stage_data.apple_health.apple_health_scanner import (  # noqa: E402
+    extract_records_scanned,
+)
+from training_readiness.etl.stage_data.apple_health.apple_health_parser import (  # noqa: E402
+    HRV_SDNN_TYPE,
+    extract_records,
+    find_export_file,
+)
+from training_readiness.etl.stage_data.apple_health.apple_health_state import (  # noqa: E402
+    merge_analysis,
+)
+from training_readiness.etl.timestamps import (  # noqa: E402
+    parse_apple_health_timestamps,
+)
+
+HRV_COLUMNS = [
+    "HRV_Date",
+    "HRV_SDNN",
+    "HRV_Baseline_7d",
+    "HRV_Baseline_60d",
+    "HRV_Z_7d",
+    "HRV_Z_60d",
+]
+
+HRV_DATE_FORMAT = "%m/%d/%Y"
+
+# Columns of the --debug trace
+HRV_DEBUG_COLUMNS = ["start_date", "value", "unit"]
+
+# Rolling baselines: label -> (window in days, minimum days with readings).
+# Each baseline covers the days before the current one, so a day is scored
+# against its own history.
+HRV_BASELINE_WINDOWS = {"7d": (7, 3), "60d": (60, 14)}
+
+
+def collect_hrv_record(record):
+    """Convert the attributes of an HRV (SDNN) Record into a row"""
+    value = record.get("value")
+    unit = record.get("unit")
+
+    # Only process if we have a valid value
+    if not (value and unit):
+        return None
+
+    return {
+        "start_date": record.get("startDate"),
+        "end_date": record.get("endDate"),
+        "value": float(value),
+        "unit": unit,
+    }
+
+
+def extract_hrv_data_from_xml(xml_file_path, cache_dir=None, scan=False):
+    """Extract HRV (SDNN) data from Apple Health XML export"""
+    print(f"Reading Apple Health export from: {xml_file_path}")
+
+    if not os.path.exists(xml_file_path):
+        raise FileNotFoundError(f"XML file not found: {xml_file_path}")
+
+    collectors = {HRV_SDNN_TYPE: collect_hrv_record}
+    extract = extract_records_scanned if scan else extract_records
+    if cache_dir is not None:
+        results = extract_records_cached(
+            xml_file_path, collectors, cache_dir, extract=extract
+        )
+    else:
+        results = extract(xml_file_path, collectors)
+    hrv_data = results[HRV_SDNN_TYPE]
+
+    print(f"Extracted {len(hrv_data)} HRV records from XML")
+    return hrv_data
+
+
+def hrv_high_water_mark(hrv_data):
+    """Midnight of the latest reading's day, where an incremental run resumes"""
+    start_dates = pd.DataFrame(hrv_data).get("start_date")
+    if start_dates is None or start_dates.dropna().empty:
+        return None
+
+    # Re-collect the whole last day so its daily value is rebuilt in full
+    start_dates = start_dates.dropna()
+    _, start_utc = parse_apple_health_timestamps(start_dates)
+    latest = start_dates.iloc[start_utc.argmax()]
+    return f"{latest[:10]} 00:00:00{latest[19:]}"
+
+
+def add_hrv_baselines(daily_hrv):
+    """
+    Compute rolling baselines and z-scores for a daily HRV series.
+
+    Args:
+        daily_hrv: Daily SDNN values indexed by date; days without readings
+            are simply absent
+
+    Returns:
+        DataFrame in the HRV_COLUMNS layout, one row per day
+    """
+    daily_hrv = daily_hrv.sort_index()
+    output_data = pd.DataFrame(
+        {
+            "HRV_Date": daily_hrv.index.strftime(HRV_DATE_FORMAT),
+            "HRV_SDNN": daily_hrv.round(1).to_numpy(),
+        }
+    )
+
+    for label, (days, min_days) in HRV_BASELINE_WINDOWS.items():
+        window = daily_hrv.rolling(f"{days}D", closed="left", min_periods=min_days)
+        baseline = window.mean()
+        spread = window.std()
+        z_score = (daily_hrv - baseline) / spread.where(spread > 0)
+
+        output_data[f"HRV_Baseline_{label}"] = baseline.round(1).to_numpy()
+        output_data[f"HRV_Z_{label}"] = z_score.round(2).to_numpy()
+
+    return output_data[HRV_COLUMNS]
+
+
+def process_hrv_data(hrv_data, debug=False):
+    """Process raw HRV readings into daily values with rolling baselines"""
+    print("Processing HRV data...")
+
+    # Convert to DataFrame
+    df = pd.DataFrame(hrv_data)
+
+    if df.empty:
+        print("No HRV data found in XML export")
+        return pd.DataFrame(columns=HRV_COLUMNS)
+
+    # Extract the local date (without time) of each reading for grouping
+    start_local, start_utc = parse_apple_health_timestamps(df["start_date"])
+    df["date"] = start_local.dt.normalize()
+    df["start_utc"] = start_utc
+    df = df.sort_values("start_utc", kind="stable")
+
+    if debug:
+        write_debug_trace(df, "hrv_debug.jsonl", HRV_DEBUG_COLUMNS, debug)
+
+    # Apple records several SDNN readings per day; the daily value is their mean
+    daily_hrv = df.groupby("date", sort=True)["value"].mean()
+    output_data = add_hrv_baselines(daily_hrv)
+
+    print(f"Processed {len(output_data)} daily HRV records")
+    return output_data
+
+
+def merge_hrv_analysis(output_file, new_data, key="HRV_Date"):
+    """
+    Merge newly processed days into the stored HRV results.
+
+    Stored days before the first new day are kept as they are. Baselines and
+    z-scores are recomputed only for the new days, using the stored daily
+    values inside the longest baseline window as history.
+
+    Args:
+        output_file: Path to the stored CSV results
+        new_data: Output of process_hrv_data for the new readings
+        key: Date column of the HRV results
+
+    Returns:
+        Merged DataFrame to be written back to output_file
+    """
+    new_df = pd.DataFrame(new_data)
+    if not os.path.exists(output_file) or new_df.empty:
+        return merge_analysis(output_file, new_df, key)
+
+    stored = pd.read_csv(output_file, dtype={key: str})
+    stored_dates = pd.to_datetime(stored[key], format=HRV_DATE_FORMAT)
+    new_dates = pd.to_datetime(new_df[key], format=HRV_DATE_FORMAT)
+    first_new = new_dates.min()
+
+    kept = stored[(stored_dates < first_new).to_numpy()]
+    longest = max(days for days, _ in HRV_BASELINE_WINDOWS.values())
+    in_window = (stored_dates < first_new) & (
+        stored_dates >= first_new - pd.Timedelta(days=longest)
+    )
+
+    daily_hrv = pd.Series(
+        np.concatenate(
+            [
+                stored.loc[in_window.to_numpy(), "HRV_SDNN"].to_numpy(dtype=float),
+                new_df["HRV_SDNN"].to_numpy(dtype=float),
+            ]
+        ),
+        index=pd.DatetimeIndex(
+            np.concatenate([stored_dates[in_window].to_numpy(), new_dates.to_numpy()])
+        ),
+    )
+    recomputed = add_hrv_baselines(daily_hrv).iloc[in_window.sum() :]
+
+    print(f"Merging {len(recomputed)} new days into {len(kept)} stored days")
+    return pd.concat([kept, recomputed], ignore_index=True)
+
+
+def save_hrv_analysis(output_data, output_file="hrv_analysis.csv"):
+    """Save processed HRV data to CSV file"""
+    print(f"Saving HRV analysis to: {output_file}")
+
+    pd.DataFrame(output_data, columns=HRV_COLUMNS).to_csv(output_file, index=False)
+
+    print(f"Successfully saved {len(output_data)} HRV records to {output_file}")
+
+
+def main(debug=False, cache=False, scan=False):
+    """Main function to process Apple Health HRV data"""
+    # Get the directory where this script is located
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+
+    # Read export.zip as delivered by the phone, or an unpacked export.xml
+    xml_file = find_export_file(os.path.join(script_dir, "raw"))
+
+    # Generate timestamped filename
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    output_file = os.path.join(
+        script_dir, f"cleaned/apple_hrv_analysis_{timestamp}.csv"
+    )
+
+    try:
+        # Extract HRV data from XML
+        cache_dir = os.path.join(script_dir, "cache") if cache else None
+        hrv_data = extract_hrv_data_from_xml(xml_file, cache_dir=cache_dir, scan=scan)
+
+        if len(hrv_data) == 0:
+            print("No HRV data found in the XML export")
+            return
+
+        # Process the HRV data
+        output_data = process_hrv_data(hrv_data, debug=debug)
+
+        if output_data.empty:
+            print("No valid HRV records found after processing")
+            return
+
+        # Save the analysis
+        save_hrv_analysis(output_data, output_file)
+
+        print("HRV data processing completed successfully!")
+
+    except Exception as e:
+        print(f"Error processing HRV data: {str(e)}")
+        raise
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Process Apple Health HRV (SDNN) data from XML export"
+    )
+    add_debug_arguments(parser)
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="Reuse extracted records cached for the same export",
+    )
+    parser.add_argument(
+        "--scan",
+        action="store_true",
+        help="Scan export.xml for the needed record types instead of parsing XML",
+    )
+    args = parser.parse_args()
+
+    main(debug=debug_options_from_args(args), cache=args.cache, scan=args.scan)
@@ -1,132 +1,210 @@
-import xml.etree.ElementTree as ET
 import pandas as pd
 from datetime import datetime
-import csv
 import os
+import sys
 import argparse
 
+# Add the src directory to the path so we can import the module
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../../../../../src"))
+
+from training_readiness.etl.stage_data.apple_health.apple_health_cache import (  # noqa: E402
+    extract_records_cached,
+)
+from training_readiness.etl.stage_data.apple_health.apple_health_debug import (  # noqa: E402
+    add_debug_arguments,
+    debug_options_from_args,
+    write_debug_trace,
+)
+from training_readiness.etl.stage_data.apple_health.apple_health_duckdb import (  # noqa: E402
+    DATABASE_PATH,
+    upsert_analysis,
+)
+from training_readiness.etl.stage_data.apple_health.apple_health_scanner import (  # noqa: E402
+    extract_records_scanned,
+)
+from training_readiness.etl.stage_data.apple_health.apple_health_parser import (  # noqa: E402
+    RESTING_HEART_RATE_TYPE,
+    extract_records,
+    find_export_file,
+)
+from training_readiness.etl.timestamps import (  # noqa: E402
+    parse_apple_health_timestamps,
+)
+
+RESTING_HR_COLUMNS = ["Resting_HR_Date", "Resting_HR_Value"]
+
+# Daily statistics: reducer name -> (output column, pandas aggregation)
+RESTING_HR_REDUCERS = {
+    "last": ("Resting_HR_Value", "last"),
+    "min": ("Resting_HR_Min", "min"),
+    "max": ("Resting_HR_Max", "max"),
+    "mean": ("Resting_HR_Mean", "mean"),
+    "count": ("Resting_HR_Count", "count"),
+}
+
+# Columns of the --debug trace
+RESTING_HR_DEBUG_COLUMNS = ["start_date", "value", "unit"]
+
+# DuckDB table for --duckdb output; columns of reducers not run stay NULL
+RESTING_HR_TABLE = {
+    "table": "apple_resting_hr",
+    "key": "resting_hr_date",
+    "columns": {
+        "Resting_HR_Date": ("resting_hr_date", "DATE"),
+        "Resting_HR_Value": ("resting_hr_value", "DOUBLE"),
+        "Resting_HR_Min": ("resting_hr_min", "DOUBLE"),
+        "Resting_HR_Max": ("resting_hr_max", "DOUBLE"),
+        "Resting_HR_Mean": ("resting_hr_mean", "DOUBLE"),
+        "Resting_HR_Count": ("resting_hr_count", "INTEGER"),
+    },
+}
+
 
 def format_datetime(dt):
     """Format datetime as MM/DD/YYYY HH:MM:SS"""
     return dt.strftime("%m/%d/%Y %H:%M:%S")
 
 
-def extract_resting_hr_data_from_xml(xml_file_path):
+def collect_resting_hr_record(record):
+    """Convert the attributes of a resting heart rate Record into a row"""
+    value = record.get("value")
+    unit = record.get("unit")
+
+    # Only process if we have a valid value
+    if not (value and unit):
+        return None
+
+    return {
+        "start_date": record.get("startDate"),
+        "end_date": record.get("endDate"),
+        "value": float(value),
+        "unit": unit,
+    }
+
+
+def extract_resting_hr_data_from_xml(xml_file_path, cache_dir=None, scan=False):
     """Extract resting heart rate data from Apple Health XML export"""
     print(f"Reading Apple Health export from: {xml_file_path}")
 
     if not os.path.exists(xml_file_path):
         raise FileNotFoundError(f"XML file not found: {xml_file_path}")
 
-    tree = ET.parse(xml_file_path)
-    root = tree.getroot()
-
-    resting_hr_data = []
-
-    for record in root.iter("Record"):
-        if record.attrib.get("type") == "HKQuantityTypeIdentifierRestingHeartRate":
-            start_date = record.attrib.get("startDate")
-            end_date = record.attrib.get("endDate")
-            value = record.attrib.get("value")
-            unit = record.attrib.get("unit")
-
-            # Only process if we have a valid value
-            if value and unit:
-                resting_hr_data.append(
-                    {
-                        "start_date": start_date,
-                        "end_date": end_date,
-                        "value": float(value),
-                        "unit": unit,
-                    }
-                )
+    collectors = {RESTING_HEART_RATE_TYPE: collect_resting_hr_record}
+    extract = extract_records_scanned if scan else extract_records
+    if cache_dir is not None:
+        results = extract_records_cached(
+            xml_file_path, collectors, cache_dir, extract=extract
+        )
+    else:
+        results = extract(xml_file_path, collectors)
+    resting_hr_data = results[RESTING_HEART_RATE_TYPE]
 
     print(f"Extracted {len(resting_hr_data)} resting heart rate records from XML")
     return resting_hr_data
 
 
-def write_debug_log(df, debug_file):
-    """Write debug information to file for troubleshooting data processing"""
-    debug_file.write("Debug: Resting Heart Rate Processing Details\n")
-    debug_file.write("===========================================\n")
+def resting_hr_high_water_mark(resting_hr_data):
+    """Midnight of the latest reading's day, where an incremental run resumes"""
+    start_dates = pd.DataFrame(resting_hr_data).get("start_date")
+    if start_dates is None or start_dates.dropna().empty:
+        return None
+
+    # Re-collect the whole last day so daily statistics are rebuilt in full
+    start_dates = start_dates.dropna()
+    _, start_utc = parse_apple_health_timestamps(start_dates)
+    latest = start_dates.iloc[start_utc.argmax()]
+    return f"{latest[:10]} 00:00:00{latest[19:]}"
 
-    for idx, row in df.iterrows():
-        debug_file.write(f"\nRecord {idx}:\n")
-        debug_file.write(f"Date: {row['date']}\n")
-        debug_file.write(f"Value: {row['value']} {row['unit']}\n")
-        debug_file.write(f"Time: {row['start_date']}\n")
 
-    return df
+def process_resting_hr_data(resting_hr_data, debug=False, reducers=("last",)):
+    """
+    Process raw resting heart rate data into structured analysis format.
 
+    Args:
+        resting_hr_data: Rows from extract_resting_hr_data_from_xml
+        debug: Write a JSON Lines trace of the sorted records; True or
+            options from apple_health_debug.debug_options
+        reducers: Daily statistics to compute (keys of RESTING_HR_REDUCERS),
+            each becoming one output column from the same groupby pass. The
+            default "last" keeps the latest reading of each day.
 
-def process_resting_hr_data(resting_hr_data, debug=False):
-    """Process raw resting heart rate data into structured analysis format"""
+    Returns:
+        DataFrame with one row per day
+
+    Raises:
+        ValueError: If an unknown reducer is requested
+    """
     print("Processing resting heart rate data...")
 
+    unknown = [reducer for reducer in reducers if reducer not in RESTING_HR_REDUCERS]
+    if unknown:
+        raise ValueError(
+            f"Unknown resting heart rate reducers: {', '.join(unknown)}. "
+            f"Choose from: {', '.join(RESTING_HR_REDUCERS)}"
+        )
+    columns = ["Resting_HR_Date"] + [
+        RESTING_HR_REDUCERS[reducer][0] for reducer in reducers
+    ]
+
     # Convert to DataFrame
     df = pd.DataFrame(resting_hr_data)
 
     if df.empty:
         print("No resting heart rate data found in XML export")
-        return []
+        return pd.DataFrame(columns=columns)
 
-    # Convert date strings to datetime objects
-    df["start_date"] = pd.to_datetime(df["start_date"])
-    df["end_date"] = pd.to_datetime(df["end_date"])
+    # Parse the fixed-format start dates once for the whole column
+    start_local, start_utc = parse_apple_health_timestamps(df["start_date"])
 
-    # Extract date (without time) for grouping
-    df["date"] = df["start_date"].dt.date
+    # Extract the local date (without time) of each reading for grouping
+    df["date"] = start_local.dt.normalize()
+    df["start_utc"] = start_utc
 
-    # Sort by start date (most recent first within each date)
-    df = df.sort_values("start_date", ascending=False)
+    # Sort by start date so "last" is the latest entry of each day
+    df = df.sort_values("start_utc", kind="stable")
 
     if debug:
-        # Open debug file for troubleshooting
-        with open("resting_hr_debug.txt", "w") as debug_file:
-            df = write_debug_log(df, debug_file)
+        write_debug_trace(df, "resting_hr_debug.jsonl", RESTING_HR_DEBUG_COLUMNS, debug)
 
-    # Group by date and take the last entry of each day (which will be first due to descending sort)
-    daily_hr_data = df.groupby("date").first().reset_index()
-
-    # Sort by date for final output
-    daily_hr_data = daily_hr_data.sort_values("date")
+    daily_hr_data = df.groupby("date", sort=True)["value"].agg(
+        [RESTING_HR_REDUCERS[reducer][1] for reducer in reducers]
+    )
 
     # Convert to output format
-    output_data = []
-    for _, row in daily_hr_data.iterrows():
-        output_data.append(
-            {
-                "Resting_HR_Date": row["date"].strftime("%m/%d/%Y"),
-                "Resting_HR_Value": round(row["value"], 1),
-            }
-        )
+    output_data = pd.DataFrame(
+        {"Resting_HR_Date": daily_hr_data.index.strftime("%m/%d/%Y")}
+    )
+    for reducer in reducers:
+        column, func = RESTING_HR_REDUCERS[reducer]
+        values = daily_hr_data[func].to_numpy()
+        output_data[column] = values if func == "count" else values.round(1)
 
     print(f"Processed {len(output_data)} daily resting heart rate records")
-    return output_data
+    return output_data[columns]
 
 
 def save_resting_hr_analysis(output_data, output_file="resting_hr_analysis.csv"):
     """Save processed resting heart rate data to CSV file"""
     print(f"Saving resting heart rate analysis to: {output_file}")
 
-    fieldnames = ["Resting_HR_Date", "Resting_HR_Value"]
-
-    with open(output_file, "w", newline="") as csvfile:
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(output_data)
+    # Accepts the DataFrame from process_resting_hr_data or a list of row dicts
+    output_df = pd.DataFrame(output_data)
+    if output_df.empty:
+        output_df = pd.DataFrame(output_data, columns=RESTING_HR_COLUMNS)
+    output_df.to_csv(output_file, index=False)
 
     print(
         f"Successfully saved {len(output_data)} resting heart rate records to {output_file}"
     )
 
 
-def main(debug=False):
+def main(debug=False, reducers=("last",), cache=False, scan=False, database=None):
     """Main function to process Apple Health resting heart rate data"""
     # Get the directory where this script is located
     script_dir = os.path.dirname(os.path.abspath(__file__))
 
-    xml_file = os.path.join(script_dir, "raw/apple_health_export/export.xml")
+    # Read export.zip as delivered by the phone, or an unpacked export.xml
+    xml_file = find_export_file(os.path.join(script_dir, "raw"))
 
     # Generate timestamped filename
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -136,21 +214,29 @@ def main(debug=False):
 
     try:
         # Extract resting heart rate data from XML
-        resting_hr_data = extract_resting_hr_data_from_xml(xml_file)
+        cache_dir = os.path.join(script_dir, "cache") if cache else None
+        resting_hr_data = extract_resting_hr_data_from_xml(
+            xml_file, cache_dir=cache_dir, scan=scan
+        )
 
-        if not resting_hr_data:
+        if len(resting_hr_data) == 0:
             print("No resting heart rate data found in the XML export")
             return
 
         # Process the resting heart rate data
-        output_data = process_resting_hr_data(resting_hr_data, debug=debug)
+        output_data = process_resting_hr_data(
+            resting_hr_data, debug=debug, reducers=reducers
+        )
 
-        if not output_data:
+        if output_data.empty:
             print("No valid resting heart rate records found after processing")
             return
 
         # Save the analysis
-        save_resting_hr_analysis(output_data, output_file)
+        if database is not None:
+            upsert_analysis(database, output_data, RESTING_HR_TABLE)
+        else:
+            save_resting_hr_analysis(output_data, output_file)
 
         print("Resting heart rate data processing completed successfully!")
 
@@ -163,11 +249,39 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(
         description="Process Apple Health resting heart rate data from XML export"
     )
+    add_debug_arguments(parser)
+    parser.add_argument(
+        "--stats",
+        nargs="+",
+        choices=list(RESTING_HR_REDUCERS),
+        default=["last"],
+        help="Daily statistics to compute in one pass (default: last)",
+    )
     parser.add_argument(
-        "--debug",
+        "--cache",
         action="store_true",
-        help="Enable debug mode to generate detailed logging",
+        help="Reuse extracted records cached for the same export",
+    )
+    parser.add_argument(
+        "--scan",
+        action="store_true",
+        help="Scan export.xml for the needed record types instead of parsing XML",
+    )
+    parser.add_argument(
+        "--duckdb",
+        nargs="?",
+        const=DATABASE_PATH,
+        default=None,
+        metavar="DATABASE",
+        help="Upsert results into a DuckDB table instead of writing a CSV "
+        "(default database: stage_data/training_readiness.duckdb)",
     )
     args = parser.parse_args()
 
-    main(debug=args.debug)
+    main(
+        debug=debug_options_from_args(args),
+        reducers=args.stats,
+        cache=args.cache,
+        scan=args.scan,
+        database=args.duckdb,
+    )
@@ -1,215 +1,432 @@
-import xml.etree.ElementTree as ET
+import heapq
+import numpy as np
 import pandas as pd
 from datetime import datetime
-import csv
 import os
+import sys
 import argparse
 
+# Add the src directory to the path so we can import the module
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../../../../../src"))
+
+from training_readiness.etl.stage_data.apple_health.apple_health_cache import (  # noqa: E402
+    extract_records_cached,
+)
+from training_readiness.etl.stage_data.apple_health.apple_health_debug import (  # noqa: E402
+    add_debug_arguments,
+    debug_options_from_args,
+    write_debug_trace,
+)
+from training_readiness.etl.stage_data.apple_health.apple_health_duckdb import (  # noqa: E402
+    DATABASE_PATH,
+    upsert_analysis,
+)
+from training_readiness.etl.stage_data.apple_health.apple_health_scanner import (  # noqa: E402
+    extract_records_scanned,
+)
+from training_readiness.etl.stage_data.apple_health.apple_health_parser import (  # noqa: E402
+    SLEEP_ANALYSIS_TYPE,
+    extract_records,
+    find_export_file,
+)
+from training_readiness.etl.stage_data.apple_health.apple_health_sources import (  # noqa: E402
+    SOURCE_PRIORITY,
+    source_ranks,
+)
+from training_readiness.etl.timestamps import (  # noqa: E402
+    parse_apple_health_timestamps,
+)
+
+SLEEP_ANALYSIS_COLUMNS = [
+    "Sleep_Date",
+    "Total_Time_Asleep",
+    "Total_Deep_Sleep",
+    "Total_Core_Sleep",
+    "Total_REM_Sleep",
+    "Total_Awake_Time",
+    "Sleep_Start",
+    "Sleep_End",
+]
+
+# DuckDB table for --duckdb output, keyed by session start (naps share a date)
+SLEEP_ANALYSIS_TABLE = {
+    "table": "apple_sleep_sessions",
+    "key": "sleep_start",
+    "columns": {
+        "Sleep_Date": ("sleep_date", "DATE"),
+        "Total_Time_Asleep": ("total_time_asleep", "DOUBLE"),
+        "Total_Deep_Sleep": ("total_deep_sleep", "DOUBLE"),
+        "Total_Core_Sleep": ("total_core_sleep", "DOUBLE"),
+        "Total_REM_Sleep": ("total_rem_sleep", "DOUBLE"),
+        "Total_Awake_Time": ("total_awake_time", "DOUBLE"),
+        "Sleep_Start": ("sleep_start", "TIMESTAMP"),
+        "Sleep_End": ("sleep_end", "TIMESTAMP"),
+    },
+}
+
+DATETIME_FORMAT = "%m/%d/%Y %H:%M:%S"
+
+# Columns of the --debug trace, enough to follow session grouping; the raw
+# dates already carry their offsets, so parsed timestamps are left out
+SLEEP_DEBUG_COLUMNS = [
+    "start_date",
+    "end_date",
+    "sleep_type",
+    "source_name",
+    "gap_minutes",
+    "session",
+]
+
 
 def format_datetime(dt):
     """Format datetime as MM/DD/YYYY HH:MM:SS"""
-    return dt.strftime("%m/%d/%Y %H:%M:%S")
+    return dt.strftime(DATETIME_FORMAT)
+
+
+def collect_sleep_record(record):
+    """Convert the attributes of a sleep analysis Record into a sleep row"""
+    return {
+        "start_date": record.get("startDate"),
+        "end_date": record.get("endDate"),
+        "sleep_type": record.get("value"),
+        "source_name": record.get("sourceName"),
+    }
 
 
-def extract_sleep_data_from_xml(xml_file_path):
+def extract_sleep_data_from_xml(xml_file_path, cache_dir=None, scan=False):
     """Extract sleep data from Apple Health XML export"""
     print(f"Reading Apple Health export from: {xml_file_path}")
 
     if not os.path.exists(xml_file_path):
         raise FileNotFoundError(f"XML file not found: {xml_file_path}")
 
-    tree = ET.parse(xml_file_path)
-    root = tree.getroot()
-
-    sleep_data = []
-
-    for record in root.iter("Record"):
-        if record.attrib.get("type") == "HKCategoryTypeIdentifierSleepAnalysis":
-            start_date = record.attrib.get("startDate")
-            end_date = record.attrib.get("endDate")
-            sleep_type = record.attrib.get("value")
-            sleep_data.append(
-                {
-                    "start_date": start_date,
-                    "end_date": end_date,
-                    "sleep_type": sleep_type,
-                }
-            )
+    collectors = {SLEEP_ANALYSIS_TYPE: collect_sleep_record}
+    extract = extract_records_scanned if scan else extract_records
+    if cache_dir is not None:
+        results = extract_records_cached(
+            xml_file_path, collectors, cache_dir, extract=extract
+        )
+    else:
+        results = extract(xml_file_path, collectors)
+    sleep_data = results[SLEEP_ANALYSIS_TYPE]
 
     print(f"Extracted {len(sleep_data)} sleep records from XML")
     return sleep_data
 
 
-def write_debug_log(df, debug_file):
-    """Write debug information to file for troubleshooting session grouping"""
-    debug_file.write("Debug: Session Grouping Details\n")
-    debug_file.write("==============================\n")
-
-    current_session = 0
-    session_groups = []
-    last_end = None
-
-    for idx, row in df.iterrows():
-        debug_file.write(f"\nRecord {idx}:\n")
-        debug_file.write(f"Start: {row['start_date']}\n")
-        debug_file.write(f"End: {row['end_date']}\n")
-        debug_file.write(f"Type: {row['sleep_type']}\n")
-        if last_end is not None:
-            debug_file.write(f"Last End: {last_end}\n")
-            debug_file.write(
-                f"Time diff: {(row['start_date'] - last_end).total_seconds() / 60:.2f} minutes\n"
-            )
-
-        # Start a new session if:
-        # 1. This is the first record
-        # 2. There's a gap between the end of the last record and start of this one
-        if last_end is None or row["start_date"] > last_end:
-            current_session += 1
-            debug_file.write(f"Creating new session: {current_session}\n")
+def sleep_high_water_mark(sleep_data):
+    """Start date of the last sleep session, where an incremental run resumes"""
+    df = pd.DataFrame(sleep_data)
+    if df.empty:
+        return None
+
+    df = df[~df["sleep_type"].str.endswith("InBed")]
+    if df.empty:
+        return None
+
+    # Order records the same way process_sleep_data does before grouping
+    df = resolve_sleep_overlaps(add_sleep_timestamps(df))
+    sessions = assign_sleep_sessions(df["start_utc"], df["end_utc"])
+
+    return df["start_date"].to_numpy()[sessions == sessions[-1]][0]
+
+
+def add_sleep_timestamps(df):
+    """Add wall-clock and UTC columns parsed from the start and end dates"""
+    start_local, start_utc = parse_apple_health_timestamps(df["start_date"])
+    end_local, end_utc = parse_apple_health_timestamps(df["end_date"])
+    return df.assign(
+        start_local=start_local,
+        start_utc=start_utc,
+        end_local=end_local,
+        end_utc=end_utc,
+    )
+
+
+def sweep_sleep_intervals(start, end, ranks):
+    """
+    Split overlapping intervals into pieces covered by a single interval.
+
+    A sweep over the sorted interval boundaries keeps the active intervals
+    in a heap ordered by (rank, position), so at every point in time the
+    best-ranked interval, or the earliest of equal rank, owns the time.
+
+    Args:
+        start: Interval starts as integers, sorted ascending
+        end: Interval ends as integers
+        ranks: Rank of each interval; lower ranks win
+
+    Returns:
+        Tuple of (positions, piece starts, piece ends) arrays, where each
+        piece belongs to the interval at that position
+    """
+    start, end, ranks = start.tolist(), end.tolist(), ranks.tolist()
+    boundaries = sorted(set(start) | set(end))
+
+    positions, piece_starts, piece_ends = [], [], []
+    active = []
+    next_position = 0
+    for left, right in zip(boundaries[:-1], boundaries[1:]):
+        while next_position < len(start) and start[next_position] <= left:
+            heapq.heappush(active, (ranks[next_position], next_position))
+            next_position += 1
+        # Intervals that have ended are dropped once they reach the top
+        while active and end[active[0][1]] <= left:
+            heapq.heappop(active)
+        if not active:
+            continue
+
+        position = active[0][1]
+        if positions and positions[-1] == position and piece_ends[-1] == left:
+            piece_ends[-1] = right
         else:
-            debug_file.write(f"Continuing session: {current_session}\n")
+            positions.append(position)
+            piece_starts.append(left)
+            piece_ends.append(right)
+
+    return (
+        np.array(positions, dtype=np.int64),
+        np.array(piece_starts, dtype=np.int64),
+        np.array(piece_ends, dtype=np.int64),
+    )
 
-        session_groups.append(current_session)
-        last_end = row["end_date"]
 
-    return session_groups
+def resolve_sleep_overlaps(df, source_priority=SOURCE_PRIORITY):
+    """
+    Clip overlapping sleep records so that no time is counted twice.
+
+    A watch and a sleep app often record the same night. Where records
+    overlap, the time is kept for the record of the preferred source and
+    cut out of the others, which may split a record into several pieces.
+    Only clusters of overlapping records are swept; the rest pass through.
+
+    Args:
+        df: Sleep records with the columns of add_sleep_timestamps
+        source_priority: Source name fragments in order of preference
+
+    Returns:
+        Non-overlapping records sorted by start, with a fresh index
+
+    Raises:
+        ValueError: If records overlap but carry no source names to rank
+    """
+    df = df.sort_values("start_utc", kind="stable").reset_index(drop=True)
+    if len(df) < 2:
+        return df
+
+    start = df["start_utc"].to_numpy(dtype="datetime64[ns]").view(np.int64)
+    end = df["end_utc"].to_numpy(dtype="datetime64[ns]").view(np.int64)
+
+    # Records that start before every earlier record has ended overlap;
+    # a cluster is a run of records chained together by overlaps
+    overlaps = np.zeros(len(df), dtype=bool)
+    overlaps[1:] = start[1:] < np.maximum.accumulate(end)[:-1]
+    if not overlaps.any():
+        return df
+
+    clusters = np.cumsum(~overlaps)
+    in_overlap = np.isin(clusters, clusters[overlaps])
+    overlapping = np.flatnonzero(in_overlap)
+
+    if "source_name" not in df.columns:
+        raise ValueError("Overlapping sleep records need a source_name column")
+    ranks = source_ranks(df["source_name"], source_priority)
+    positions, piece_start, piece_end = sweep_sleep_intervals(
+        start[overlapping], end[overlapping], ranks[overlapping]
+    )
 
+    pieces = df.iloc[overlapping[positions]].reset_index(drop=True)
+    start_shift = pd.to_timedelta(piece_start - start[overlapping][positions])
+    end_shift = pd.to_timedelta(piece_end - end[overlapping][positions])
+    pieces["start_utc"] += start_shift
+    pieces["start_local"] += start_shift
+    pieces["end_utc"] += end_shift
+    pieces["end_local"] += end_shift
 
-def process_sleep_data(sleep_data, debug=False):
-    """Process raw sleep data into structured analysis format"""
-    print("Processing sleep data...")
+    resolved = pd.concat([df[~in_overlap], pieces], ignore_index=True)
+    return resolved.sort_values("start_utc", kind="stable").reset_index(drop=True)
 
-    # Convert to DataFrame
-    df = pd.DataFrame(sleep_data)
 
-    if df.empty:
-        print("No sleep data found in XML export")
-        return []
+def assign_sleep_sessions(start_dates, end_dates):
+    """Assign a session number to each sleep record sorted by start date"""
+    start = pd.to_datetime(pd.Series(start_dates), utc=True).to_numpy()
+    end = pd.to_datetime(pd.Series(end_dates), utc=True).to_numpy()
+
+    # Start a new session if:
+    # 1. This is the first record
+    # 2. There's a gap between the end of the last record and start of this one
+    new_session = np.ones(len(start), dtype=bool)
+    new_session[1:] = start[1:] > end[:-1]
+
+    return np.cumsum(new_session)
 
+
+def build_sleep_sessions(df, source_priority=SOURCE_PRIORITY):
+    """Parse and deduplicate sleep records and number their sessions"""
     # Filter out InBed records
     df = df[~df["sleep_type"].str.endswith("InBed")]
 
-    # Convert date strings to datetime objects
-    df["start_date"] = pd.to_datetime(df["start_date"])
-    df["end_date"] = pd.to_datetime(df["end_date"])
+    # Parse the fixed-format date columns: UTC orders records and measures
+    # durations, the wall-clock times are reported
+    df = add_sleep_timestamps(df)
 
-    # Sort by start date
-    df = df.sort_values("start_date")
+    # Clip overlaps between sources, then sort by start date
+    df = resolve_sleep_overlaps(df, source_priority)
 
     # Group records into sleep sessions
-    if debug:
-        # Open debug file for troubleshooting
-        with open("sleep_debug.txt", "w") as debug_file:
-            session_groups = write_debug_log(df, debug_file)
-    else:
-        # Simple session grouping without debug output
-        current_session = 0
-        session_groups = []
-        last_end = None
-
-        for _, row in df.iterrows():
-            # Start a new session if:
-            # 1. This is the first record
-            # 2. There's a gap between the end of the last record and start of this one
-            if last_end is None or row["start_date"] > last_end:
-                current_session += 1
-
-            session_groups.append(current_session)
-            last_end = row["end_date"]
-
-    df["session"] = session_groups
-
-    # Identify sessions to exclude (those containing Unspecified sleep type)
-    sessions_to_exclude = df[df["sleep_type"].str.contains("Unspecified")][
-        "session"
-    ].unique()
-
-    # Process each sleep session
-    output_data = []
-    for session in df["session"].unique():
-        # Skip sessions that contain Unspecified sleep type
-        if session in sessions_to_exclude:
-            continue
+    df["session"] = assign_sleep_sessions(df["start_utc"], df["end_utc"])
+    return df
+
+
+def unspecified_sleep_sessions(df):
+    """Sessions holding an Unspecified record, which are not reported"""
+    unspecified = df["sleep_type"].str.contains("Unspecified", regex=False)
+    return df.loc[unspecified, "session"].unique()
+
+
+def sleep_session_windows(df):
+    """
+    Time span of each sleep session reported by process_sleep_data.
+
+    Args:
+        df: Records with session numbers from build_sleep_sessions
+
+    Returns:
+        DataFrame with one row per reported session, sorted by start: the
+        session number, its first start and last end in UTC, and the
+        Sleep_Date and Sleep_Start it is reported under by process_sleep_data
+    """
+    df = df[~df["session"].isin(unspecified_sleep_sessions(df))]
+    windows = (
+        df.groupby("session", sort=True)
+        .agg(
+            start_utc=("start_utc", "min"),
+            end_utc=("end_utc", "max"),
+            first_record=("start_utc", "idxmin"),
+        )
+        .reset_index()
+    )
+    sleep_start = df.loc[windows["first_record"], "start_local"]
+
+    windows["Sleep_Date"] = sleep_start.dt.strftime("%m/%d/%Y").values
+    windows["Sleep_Start"] = sleep_start.dt.strftime(DATETIME_FORMAT).values
+    return windows.drop(columns="first_record")
+
+
+def process_sleep_data(sleep_data, debug=False, source_priority=SOURCE_PRIORITY):
+    """Process raw sleep data into structured analysis format
 
-        session_df = df[df["session"] == session]
-
-        # Get the earliest start and latest end time for this session
-        sleep_start = session_df["start_date"].min()
-        sleep_end = session_df["end_date"].max()
-
-        # Determine sleep date (date of the earliest record)
-        sleep_date = sleep_start.date()
-
-        # Initialize sleep type totals
-        total_asleep = 0
-        total_deep = 0
-        total_core = 0
-        total_rem = 0
-        total_awake = 0
-
-        # Calculate totals for each sleep type
-        for _, row in session_df.iterrows():
-            duration = (
-                row["end_date"] - row["start_date"]
-            ).total_seconds() / 3600  # in hours
-
-            if "Asleep" in row["sleep_type"]:
-                total_asleep += duration
-                if "Deep" in row["sleep_type"]:
-                    total_deep += duration
-                elif "Core" in row["sleep_type"]:
-                    total_core += duration
-                elif "REM" in row["sleep_type"]:
-                    total_rem += duration
-            elif "Awake" in row["sleep_type"]:
-                total_awake += duration
-
-        output_data.append(
-            {
-                "Sleep_Date": sleep_date.strftime("%m/%d/%Y"),
-                "Total_Time_Asleep": round(total_asleep, 2),
-                "Total_Deep_Sleep": round(total_deep, 2),
-                "Total_Core_Sleep": round(total_core, 2),
-                "Total_REM_Sleep": round(total_rem, 2),
-                "Total_Awake_Time": round(total_awake, 2),
-                "Sleep_Start": format_datetime(sleep_start),
-                "Sleep_End": format_datetime(sleep_end),
-            }
+    Overlapping records from several sources are resolved by source_priority
+    before sessions and totals are computed.
+    """
+    print("Processing sleep data...")
+
+    # Convert to DataFrame
+    df = pd.DataFrame(sleep_data)
+
+    if df.empty:
+        print("No sleep data found in XML export")
+        return pd.DataFrame(columns=SLEEP_ANALYSIS_COLUMNS)
+
+    df = build_sleep_sessions(df, source_priority)
+
+    if debug:
+        # Gap to the previous record, which decides where sessions split
+        gap = df["start_utc"] - df["end_utc"].shift()
+        write_debug_trace(
+            df.assign(gap_minutes=gap.dt.total_seconds() / 60),
+            "sleep_debug.jsonl",
+            SLEEP_DEBUG_COLUMNS,
+            debug,
+            date_column="start_local",
         )
 
+    output_data = summarize_sleep_sessions(df)
+
     print(f"Processed {len(output_data)} sleep sessions")
     return output_data
 
 
+def summarize_sleep_sessions(df):
+    """Aggregate sleep records with session numbers into one row per session"""
+    sleep_type = df["sleep_type"]
+    start_utc = df["start_utc"]
+    end_utc = df["end_utc"]
+    duration = (end_utc - start_utc).dt.total_seconds() / 3600  # in hours
+
+    # Classify each record once; stages are only counted for Asleep records
+    is_asleep = sleep_type.str.contains("Asleep", regex=False)
+    is_deep = is_asleep & sleep_type.str.contains("Deep", regex=False)
+    is_core = is_asleep & ~is_deep & sleep_type.str.contains("Core", regex=False)
+    is_rem = (
+        is_asleep & ~is_deep & ~is_core & sleep_type.str.contains("REM", regex=False)
+    )
+    is_awake = ~is_asleep & sleep_type.str.contains("Awake", regex=False)
+
+    records = pd.DataFrame(
+        {
+            "session": df["session"],
+            "start_utc": start_utc,
+            "end_utc": end_utc,
+            "asleep": duration.where(is_asleep, 0.0),
+            "deep": duration.where(is_deep, 0.0),
+            "core": duration.where(is_core, 0.0),
+            "rem": duration.where(is_rem, 0.0),
+            "awake": duration.where(is_awake, 0.0),
+        },
+        index=df.index,
+    )
+
+    sessions = records.groupby("session", sort=True).agg(
+        asleep=("asleep", "sum"),
+        deep=("deep", "sum"),
+        core=("core", "sum"),
+        rem=("rem", "sum"),
+        awake=("awake", "sum"),
+        first_record=("start_utc", "idxmin"),
+        last_record=("end_utc", "idxmax"),
+    )
+
+    # Exclude sessions that contain Unspecified sleep type
+    sessions = sessions[~sessions.index.isin(unspecified_sleep_sessions(df))]
+
+    # Earliest start and latest end keep the UTC offset of their own record
+    sleep_start = df.loc[sessions["first_record"], "start_local"]
+    sleep_end = df.loc[sessions["last_record"], "end_local"]
+
+    return pd.DataFrame(
+        {
+            "Sleep_Date": sleep_start.dt.strftime("%m/%d/%Y").values,
+            "Total_Time_Asleep": sessions["asleep"].round(2).values,
+            "Total_Deep_Sleep": sessions["deep"].round(2).values,
+            "Total_Core_Sleep": sessions["core"].round(2).values,
+            "Total_REM_Sleep": sessions["rem"].round(2).values,
+            "Total_Awake_Time": sessions["awake"].round(2).values,
+            "Sleep_Start": sleep_start.dt.strftime(DATETIME_FORMAT).values,
+            "Sleep_End": sleep_end.dt.strftime(DATETIME_FORMAT).values,
+        },
+        columns=SLEEP_ANALYSIS_COLUMNS,
+    )
+
+
 def save_sleep_analysis(output_data, output_file="sleep_analysis.csv"):
     """Save processed sleep data to CSV file"""
     print(f"Saving sleep analysis to: {output_file}")
 
-    fieldnames = [
-        "Sleep_Date",
-        "Total_Time_Asleep",
-        "Total_Deep_Sleep",
-        "Total_Core_Sleep",
-        "Total_REM_Sleep",
-        "Total_Awake_Time",
-        "Sleep_Start",
-        "Sleep_End",
-    ]
-
-    with open(output_file, "w", newline="") as csvfile:
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(output_data)
+    # Accepts the DataFrame from process_sleep_data or a list of row dicts
+    output_df = pd.DataFrame(output_data, columns=SLEEP_ANALYSIS_COLUMNS)
+    output_df.to_csv(output_file, index=False)
 
     print(f"Successfully saved {len(output_data)} sleep sessions to {output_file}")
 
 
-def main(debug=False):
+def main(debug=False, cache=False, scan=False, database=None):
     """Main function to process Apple Health sleep data"""
     # Get the directory where this script is located
     script_dir = os.path.dirname(os.path.abspath(__file__))
 
-    xml_file = os.path.join(script_dir, "raw/apple_health_export/export.xml")
+    # Read export.zip as delivered by the phone, or an unpacked export.xml
+    xml_file = find_export_file(os.path.join(script_dir, "raw"))
 
     # Generate timestamped filename
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -219,21 +436,27 @@ def main(debug=False):
 
     try:
         # Extract sleep data from XML
-        sleep_data = extract_sleep_data_from_xml(xml_file)
+        cache_dir = os.path.join(script_dir, "cache") if cache else None
+        sleep_data = extract_sleep_data_from_xml(
+            xml_file, cache_dir=cache_dir, scan=scan
+        )
 
-        if not sleep_data:
+        if len(sleep_data) == 0:
             print("No sleep data found in the XML export")
             return
 
         # Process the sleep data
         output_data = process_sleep_data(sleep_data, debug=debug)
 
-        if not output_data:
+        if output_data.empty:
             print("No valid sleep sessions found after processing")
             return
 
         # Save the analysis
-        save_sleep_analysis(output_data, output_file)
+        if database is not None:
+            upsert_analysis(database, output_data, SLEEP_ANALYSIS_TABLE)
+        else:
+            save_sleep_analysis(output_data, output_file)
 
         print("Sleep data processing completed successfully!")
 
@@ -246,11 +469,31 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(
         description="Process Apple Health sleep data from XML export"
     )
+    add_debug_arguments(parser)
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="Reuse extracted records cached for the same export",
+    )
     parser.add_argument(
-        "--debug",
+        "--scan",
         action="store_true",
-        help="Enable debug mode to generate detailed logging",
+        help="Scan export.xml for the needed record types instead of parsing XML",
+    )
+    parser.add_argument(
+        "--duckdb",
+        nargs="?",
+        const=DATABASE_PATH,
+        default=None,
+        metavar="DATABASE",
+        help="Upsert results into a DuckDB table instead of writing a CSV "
+        "(default database: stage_data/training_readiness.duckdb)",
     )
     args = parser.parse_args()
 
-    main(debug=args.debug)
+    main(
+        debug=debug_options_from_args(args),
+        cache=args.cache,
+        scan=args.scan,
+        database=args.duckdb,
+    )
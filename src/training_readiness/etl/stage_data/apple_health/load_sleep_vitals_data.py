@@ -0,0 +1,248 @@
+"""
+load_sleep_vitals_data.py
+
+Attaches overnight vitals to the sleep sessions built by process_sleep_data.
+- Per-session medians -> cleaned/apple_sleep_vitals_analysis_<timestamp>.csv
+
+Respiratory rate, sleeping wrist temperature and oxygen saturation samples
+are collected in the same pass over export.xml as the sleep records. Each
+sample is matched to the session whose window contains its midpoint with an
+as-of join on the sorted session starts (sessions never overlap), and the
+medians of all vitals come out of one groupby. Rows are keyed by
+Sleep_Start, so they join with the sleep analysis output.
+"""
+
+import pandas as pd
+from datetime import datetime
+import os
+import sys
+import argparse
+
+# Add the src directory to the path so we can import the module
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../../../../../src"))
+
+from training_readiness.etl.stage_data.apple_health.apple_health_cache import (  # noqa: E402
+    extract_records_cached,
+)
+from training_readiness.etl.stage_data.apple_health.apple_health_scanner import (  # noqa: E402
+    extract_records_scanned,
+)
+from training_readiness.etl.stage_data.apple_health.apple_health_parser import (  # noqa: E402
+    OXYGEN_SATURATION_TYPE,
+    RESPIRATORY_RATE_TYPE,
+    SLEEP_ANALYSIS_TYPE,
+    WRIST_TEMPERATURE_TYPE,
+    extract_records,
+    find_export_file,
+)
+from training_readiness.etl.stage_data.apple_health.load_sleep_data import (  # noqa: E402
+    build_sleep_sessions,
+    collect_sleep_record,
+    sleep_session_windows,
+)
+from training_readiness.etl.timestamps import (  # noqa: E402
+    parse_apple_health_timestamps,
+)
+
+# Record type -> output column of its per-session median
+SLEEP_VITALS = {
+    RESPIRATORY_RATE_TYPE: "Respiratory_Rate_Median",
+    WRIST_TEMPERATURE_TYPE: "Wrist_Temperature_Median",
+    OXYGEN_SATURATION_TYPE: "SpO2_Median",
+}
+
+SLEEP_VITALS_COLUMNS = ["Sleep_Date", "Sleep_Start"] + list(SLEEP_VITALS.values())
+
+
+def collect_vital_record(record):
+    """Convert the attributes of a vital sign Record into a row"""
+    value = record.get("value")
+    unit = record.get("unit")
+
+    # Only process if we have a valid value
+    if not (value and unit):
+        return None
+
+    return {
+        "start_date": record.get("startDate"),
+        "end_date": record.get("endDate"),
+        "value": float(value),
+        "unit": unit,
+    }
+
+
+def extract_sleep_vitals_from_xml(xml_file_path, cache_dir=None, scan=False):
+    """Extract sleep records and overnight vitals from Apple Health XML export"""
+    print(f"Reading Apple Health export from: {xml_file_path}")
+
+    if not os.path.exists(xml_file_path):
+        raise FileNotFoundError(f"XML file not found: {xml_file_path}")
+
+    collectors = {SLEEP_ANALYSIS_TYPE: collect_sleep_record}
+    collectors.update(
+        {record_type: collect_vital_record for record_type in SLEEP_VITALS}
+    )
+    extract = extract_records_scanned if scan else extract_records
+    if cache_dir is not None:
+        results = extract_records_cached(
+            xml_file_path, collectors, cache_dir, extract=extract
+        )
+    else:
+        results = extract(xml_file_path, collectors)
+
+    for record_type in collectors:
+        print(f"Extracted {len(results[record_type])} {record_type} records from XML")
+    return results
+
+
+def normalize_vital_units(vitals):
+    """Report SpO2 in percent and wrist temperature in degrees Celsius"""
+    value = vitals["value"]
+    # Apple stores oxygen saturation as a fraction with the unit "%"
+    is_spo2 = vitals["type"] == OXYGEN_SATURATION_TYPE
+    value = value.where(~(is_spo2 & (value <= 1)), value * 100)
+    is_fahrenheit = vitals["unit"] == "degF"
+    value = value.where(~is_fahrenheit, (value - 32) * 5 / 9)
+    return vitals.assign(value=value)
+
+
+def match_sleep_sessions(samples, windows):
+    """
+    Assign samples to the sleep session whose window contains them.
+
+    Args:
+        samples: Rows with a tz-aware ``time`` column
+        windows: Non-overlapping sessions from sleep_session_windows
+
+    Returns:
+        The samples inside a session, with its ``session`` number
+    """
+    samples = samples.sort_values("time", kind="stable")
+    # The last session starting at or before each sample is the only one
+    # that can contain it
+    matched = pd.merge_asof(
+        samples,
+        windows[["session", "start_utc", "end_utc"]],
+        left_on="time",
+        right_on="start_utc",
+        direction="backward",
+    )
+    return matched[matched["time"] <= matched["end_utc"]]
+
+
+def process_sleep_vitals_data(results):
+    """
+    Compute per-session medians of overnight vitals.
+
+    Args:
+        results: Mapping of record type to rows, as from
+            extract_sleep_vitals_from_xml
+
+    Returns:
+        DataFrame with one row per sleep session that has vitals
+    """
+    print("Processing sleep vitals data...")
+
+    sleep_df = pd.DataFrame(results.get(SLEEP_ANALYSIS_TYPE, []))
+    vitals = pd.concat(
+        [
+            pd.DataFrame(results.get(record_type, [])).assign(type=record_type)
+            for record_type in SLEEP_VITALS
+        ],
+        ignore_index=True,
+    )
+
+    if sleep_df.empty or vitals.empty or "value" not in vitals:
+        print("No sleep sessions or vitals found in XML export")
+        return pd.DataFrame(columns=SLEEP_VITALS_COLUMNS)
+
+    windows = sleep_session_windows(build_sleep_sessions(sleep_df))
+
+    # Samples spanning the night (wrist temperature) are placed by midpoint
+    _, start_utc = parse_apple_health_timestamps(vitals["start_date"])
+    _, end_utc = parse_apple_health_timestamps(vitals["end_date"])
+    vitals = normalize_vital_units(vitals)
+    vitals["time"] = start_utc + (end_utc - start_utc) / 2
+
+    matched = match_sleep_sessions(vitals, windows)
+
+    medians = matched.groupby(["session", "type"])["value"].median().unstack()
+    medians = medians.reindex(columns=list(SLEEP_VITALS)).rename(columns=SLEEP_VITALS)
+
+    output_data = windows.merge(medians, left_on="session", right_index=True)
+    for column in SLEEP_VITALS.values():
+        output_data[column] = output_data[column].round(2)
+
+    print(
+        f"Matched {len(matched)} of {len(vitals)} vitals samples "
+        f"to {len(output_data)} sleep sessions"
+    )
+    return output_data.reset_index(drop=True)[SLEEP_VITALS_COLUMNS]
+
+
+def save_sleep_vitals_analysis(output_data, output_file="sleep_vitals_analysis.csv"):
+    """Save per-session vitals to CSV file"""
+    print(f"Saving sleep vitals analysis to: {output_file}")
+
+    pd.DataFrame(output_data, columns=SLEEP_VITALS_COLUMNS).to_csv(
+        output_file, index=False
+    )
+
+    print(f"Successfully saved {len(output_data)} sleep sessions to {output_file}")
+
+
+def main(cache=False, scan=False):
+    """Main function to process Apple Health overnight vitals"""
+    # Get the directory where this script is located
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+
+    # Read export.zip as delivered by the phone, or an unpacked export.xml
+    xml_file = find_export_file(os.path.join(script_dir, "raw"))
+
+    # Generate timestamped filename
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    output_file = os.path.join(
+        script_dir, f"cleaned/apple_sleep_vitals_analysis_{timestamp}.csv"
+    )
+
+    try:
+        # Extract sleep records and vitals from XML in one pass
+        cache_dir = os.path.join(script_dir, "cache") if cache else None
+        results = extract_sleep_vitals_from_xml(
+            xml_file, cache_dir=cache_dir, scan=scan
+        )
+
+        # Attach the vitals to their sleep sessions
+        output_data = process_sleep_vitals_data(results)
+
+        if output_data.empty:
+            print("No sleep sessions with vitals found after processing")
+            return
+
+        # Save the analysis
+        save_sleep_vitals_analysis(output_data, output_file)
+
+        print("Sleep vitals processing completed successfully!")
+
+    except Exception as e:
+        print(f"Error processing sleep vitals: {str(e)}")
+        raise
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Attach overnight vitals from XML export to sleep sessions"
+    )
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="Reuse extracted records cached for the same export",
+    )
+    parser.add_argument(
+        "--scan",
+        action="store_true",
+        help="Scan export.xml for the needed record types instead of parsing XML",
+    )
+    args = parser.parse_args()
+
+    main(cache=args.cache, scan=args.scan)
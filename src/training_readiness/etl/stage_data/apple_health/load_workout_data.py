@@ -0,0 +1,237 @@
+"""
+load_workout_data.py
+
+Loads Apple Health workouts (top-level <Workout> elements of export.xml).
+- One row per workout -> cleaned/apple_workout_analysis_<timestamp>.csv
+
+Workouts are streamed with the same parser as the Record loaders. Units are
+normalized and columns typed so the table lines up with trainingpeaks_data:
+Workout_Date with WorkoutDay, Workout_Type with WorkoutType, Duration_Hours
+with TimeTotalInHours and Distance_Meters with DistanceInMeters, e.g.
+
+    SELECT t.*, a.Energy_Kcal, a.Heart_Rate_Average
+      FROM trainingpeaks_data t
+      JOIN read_csv_auto('apple_workout_analysis_<timestamp>.csv') a
+        ON a.Workout_Date = t.WorkoutDay AND a.Workout_Type = t.WorkoutType
+
+Older exports carry distance and energy as attributes of the Workout; newer
+ones only as WorkoutStatistics children. Both are read, attributes first.
+"""
+
+import pandas as pd
+from datetime import datetime
+import os
+import sys
+import argparse
+
+# Add the src directory to the path so we can import the module
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../../../../../src"))
+
+from training_readiness.etl.stage_data.apple_health.apple_health_parser import (  # noqa: E402
+    ACTIVE_ENERGY_TYPE,
+    DISTANCE_UNITS,
+    DURATION_UNITS,
+    ENERGY_UNITS,
+    HEART_RATE_TYPE,
+    find_export_file,
+    iter_elements,
+)
+from training_readiness.etl.timestamps import (  # noqa: E402
+    parse_apple_health_timestamps,
+)
+
+WORKOUT_TAG = "Workout"
+ACTIVITY_TYPE_PREFIX = "HKWorkoutActivityType"
+
+# Distance statistics are per activity, e.g. DistanceWalkingRunning
+DISTANCE_TYPE_PREFIX = "HKQuantityTypeIdentifierDistance"
+
+# Output columns and their types
+WORKOUT_DTYPES = {
+    "Workout_Date": "datetime64[ns]",
+    "Workout_Start": "datetime64[ns]",
+    "Workout_End": "datetime64[ns]",
+    "Workout_Start_UTC": "datetime64[ns, UTC]",
+    "Workout_Type": "string",
+    "Activity_Type": "string",
+    "Duration_Hours": "float64",
+    "Distance_Meters": "float64",
+    "Energy_Kcal": "float64",
+    "Heart_Rate_Average": "float64",
+    "Source_Name": "string",
+}
+WORKOUT_COLUMNS = list(WORKOUT_DTYPES)
+
+# Apple activity type -> TrainingPeaks WorkoutType; anything else is "Other"
+WORKOUT_TYPES = {
+    "Running": "Run",
+    "Cycling": "Bike",
+    "Swimming": "Swim",
+    "TraditionalStrengthTraining": "Strength",
+    "FunctionalStrengthTraining": "Strength",
+    "Walking": "Walk",
+    "Hiking": "Walk",
+    "Rowing": "Rowing",
+    "CrossCountrySkiing": "XC-Ski",
+}
+
+
+def collect_workout_element(elem):
+    """Convert a Workout element and its statistics into a row"""
+    row = {
+        "start_date": elem.get("startDate"),
+        "end_date": elem.get("endDate"),
+        "activity_type": elem.get("workoutActivityType"),
+        "duration": elem.get("duration"),
+        "duration_unit": elem.get("durationUnit"),
+        "distance": elem.get("totalDistance"),
+        "distance_unit": elem.get("totalDistanceUnit"),
+        "energy": elem.get("totalEnergyBurned"),
+        "energy_unit": elem.get("totalEnergyBurnedUnit"),
+        "heart_rate_average": None,
+        "source_name": elem.get("sourceName"),
+    }
+
+    # Only process workouts with a start and end
+    if not (row["start_date"] and row["end_date"]):
+        return None
+
+    for stat in elem.iter("WorkoutStatistics"):
+        stat_type = stat.get("type") or ""
+        if stat_type == ACTIVE_ENERGY_TYPE and not row["energy"]:
+            row["energy"] = stat.get("sum")
+            row["energy_unit"] = stat.get("unit")
+        elif stat_type.startswith(DISTANCE_TYPE_PREFIX) and not row["distance"]:
+            row["distance"] = stat.get("sum")
+            row["distance_unit"] = stat.get("unit")
+        elif stat_type == HEART_RATE_TYPE:
+            row["heart_rate_average"] = stat.get("average")
+
+    return row
+
+
+def extract_workout_data_from_xml(xml_file_path):
+    """Extract workouts from Apple Health XML export"""
+    print(f"Reading Apple Health export from: {xml_file_path}")
+
+    if not os.path.exists(xml_file_path):
+        raise FileNotFoundError(f"XML file not found: {xml_file_path}")
+
+    workout_data = []
+    for elem in iter_elements(xml_file_path, (WORKOUT_TAG,)):
+        row = collect_workout_element(elem)
+        if row is not None:
+            workout_data.append(row)
+
+    print(f"Extracted {len(workout_data)} workout records from XML")
+    return workout_data
+
+
+def convert_units(values, units, factors):
+    """Convert a column of numeric strings by the factor of each row's unit"""
+    return pd.to_numeric(values, errors="coerce") * units.map(factors)
+
+
+def process_workout_data(workout_data):
+    """Process raw workouts into a typed table with normalized units"""
+    print("Processing workout data...")
+
+    # Convert to DataFrame
+    df = pd.DataFrame(workout_data)
+
+    if df.empty:
+        print("No workout data found in XML export")
+        return pd.DataFrame(
+            {column: pd.Series(dtype=dtype) for column, dtype in WORKOUT_DTYPES.items()}
+        )
+
+    start_local, start_utc = parse_apple_health_timestamps(df["start_date"])
+    end_local, end_utc = parse_apple_health_timestamps(df["end_date"])
+
+    activity_type = (
+        df["activity_type"].astype("string").str.removeprefix(ACTIVITY_TYPE_PREFIX)
+    )
+
+    # Fall back to the elapsed time when the duration is missing or unknown
+    duration = convert_units(df["duration"], df["duration_unit"], DURATION_UNITS)
+    duration = duration.fillna((end_utc - start_utc).dt.total_seconds() / 3600)
+
+    output_data = pd.DataFrame(
+        {
+            "Workout_Date": start_local.dt.normalize(),
+            "Workout_Start": start_local,
+            "Workout_End": end_local,
+            "Workout_Start_UTC": start_utc,
+            "Workout_Type": activity_type.map(WORKOUT_TYPES).fillna("Other"),
+            "Activity_Type": activity_type,
+            "Duration_Hours": duration.round(4),
+            "Distance_Meters": convert_units(
+                df["distance"], df["distance_unit"], DISTANCE_UNITS
+            ).round(1),
+            "Energy_Kcal": convert_units(
+                df["energy"], df["energy_unit"], ENERGY_UNITS
+            ).round(1),
+            "Heart_Rate_Average": pd.to_numeric(
+                df["heart_rate_average"], errors="coerce"
+            ).round(1),
+            "Source_Name": df["source_name"],
+        }
+    )
+    output_data = output_data.astype(WORKOUT_DTYPES)
+    output_data = output_data.sort_values("Workout_Start_UTC", kind="stable")
+
+    print(f"Processed {len(output_data)} workouts")
+    return output_data.reset_index(drop=True)[WORKOUT_COLUMNS]
+
+
+def save_workout_analysis(output_data, output_file="workout_analysis.csv"):
+    """Save processed workout data to CSV file"""
+    print(f"Saving workout analysis to: {output_file}")
+
+    pd.DataFrame(output_data).to_csv(output_file, index=False)
+
+    print(f"Successfully saved {len(output_data)} workout records to {output_file}")
+
+
+def main():
+    """Main function to process Apple Health workouts"""
+    # Get the directory where this script is located
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+
+    # Read export.zip as delivered by the phone, or an unpacked export.xml
+    xml_file = find_export_file(os.path.join(script_dir, "raw"))
+
+    # Generate timestamped filename
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    output_file = os.path.join(
+        script_dir, f"cleaned/apple_workout_analysis_{timestamp}.csv"
+    )
+
+    try:
+        # Extract workouts from XML
+        workout_data = extract_workout_data_from_xml(xml_file)
+
+        if len(workout_data) == 0:
+            print("No workout data found in the XML export")
+            return
+
+        # Process the workouts
+        output_data = process_workout_data(workout_data)
+
+        # Save the analysis
+        save_workout_analysis(output_data, output_file)
+
+        print("Workout data processing completed successfully!")
+
+    except Exception as e:
+        print(f"Error processing workout data: {str(e)}")
+        raise
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Process Apple Health workouts from XML export"
+    )
+    parser.parse_args()
+
+    main()
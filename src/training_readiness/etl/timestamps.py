@@ -0,0 +1,129 @@
+"""
+Timestamps
+
+Fixed-format timestamp parsing shared by the ETL loaders.
+
+Every source writes its timestamps in a single layout: a 19-character
+wall-clock time followed by a UTC offset.
+- Apple Health: "2024-03-01 06:12:00 -0700"
+- Hevy: "2024-03-01T13:12:00Z" or "2024-03-01T13:12:00+00:00"
+
+Whole columns are converted at once. The wall-clock part is parsed with the
+source's explicit format instead of letting pandas infer it, and each distinct
+offset suffix (an export only contains a handful) is parsed once and cached.
+Columns mixing offsets, e.g. across daylight saving changes, therefore become
+datetime64 columns rather than object columns of Timestamps.
+
+Example:
+    local, utc = parse_apple_health_timestamps(df["start_date"])
+"""
+
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+APPLE_HEALTH_FORMAT = "%Y-%m-%d %H:%M:%S"
+HEVY_FORMAT = "%Y-%m-%dT%H:%M:%S"
+
+# Length of the wall-clock part preceding the UTC offset
+LOCAL_TIME_LENGTH = 19
+
+
+@lru_cache(maxsize=None)
+def parse_utc_offset(suffix: str) -> int:
+    """
+    Parse a UTC offset suffix into minutes east of UTC.
+
+    Args:
+        suffix: Offset following the wall-clock time, e.g. " -0700", "Z",
+            "+05:30"; an empty suffix is treated as UTC
+
+    Returns:
+        Offset in minutes
+
+    Raises:
+        ValueError: If the suffix is not a UTC offset
+    """
+    offset = suffix.strip()
+    if offset in ("", "Z"):
+        return 0
+
+    digits = offset[1:].replace(":", "")
+    if offset[0] not in "+-" or len(digits) != 4 or not digits.isdigit():
+        raise ValueError(f"Invalid UTC offset: {suffix!r}")
+
+    minutes = int(digits[:2]) * 60 + int(digits[2:])
+    return -minutes if offset[0] == "-" else minutes
+
+
+@lru_cache(maxsize=None)
+def utc_offset_timezone(suffix: str) -> timezone:
+    """Cached fixed-offset timezone for a UTC offset suffix"""
+    return timezone(timedelta(minutes=parse_utc_offset(suffix)))
+
+
+def parse_timestamps(
+    values: Iterable[Optional[str]], local_format: str
+) -> Tuple[pd.Series, pd.Series]:
+    """
+    Convert a column of fixed-format timestamps with UTC offsets.
+
+    Args:
+        values: Timestamp strings; missing values become NaT
+        local_format: strptime format of the 19-character wall-clock part
+
+    Returns:
+        Tuple of (local, utc) Series sharing the index of ``values``:
+        the wall-clock times as datetime64[ns], and the instants they denote
+        as datetime64[ns, UTC]
+
+    Raises:
+        ValueError: If a value does not match the format
+    """
+    values = pd.Series(values, dtype=object)
+
+    local = pd.to_datetime(values.str[:LOCAL_TIME_LENGTH], format=local_format)
+
+    # Parse each distinct offset once and broadcast it back to the rows;
+    # missing values (code -1) pick the trailing 0 and stay NaT
+    codes, suffixes = pd.factorize(values.str[LOCAL_TIME_LENGTH:])
+    minutes = np.array([parse_utc_offset(suffix) for suffix in suffixes] + [0])
+    offsets = pd.to_timedelta(minutes[codes], unit="min")
+
+    utc = (local - offsets).dt.tz_localize("UTC")
+    return local, utc
+
+
+def parse_apple_health_timestamps(
+    values: Iterable[Optional[str]],
+) -> Tuple[pd.Series, pd.Series]:
+    """Convert Apple Health dates ("2024-03-01 06:12:00 -0700") to (local, utc)"""
+    return parse_timestamps(values, APPLE_HEALTH_FORMAT)
+
+
+def parse_hevy_timestamps(
+    values: Iterable[Optional[str]],
+) -> Tuple[pd.Series, pd.Series]:
+    """Convert Hevy times ("2024-03-01T13:12:00Z") to (local, utc)"""
+    return parse_timestamps(values, HEVY_FORMAT)
+
+
+def parse_apple_health_timestamp(value: Optional[str]) -> Optional[datetime]:
+    """
+    Parse a single Apple Health date into an aware datetime.
+
+    Args:
+        value: Date such as "2024-03-01 06:12:00 -0700"
+
+    Returns:
+        Aware datetime, or None for a missing value
+    """
+    if not value:
+        return None
+
+    # The wall-clock part is ISO 8601 with a space separator
+    local = datetime.fromisoformat(value[:LOCAL_TIME_LENGTH])
+    return local.replace(tzinfo=utc_offset_timezone(value[LOCAL_TIME_LENGTH:]))
@@ -1,8 +1,10 @@
 import pandas as pd
 
+from training_readiness.etl.timestamps import parse_hevy_timestamps
+
 
 def add_time_columns(df: pd.DataFrame) -> pd.DataFrame:
-    dt = pd.to_datetime(df["start_time"], utc=True)
+    _, dt = parse_hevy_timestamps(df["start_time"])
     # workout_date in m/d/yy without leading zeros
     df["workout_date"] = dt.dt.strftime("%-m/%-d/%y")
     df["day_of_week"] = dt.dt.day_name()
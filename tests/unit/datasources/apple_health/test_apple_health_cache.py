@@ -0,0 +1,154 @@
+import os
+import sys
+import tempfile
+from unittest.mock import MagicMock
+
+import pandas as pd
+
+# Add the src directory to the path so we can import the module
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../../../../../src"))
+
+from training_readiness.etl.stage_data.apple_health import (  # noqa: E402
+    apple_health_cache,
+)
+from training_readiness.etl.stage_data.apple_health.apple_health_cache import (  # noqa: E402
+    extract_records_cached,
+    hash_export,
+)
+from training_readiness.etl.stage_data.apple_health.apple_health_parser import (  # noqa: E402
+    RESTING_HEART_RATE_TYPE,
+    SLEEP_ANALYSIS_TYPE,
+    extract_records,
+)
+from training_readiness.etl.stage_data.apple_health.load_resting_hr_data import (  # noqa: E402
+    collect_resting_hr_record,
+    extract_resting_hr_data_from_xml,
+    process_resting_hr_data,
+)
+from training_readiness.etl.stage_data.apple_health.load_sleep_data import (  # noqa: E402
+    collect_sleep_record,
+    extract_sleep_data_from_xml,
+    process_sleep_data,
+)
+
+XML_CONTENT = """<?xml version="1.0" encoding="UTF-8"?>
+<HealthData>
+    <Record type="HKCategoryTypeIdentifierSleepAnalysis" startDate="2024-01-01 23:00:00 -0700" endDate="2024-01-02 06:00:00 -0700" value="HKCategoryValueSleepAnalysisAsleepCore"/>
+    <Record type="HKQuantityTypeIdentifierRestingHeartRate" startDate="2024-01-02 08:00:00 -0700" endDate="2024-01-02 08:00:00 -0700" value="55" unit="count/min"/>
+    <Record type="HKQuantityTypeIdentifierRestingHeartRate" startDate="2024-01-03 08:00:00 -0700" endDate="2024-01-03 08:00:00 -0700" value="57" unit="count/min"/>
+</HealthData>"""
+
+COLLECTORS = {
+    SLEEP_ANALYSIS_TYPE: collect_sleep_record,
+    RESTING_HEART_RATE_TYPE: collect_resting_hr_record,
+}
+
+
+class TestAppleHealthCache:
+    """Test cases for the Parquet cache of extracted records"""
+
+    def setup_method(self):
+        """Write the sample export and create a cache directory"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.xml_file = os.path.join(self.temp_dir.name, "export.xml")
+        self.cache_dir = os.path.join(self.temp_dir.name, "cache")
+        with open(self.xml_file, "w") as f:
+            f.write(XML_CONTENT)
+
+    def teardown_method(self):
+        """Remove the temporary directory"""
+        self.temp_dir.cleanup()
+
+    def test_hash_changes_with_content(self):
+        """Test that a different export gets a different cache key"""
+        first = hash_export(self.xml_file)
+        assert hash_export(self.xml_file) == first
+
+        with open(self.xml_file, "a") as f:
+            f.write("\n")
+        assert hash_export(self.xml_file) != first
+
+    def test_hash_changes_with_cache_version(self, monkeypatch):
+        """Test that rows cached by older collectors are not reused"""
+        first = hash_export(self.xml_file)
+
+        monkeypatch.setattr(apple_health_cache, "CACHE_VERSION", "old")
+
+        assert hash_export(self.xml_file) != first
+
+    def test_cache_miss_then_hit(self):
+        """Test that the second run loads cached rows without parsing XML"""
+        extract = MagicMock(wraps=extract_records)
+
+        first = extract_records_cached(
+            self.xml_file, COLLECTORS, self.cache_dir, extract=extract
+        )
+        second = extract_records_cached(
+            self.xml_file, COLLECTORS, self.cache_dir, extract=extract
+        )
+
+        assert extract.call_count == 1
+        for record_type in COLLECTORS:
+            pd.testing.assert_frame_equal(first[record_type], second[record_type])
+        assert list(second[RESTING_HEART_RATE_TYPE]["value"]) == [55.0, 57.0]
+        assert second[RESTING_HEART_RATE_TYPE]["value"].dtype == "float64"
+
+    def test_cache_files_per_record_type(self):
+        """Test that rows are stored per export hash and record type"""
+        extract_records_cached(self.xml_file, COLLECTORS, self.cache_dir)
+
+        export_dir = os.path.join(self.cache_dir, hash_export(self.xml_file))
+        assert sorted(os.listdir(export_dir)) == sorted(
+            f"{record_type}.parquet" for record_type in COLLECTORS
+        )
+
+    def test_missing_record_type_is_a_miss(self):
+        """Test that requesting an uncached type parses the XML again"""
+        extract_records_cached(
+            self.xml_file,
+            {SLEEP_ANALYSIS_TYPE: collect_sleep_record},
+            self.cache_dir,
+        )
+        extract = MagicMock(wraps=extract_records)
+
+        result = extract_records_cached(
+            self.xml_file, COLLECTORS, self.cache_dir, extract=extract
+        )
+
+        assert extract.call_count == 1
+        assert len(result[RESTING_HEART_RATE_TYPE]) == 2
+
+    def test_high_water_marks_on_cached_rows(self):
+        """Test that high-water marks filter rows loaded from the cache"""
+        extract_records_cached(self.xml_file, COLLECTORS, self.cache_dir)
+
+        result = extract_records_cached(
+            self.xml_file,
+            COLLECTORS,
+            self.cache_dir,
+            since={RESTING_HEART_RATE_TYPE: "2024-01-03 00:00:00 -0700"},
+        )
+
+        assert list(result[RESTING_HEART_RATE_TYPE]["value"]) == [57.0]
+        assert len(result[SLEEP_ANALYSIS_TYPE]) == 1
+
+    def test_processing_cached_rows_matches_xml(self):
+        """Test that processors give the same output from cached rows"""
+        extract_sleep_data_from_xml(self.xml_file, cache_dir=self.cache_dir)
+        extract_resting_hr_data_from_xml(self.xml_file, cache_dir=self.cache_dir)
+
+        cached_sleep = extract_sleep_data_from_xml(
+            self.xml_file, cache_dir=self.cache_dir
+        )
+        cached_resting_hr = extract_resting_hr_data_from_xml(
+            self.xml_file, cache_dir=self.cache_dir
+        )
+
+        pd.testing.assert_frame_equal(
+            process_sleep_data(cached_sleep),
+            process_sleep_data(extract_sleep_data_from_xml(self.xml_file)),
+        )
+        pd.testing.assert_frame_equal(
+            process_resting_hr_data(cached_resting_hr),
+            process_resting_hr_data(extract_resting_hr_data_from_xml(self.xml_file)),
+        )
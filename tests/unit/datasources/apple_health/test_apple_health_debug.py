@@ -0,0 +1,133 @@
+import argparse
+import json
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+# Add the src directory to the path so we can import the module
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../../../../../src"))
+
+from training_readiness.etl.stage_data.apple_health.apple_health_debug import (  # noqa: E402
+    add_debug_arguments,
+    debug_options,
+    debug_options_from_args,
+    select_debug_rows,
+    write_debug_trace,
+)
+from training_readiness.etl.stage_data.apple_health.load_resting_hr_data import (  # noqa: E402
+    process_resting_hr_data,
+)
+from training_readiness.etl.stage_data.apple_health.load_sleep_data import (  # noqa: E402
+    process_sleep_data,
+)
+
+
+def read_trace(path):
+    """Read a JSON Lines trace"""
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+def daily_frame(days):
+    """One row per consecutive day starting 2024-01-01"""
+    return pd.DataFrame(
+        {
+            "date": pd.date_range("2024-01-01", periods=days, freq="D"),
+            "value": range(days),
+        }
+    )
+
+
+class TestAppleHealthDebug:
+    """Test cases for the JSON Lines debug trace"""
+
+    def test_date_range_is_inclusive(self):
+        """Test that both ends of the date range are traced"""
+        rows = select_debug_rows(
+            daily_frame(10),
+            "date",
+            debug_options(start="2024-01-03", end="2024-01-05"),
+        )
+
+        assert list(rows["value"]) == [2, 3, 4]
+
+    def test_sample_and_limit(self):
+        """Test that every Nth record is kept up to the limit"""
+        rows = select_debug_rows(
+            daily_frame(20), "date", debug_options(sample=3, limit=4)
+        )
+
+        assert list(rows["value"]) == [0, 3, 6, 9]
+
+    def test_invalid_sample(self):
+        """Test that a sample below one is rejected"""
+        with pytest.raises(ValueError):
+            debug_options(sample=0)
+
+    def test_trace_is_json_lines(self, tmp_path, monkeypatch):
+        """Test that chunks are written as one JSON object per line"""
+        monkeypatch.setattr(
+            "training_readiness.etl.stage_data.apple_health.apple_health_debug."
+            "DEBUG_CHUNK_SIZE",
+            3,
+        )
+        path = tmp_path / "trace.jsonl"
+
+        written = write_debug_trace(
+            daily_frame(7), str(path), ["date", "value", "missing"], True
+        )
+
+        trace = read_trace(path)
+        assert written == 7
+        assert [row["value"] for row in trace] == list(range(7))
+        assert trace[0] == {"date": "2024-01-01T00:00:00.000", "value": 0}
+
+    def test_sleep_trace(self, tmp_path, monkeypatch):
+        """Test that the sleep trace carries gaps and sessions"""
+        monkeypatch.chdir(tmp_path)
+        records = [
+            {
+                "start_date": f"2024-01-0{day} 23:00:00 +0000",
+                "end_date": f"2024-01-0{day + 1} 06:00:00 +0000",
+                "sleep_type": "HKCategoryValueSleepAnalysisAsleepCore",
+            }
+            for day in range(1, 6)
+        ]
+
+        process_sleep_data(records, debug=debug_options(start="2024-01-02", sample=2))
+
+        trace = read_trace(tmp_path / "sleep_debug.jsonl")
+        assert [row["session"] for row in trace] == [2, 4]
+        assert [row["gap_minutes"] for row in trace] == [1020.0, 1020.0]
+
+    def test_resting_hr_trace(self, tmp_path, monkeypatch):
+        """Test that the resting heart rate trace honors the limit"""
+        monkeypatch.chdir(tmp_path)
+        records = [
+            {
+                "start_date": f"2024-01-0{day} 08:00:00 +0000",
+                "end_date": f"2024-01-0{day} 08:00:00 +0000",
+                "value": 50.0 + day,
+                "unit": "count/min",
+            }
+            for day in range(1, 6)
+        ]
+
+        process_resting_hr_data(records, debug=debug_options(limit=2))
+
+        trace = read_trace(tmp_path / "resting_hr_debug.jsonl")
+        assert [row["value"] for row in trace] == [51.0, 52.0]
+
+    def test_command_line_options(self):
+        """Test that the debug flags build trace options"""
+        parser = argparse.ArgumentParser()
+        add_debug_arguments(parser)
+
+        assert debug_options_from_args(parser.parse_args([])) is False
+        assert debug_options_from_args(
+            parser.parse_args(
+                ["--debug", "--debug-from", "2024-01-01", "--debug-sample", "5"]
+            )
+        ) == debug_options(sample=5, start="2024-01-01")
@@ -0,0 +1,149 @@
+import datetime
+import os
+import sys
+import tempfile
+
+import duckdb
+
+# Add the src directory to the path so we can import the module
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../../../../../src"))
+
+from training_readiness.etl.stage_data.apple_health.apple_health_duckdb import (  # noqa: E402
+    typed_analysis,
+    upsert_analysis,
+)
+from training_readiness.etl.stage_data.apple_health.load_apple_health_data import (  # noqa: E402
+    process_apple_health_data,
+)
+from training_readiness.etl.stage_data.apple_health.load_resting_hr_data import (  # noqa: E402
+    RESTING_HR_TABLE,
+    process_resting_hr_data,
+)
+from training_readiness.etl.stage_data.apple_health.load_sleep_data import (  # noqa: E402
+    SLEEP_ANALYSIS_TABLE,
+    process_sleep_data,
+)
+
+SLEEP = "HKCategoryTypeIdentifierSleepAnalysis"
+RESTING_HR = "HKQuantityTypeIdentifierRestingHeartRate"
+
+
+def resting_hr_row(start, value):
+    """Build a collected resting heart rate row"""
+    return {"start_date": start, "end_date": start, "value": value, "unit": "count/min"}
+
+
+def sleep_row(start, end):
+    """Build a collected sleep row"""
+    return {
+        "start_date": start,
+        "end_date": end,
+        "sleep_type": "HKCategoryValueSleepAnalysisAsleepCore",
+        "source_name": "Apple Watch",
+    }
+
+
+class TestAppleHealthDuckdb:
+    """Test cases for upserting Apple Health results into DuckDB"""
+
+    def setup_method(self):
+        """Create a temporary database location"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.database = os.path.join(self.temp_dir.name, "training_readiness.duckdb")
+
+    def teardown_method(self):
+        """Remove the temporary directory"""
+        self.temp_dir.cleanup()
+
+    def query(self, sql):
+        """Run a query against the test database"""
+        with duckdb.connect(self.database) as con:
+            return con.execute(sql).fetchall()
+
+    def test_typed_sleep_columns(self):
+        """Test that output dates and times are converted to typed columns"""
+        output_data = process_sleep_data(
+            [sleep_row("2024-01-01 23:00:00 -0700", "2024-01-02 06:30:00 -0700")]
+        )
+
+        typed = typed_analysis(output_data, SLEEP_ANALYSIS_TABLE)
+
+        assert typed["sleep_date"].iloc[0] == datetime.date(2024, 1, 1)
+        assert str(typed["sleep_start"].dtype) == "datetime64[ns]"
+        assert typed["total_time_asleep"].iloc[0] == 7.5
+
+    def test_upsert_replaces_rows_by_key(self):
+        """Test that re-running a day replaces its row instead of adding one"""
+        upsert_analysis(
+            self.database,
+            process_resting_hr_data(
+                [
+                    resting_hr_row("2024-01-01 08:00:00 -0700", 55.0),
+                    resting_hr_row("2024-01-02 08:00:00 -0700", 57.0),
+                ]
+            ),
+            RESTING_HR_TABLE,
+        )
+        count = upsert_analysis(
+            self.database,
+            process_resting_hr_data(
+                [
+                    resting_hr_row("2024-01-02 20:00:00 -0700", 54.0),
+                    resting_hr_row("2024-01-03 08:00:00 -0700", 52.0),
+                ]
+            ),
+            RESTING_HR_TABLE,
+        )
+
+        assert count == 3
+        assert self.query(
+            "SELECT resting_hr_date, resting_hr_value FROM apple_resting_hr "
+            "ORDER BY resting_hr_date"
+        ) == [
+            (datetime.date(2024, 1, 1), 55.0),
+            (datetime.date(2024, 1, 2), 54.0),
+            (datetime.date(2024, 1, 3), 52.0),
+        ]
+
+    def test_table_schema(self):
+        """Test that the table is created with typed columns and a key"""
+        upsert_analysis(
+            self.database,
+            process_resting_hr_data(
+                [resting_hr_row("2024-01-01 08:00:00 -0700", 55.0)],
+                reducers=("last", "count"),
+            ),
+            RESTING_HR_TABLE,
+        )
+
+        columns = dict(
+            self.query(
+                "SELECT column_name, data_type FROM information_schema.columns "
+                "WHERE table_name = 'apple_resting_hr'"
+            )
+        )
+        assert columns["resting_hr_date"] == "DATE"
+        assert columns["resting_hr_count"] == "INTEGER"
+        # Statistics that were not computed are left NULL
+        assert self.query(
+            "SELECT resting_hr_min, resting_hr_count FROM apple_resting_hr"
+        ) == [(None, 1)]
+
+    def test_combined_loader_writes_tables(self):
+        """Test that --duckdb output replaces the CSV files of tabled metrics"""
+        results = {
+            SLEEP: [
+                sleep_row("2024-01-01 23:00:00 -0700", "2024-01-02 06:00:00 -0700")
+            ],
+            RESTING_HR: [resting_hr_row("2024-01-02 08:00:00 -0700", 55.0)],
+        }
+
+        output_files = process_apple_health_data(
+            results, self.temp_dir.name, database=self.database
+        )
+
+        assert output_files == {SLEEP: self.database, RESTING_HR: self.database}
+        assert not any(name.endswith(".csv") for name in os.listdir(self.temp_dir.name))
+        assert self.query(
+            "SELECT sleep_start, total_time_asleep FROM apple_sleep_sessions"
+        ) == [(datetime.datetime(2024, 1, 1, 23, 0), 7.0)]
@@ -0,0 +1,149 @@
+import os
+import sys
+import tempfile
+
+# Add the src directory to the path so we can import the module
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../../../../../src"))
+
+from training_readiness.etl.stage_data.apple_health.apple_health_parallel import (  # noqa: E402
+    extract_records_parallel,
+    find_record_boundaries,
+)
+from training_readiness.etl.stage_data.apple_health.apple_health_parser import (  # noqa: E402
+    RESTING_HEART_RATE_TYPE,
+    SLEEP_ANALYSIS_TYPE,
+    extract_records,
+)
+from training_readiness.etl.stage_data.apple_health.load_resting_hr_data import (  # noqa: E402
+    collect_resting_hr_record,
+)
+from training_readiness.etl.stage_data.apple_health.load_sleep_data import (  # noqa: E402
+    collect_sleep_record,
+)
+
+COLLECTORS = {
+    SLEEP_ANALYSIS_TYPE: collect_sleep_record,
+    RESTING_HEART_RATE_TYPE: collect_resting_hr_record,
+}
+
+
+def build_export(days):
+    """Build a pretty-printed export.xml like the one written by the phone"""
+    lines = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        "<!DOCTYPE HealthData [",
+        "<!ELEMENT HealthData (ExportDate,Me,(Record|Correlation|Workout)*)>",
+        "<!ATTLIST Record type CDATA #REQUIRED>",
+        "]>",
+        '<HealthData locale="en_US">',
+        ' <ExportDate value="2024-03-01 08:00:00 -0700"/>',
+        ' <Me HKCharacteristicTypeIdentifierBiologicalSex="HKBiologicalSexMale"/>',
+    ]
+    for day in range(1, days + 1):
+        date = f"2024-01-{day:02d}"
+        lines.extend(
+            [
+                f' <Record type="{SLEEP_ANALYSIS_TYPE}" sourceName="Watch" '
+                f'startDate="{date} 23:00:00 -0700" endDate="{date} 23:59:00 -0700" '
+                'value="HKCategoryValueSleepAnalysisAsleepCore"/>',
+                f' <Record type="{RESTING_HEART_RATE_TYPE}" sourceName="Watch" '
+                f'startDate="{date} 08:00:00 -0700" endDate="{date} 08:00:00 -0700" '
+                f'value="{50 + day}" unit="count/min">',
+                '  <MetadataEntry key="HKMetadataKeySyncVersion" value="1"/>',
+                " </Record>",
+                ' <Correlation type="HKCorrelationTypeIdentifierBloodPressure">',
+                f'  <Record type="{RESTING_HEART_RATE_TYPE}" '
+                f'startDate="{date} 09:00:00 -0700" endDate="{date} 09:00:00 -0700" '
+                'value="99" unit="count/min"/>',
+                " </Correlation>",
+            ]
+        )
+    lines.append("</HealthData>")
+    return "\n".join(lines)
+
+
+class TestExtractRecordsParallel:
+    """Test cases for parallel chunked parsing of export.xml"""
+
+    def setup_method(self):
+        """Write a multi-chunk export to a temporary file"""
+        with tempfile.NamedTemporaryFile(mode="w", suffix=".xml", delete=False) as f:
+            f.write(build_export(31))
+            self.temp_file = f.name
+
+    def teardown_method(self):
+        """Remove the temporary export"""
+        os.unlink(self.temp_file)
+
+    def test_boundaries_start_at_top_level_records(self):
+        """Test that every range starts at a top-level Record"""
+        ranges = find_record_boundaries(self.temp_file, chunk_size=1024)
+
+        assert len(ranges) > 3
+        with open(self.temp_file, "rb") as f:
+            data = f.read()
+        for start, end in ranges:
+            assert data[start : start + 7] == b"<Record"
+            # Preceded by the top-level indentation, not a Correlation's
+            assert data[start - 2 : start] == b"\n "
+        # Ranges are contiguous and stop before the closing root tag
+        for (_, end), (next_start, _) in zip(ranges, ranges[1:]):
+            assert end == next_start
+        assert data[ranges[-1][1] :].startswith(b"</HealthData>")
+
+    def test_matches_sequential_parse(self):
+        """Test that parallel parsing returns the sequential rows in order"""
+        expected = extract_records(self.temp_file, COLLECTORS)
+
+        result = extract_records_parallel(
+            self.temp_file, COLLECTORS, workers=2, chunk_size=1024
+        )
+
+        assert result == expected
+        assert len(result[SLEEP_ANALYSIS_TYPE]) == 31
+        # Records nested inside a Correlation are not top-level records
+        assert len(result[RESTING_HEART_RATE_TYPE]) == 31
+
+    def test_high_water_marks_apply_per_chunk(self):
+        """Test that high-water marks are honored in worker processes"""
+        since = {RESTING_HEART_RATE_TYPE: "2024-01-30 00:00:00 -0700"}
+
+        result = extract_records_parallel(
+            self.temp_file, COLLECTORS, since=since, workers=2, chunk_size=1024
+        )
+
+        assert [row["value"] for row in result[RESTING_HEART_RATE_TYPE]] == [
+            80.0,
+            81.0,
+        ]
+
+    def test_small_file_is_parsed_sequentially(self):
+        """Test that a single chunk falls back to the sequential parser"""
+        result = extract_records_parallel(self.temp_file, COLLECTORS, workers=2)
+
+        assert result == extract_records(self.temp_file, COLLECTORS)
+
+    def test_compact_xml(self):
+        """Test that an export without indentation is still parsed correctly"""
+        compact = (
+            '<?xml version="1.0" encoding="UTF-8"?><HealthData>'
+            + "".join(
+                f'<Record type="{RESTING_HEART_RATE_TYPE}" '
+                f'startDate="2024-01-{day:02d} 08:00:00 -0700" '
+                f'endDate="2024-01-{day:02d} 08:00:00 -0700" '
+                f'value="{day}" unit="count/min"/>'
+                for day in range(1, 29)
+            )
+            + "</HealthData>"
+        )
+        with tempfile.NamedTemporaryFile(mode="w", suffix=".xml", delete=False) as f:
+            f.write(compact)
+            compact_file = f.name
+
+        try:
+            result = extract_records_parallel(
+                compact_file, COLLECTORS, workers=2, chunk_size=512
+            )
+            assert result == extract_records(compact_file, COLLECTORS)
+        finally:
+            os.unlink(compact_file)
@@ -0,0 +1,190 @@
+import os
+import sys
+import tempfile
+
+import pandas as pd
+
+# Add the src directory to the path so we can import the module
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../../../../../src"))
+
+from training_readiness.etl.stage_data.apple_health.apple_health_state import (  # noqa: E402
+    load_high_water_marks,
+    merge_analysis,
+    save_high_water_marks,
+)
+from training_readiness.etl.stage_data.apple_health.load_apple_health_data import (  # noqa: E402
+    extract_apple_health_data,
+    process_apple_health_data,
+    update_high_water_marks,
+)
+from training_readiness.etl.stage_data.apple_health.load_resting_hr_data import (  # noqa: E402
+    resting_hr_high_water_mark,
+)
+from training_readiness.etl.stage_data.apple_health.load_sleep_data import (  # noqa: E402
+    sleep_high_water_mark,
+)
+
+SLEEP = "HKCategoryTypeIdentifierSleepAnalysis"
+RESTING_HR = "HKQuantityTypeIdentifierRestingHeartRate"
+
+
+def sleep_record(start, end, value="HKCategoryValueSleepAnalysisAsleepCore"):
+    """Build a sleep Record element"""
+    return (
+        f'<Record type="{SLEEP}" startDate="{start}" endDate="{end}" '
+        f'value="{value}"/>'
+    )
+
+
+def resting_hr_record(start, value):
+    """Build a resting heart rate Record element"""
+    return (
+        f'<Record type="{RESTING_HR}" startDate="{start}" endDate="{start}" '
+        f'value="{value}" unit="count/min"/>'
+    )
+
+
+FIRST_EXPORT = [
+    sleep_record("2024-01-01 23:00:00 -0700", "2024-01-02 06:00:00 -0700"),
+    resting_hr_record("2024-01-02 08:00:00 -0700", 55),
+    # Night in progress when the first export was taken
+    sleep_record("2024-01-02 23:00:00 -0700", "2024-01-03 02:00:00 -0700"),
+    resting_hr_record("2024-01-03 08:00:00 -0700", 60),
+]
+
+SECOND_EXPORT = FIRST_EXPORT + [
+    sleep_record("2024-01-03 02:00:00 -0700", "2024-01-03 06:00:00 -0700"),
+    resting_hr_record("2024-01-03 20:00:00 -0700", 58),
+    sleep_record("2024-01-03 23:00:00 -0700", "2024-01-04 07:00:00 -0700"),
+    resting_hr_record("2024-01-04 08:00:00 -0700", 52),
+]
+
+
+class TestIncrementalIngestion:
+    """Test cases for incremental Apple Health ingestion"""
+
+    def setup_method(self):
+        """Create a temporary working directory"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.xml_file = os.path.join(self.temp_dir.name, "export.xml")
+        self.state_file = os.path.join(self.temp_dir.name, "state.json")
+
+    def teardown_method(self):
+        """Remove the temporary working directory"""
+        self.temp_dir.cleanup()
+
+    def write_export(self, records):
+        """Write an export.xml containing the given records"""
+        with open(self.xml_file, "w") as f:
+            f.write('<?xml version="1.0" encoding="UTF-8"?>\n<HealthData>\n')
+            f.write("\n".join(records))
+            f.write("\n</HealthData>")
+
+    def run_incremental(self):
+        """Run one incremental ingestion and return the extracted results"""
+        since = load_high_water_marks(self.state_file)
+        results = extract_apple_health_data(self.xml_file, since=since)
+        process_apple_health_data(results, self.temp_dir.name, incremental=True)
+        save_high_water_marks(self.state_file, update_high_water_marks(results, since))
+        return results
+
+    def test_sleep_high_water_mark(self):
+        """Test that the sleep mark is the start of the last session"""
+        rows = [
+            {
+                "start_date": "2024-01-02 23:00:00 -0700",
+                "end_date": "2024-01-03 02:00:00 -0700",
+                "sleep_type": "HKCategoryValueSleepAnalysisAsleepCore",
+            },
+            {
+                "start_date": "2024-01-01 23:00:00 -0700",
+                "end_date": "2024-01-02 06:00:00 -0700",
+                "sleep_type": "HKCategoryValueSleepAnalysisAsleepCore",
+            },
+            {
+                "start_date": "2024-01-03 02:00:00 -0700",
+                "end_date": "2024-01-03 03:00:00 -0700",
+                "sleep_type": "HKCategoryValueSleepAnalysisAwake",
+            },
+        ]
+
+        assert sleep_high_water_mark(rows) == "2024-01-02 23:00:00 -0700"
+        assert sleep_high_water_mark([]) is None
+
+    def test_resting_hr_high_water_mark(self):
+        """Test that the resting HR mark is midnight of the latest day"""
+        rows = [
+            {"start_date": "2024-01-03 08:00:00 -0700", "value": 60.0},
+            {"start_date": "2024-01-02 08:00:00 -0700", "value": 55.0},
+        ]
+
+        assert resting_hr_high_water_mark(rows) == "2024-01-03 00:00:00 -0700"
+
+    def test_since_skips_older_records(self):
+        """Test that records before the high-water mark are not collected"""
+        self.write_export(SECOND_EXPORT)
+
+        results = extract_apple_health_data(
+            self.xml_file,
+            since={RESTING_HR: "2024-01-03 00:00:00 -0700"},
+        )
+
+        assert [row["value"] for row in results[RESTING_HR]] == [60.0, 58.0, 52.0]
+        # Types without a mark are collected in full
+        assert len(results[SLEEP]) == 4
+
+    def test_incremental_runs_merge_results(self):
+        """Test that a second run only processes new records and merges them"""
+        self.write_export(FIRST_EXPORT)
+        self.run_incremental()
+
+        self.write_export(SECOND_EXPORT)
+        results = self.run_incremental()
+
+        # Only the in-progress night and later records were re-collected
+        assert len(results[SLEEP]) == 3
+        assert len(results[RESTING_HR]) == 3
+
+        sleep = pd.read_csv(
+            os.path.join(self.temp_dir.name, "apple_sleep_analysis.csv")
+        )
+        assert list(sleep["Sleep_Date"]) == ["01/01/2024", "01/02/2024", "01/03/2024"]
+        # The partial night was replaced by the complete one
+        assert list(sleep["Total_Core_Sleep"]) == [7.0, 7.0, 8.0]
+
+        resting_hr = pd.read_csv(
+            os.path.join(self.temp_dir.name, "apple_resting_hr_analysis.csv")
+        )
+        assert list(resting_hr["Resting_HR_Date"]) == [
+            "01/02/2024",
+            "01/03/2024",
+            "01/04/2024",
+        ]
+        assert list(resting_hr["Resting_HR_Value"]) == [55.0, 58.0, 52.0]
+
+        marks = load_high_water_marks(self.state_file)
+        assert marks[SLEEP] == "2024-01-03 23:00:00 -0700"
+        assert marks[RESTING_HR] == "2024-01-04 00:00:00 -0700"
+
+    def test_rerun_same_export_is_stable(self):
+        """Test that re-running on the same export leaves results unchanged"""
+        self.write_export(SECOND_EXPORT)
+        self.run_incremental()
+        self.run_incremental()
+
+        sleep = pd.read_csv(
+            os.path.join(self.temp_dir.name, "apple_sleep_analysis.csv")
+        )
+        assert len(sleep) == 3
+
+    def test_merge_analysis_without_existing_file(self):
+        """Test that new rows are returned as-is when nothing is stored"""
+        new_data = pd.DataFrame({"Resting_HR_Date": ["01/01/2024"], "Value": [1.0]})
+
+        result = merge_analysis(
+            os.path.join(self.temp_dir.name, "missing.csv"),
+            new_data,
+            "Resting_HR_Date",
+        )
+
+        assert result.equals(new_data)
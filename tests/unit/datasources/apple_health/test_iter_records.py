@@ -0,0 +1,92 @@
+import io
+import os
+import sys
+import tempfile
+
+import pytest
+
+# Add the src directory to the path so we can import the module
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../../../../../src"))
+
+from training_readiness.etl.stage_data.apple_health.apple_health_parser import (  # noqa: E402
+    iter_elements,
+    iter_records,
+)
+
+XML_CONTENT = b"""<?xml version="1.0" encoding="UTF-8"?>
+<!DOCTYPE HealthData [
+<!ELEMENT HealthData (ExportDate,Me,(Record|Workout)*)>
+]>
+<HealthData locale="en_US">
+    <ExportDate value="2024-01-03 08:00:00 +0000"/>
+    <Me HKCharacteristicTypeIdentifierBiologicalSex="HKBiologicalSexMale"/>
+    <Record type="HKQuantityTypeIdentifierStepCount" startDate="2024-01-01 00:00:00 +0000" endDate="2024-01-01 00:10:00 +0000" value="1000" unit="count"/>
+    <Record type="HKQuantityTypeIdentifierRestingHeartRate" startDate="2024-01-01 08:00:00 +0000" endDate="2024-01-01 08:00:00 +0000" value="55" unit="count/min">
+        <MetadataEntry key="HKMetadataKeyHeartRateMotionContext" value="0"/>
+    </Record>
+    <Workout workoutActivityType="HKWorkoutActivityTypeRunning" duration="30" durationUnit="min"/>
+    <Record type="HKCategoryTypeIdentifierSleepAnalysis" startDate="2024-01-01 23:00:00 +0000" endDate="2024-01-02 06:00:00 +0000" value="HKCategoryValueSleepAnalysisAsleep"/>
+</HealthData>"""
+
+
+class TestIterRecords:
+    """Test cases for the streaming Apple Health parser"""
+
+    def setup_method(self):
+        """Write the sample export to a temporary file"""
+        with tempfile.NamedTemporaryFile(mode="wb", suffix=".xml", delete=False) as f:
+            f.write(XML_CONTENT)
+            self.temp_file = f.name
+
+    def teardown_method(self):
+        """Remove the temporary export"""
+        os.unlink(self.temp_file)
+
+    def test_all_records(self):
+        """Test that every Record is yielded when no types are requested"""
+        result = list(iter_records(self.temp_file))
+
+        assert [r["type"] for r in result] == [
+            "HKQuantityTypeIdentifierStepCount",
+            "HKQuantityTypeIdentifierRestingHeartRate",
+            "HKCategoryTypeIdentifierSleepAnalysis",
+        ]
+
+    def test_filter_by_type(self):
+        """Test that only requested record types are yielded"""
+        result = list(
+            iter_records(self.temp_file, {"HKQuantityTypeIdentifierRestingHeartRate"})
+        )
+
+        assert len(result) == 1
+        assert result[0]["value"] == "55"
+        assert result[0]["startDate"] == "2024-01-01 08:00:00 +0000"
+
+    def test_unknown_type_yields_nothing(self):
+        """Test that an unmatched type produces no records"""
+        assert list(iter_records(self.temp_file, {"HKUnknownType"})) == []
+
+    def test_file_object_source(self):
+        """Test reading from an open binary file object"""
+        result = list(iter_records(io.BytesIO(XML_CONTENT)))
+        assert len(result) == 3
+
+    def test_nested_elements_are_not_yielded(self):
+        """Test that MetadataEntry children are not treated as records"""
+        elements = list(iter_elements(self.temp_file, ("MetadataEntry",)))
+        assert elements == []
+
+    def test_elements_are_cleared_after_use(self):
+        """Test that handled elements are released from the tree"""
+        seen = []
+        for elem in iter_elements(self.temp_file, ("Record",)):
+            seen.append(elem)
+
+        assert len(seen) == 3
+        # Each element is cleared once the parser moves past it
+        assert all(len(elem.attrib) == 0 for elem in seen)
+
+    def test_malformed_xml(self):
+        """Test that malformed XML raises a parse error"""
+        with pytest.raises(Exception):
+            list(iter_records(io.BytesIO(b"<HealthData><Record>")))
@@ -0,0 +1,113 @@
+import os
+import sys
+import tempfile
+from unittest.mock import patch
+
+import pytest
+
+# Add the src directory to the path so we can import the module
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../../../../../src"))
+
+from training_readiness.etl.stage_data.apple_health import (  # noqa: E402
+    apple_health_parser,
+)
+from training_readiness.etl.stage_data.apple_health.load_apple_health_data import (  # noqa: E402
+    METRICS,
+    extract_apple_health_data,
+    process_apple_health_data,
+)
+
+XML_CONTENT = """<?xml version="1.0" encoding="UTF-8"?>
+<HealthData>
+    <Record type="HKQuantityTypeIdentifierStepCount" startDate="2024-01-01 00:00:00 +0000" endDate="2024-01-01 00:10:00 +0000" value="1000" unit="count"/>
+    <Record type="HKCategoryTypeIdentifierSleepAnalysis" startDate="2024-01-01 22:00:00 +0000" endDate="2024-01-01 23:00:00 +0000" value="HKCategoryValueSleepAnalysisInBed"/>
+    <Record type="HKCategoryTypeIdentifierSleepAnalysis" startDate="2024-01-01 23:00:00 +0000" endDate="2024-01-02 06:00:00 +0000" value="HKCategoryValueSleepAnalysisAsleep"/>
+    <Record type="HKQuantityTypeIdentifierRestingHeartRate" startDate="2024-01-02 08:00:00 +0000" endDate="2024-01-02 08:00:00 +0000" value="55" unit="count/min"/>
+    <Record type="HKQuantityTypeIdentifierRestingHeartRate" startDate="2024-01-03 08:00:00 +0000" endDate="2024-01-03 08:00:00 +0000" value="" unit="count/min"/>
+</HealthData>"""
+
+
+class TestLoadAppleHealthData:
+    """Test cases for single-pass Apple Health extraction"""
+
+    def setup_method(self):
+        """Write the sample export to a temporary file"""
+        with tempfile.NamedTemporaryFile(mode="w", suffix=".xml", delete=False) as f:
+            f.write(XML_CONTENT)
+            self.temp_file = f.name
+
+    def teardown_method(self):
+        """Remove the temporary export"""
+        os.unlink(self.temp_file)
+
+    def test_file_not_found(self):
+        """Test that FileNotFoundError is raised when XML file doesn't exist"""
+        with pytest.raises(FileNotFoundError, match="XML file not found"):
+            extract_apple_health_data("nonexistent_file.xml")
+
+    def test_extracts_all_metrics(self):
+        """Test that sleep and resting HR are collected from one file"""
+        results = extract_apple_health_data(self.temp_file)
+
+        sleep = results["HKCategoryTypeIdentifierSleepAnalysis"]
+        resting_hr = results["HKQuantityTypeIdentifierRestingHeartRate"]
+
+        assert len(sleep) == 2
+        assert sleep[1]["sleep_type"] == "HKCategoryValueSleepAnalysisAsleep"
+        # The record without a value is skipped by the resting HR collector
+        assert len(resting_hr) == 1
+        assert resting_hr[0]["value"] == 55.0
+
+    def test_single_pass(self):
+        """Test that the export is parsed only once for all metrics"""
+        with patch.object(
+            apple_health_parser,
+            "open_export",
+            wraps=apple_health_parser.open_export,
+        ) as mock_open:
+            extract_apple_health_data(self.temp_file)
+
+        assert mock_open.call_count == 1
+
+    def test_custom_metric(self):
+        """Test that an additional metric can be collected in the same pass"""
+        metrics = dict(METRICS)
+        metrics["HKQuantityTypeIdentifierStepCount"] = {
+            "name": "steps",
+            "collector": lambda record: {"value": float(record["value"])},
+            "processor": lambda rows, debug=False: rows,
+            "saver": lambda rows, output_file: None,
+        }
+
+        results = extract_apple_health_data(self.temp_file, metrics=metrics)
+
+        assert results["HKQuantityTypeIdentifierStepCount"] == [{"value": 1000.0}]
+        assert len(results["HKCategoryTypeIdentifierSleepAnalysis"]) == 2
+
+    def test_process_writes_each_metric(self):
+        """Test that each metric's output is saved to its own file"""
+        results = extract_apple_health_data(self.temp_file)
+
+        with tempfile.TemporaryDirectory() as output_dir:
+            output_files = process_apple_health_data(results, output_dir)
+
+            assert set(output_files) == {
+                "HKCategoryTypeIdentifierSleepAnalysis",
+                "HKQuantityTypeIdentifierRestingHeartRate",
+            }
+            for output_file in output_files.values():
+                assert os.path.exists(output_file)
+            assert (
+                "apple_sleep_analysis_"
+                in output_files["HKCategoryTypeIdentifierSleepAnalysis"]
+            )
+
+    def test_process_skips_empty_metrics(self):
+        """Test that metrics without rows are skipped"""
+        with tempfile.TemporaryDirectory() as output_dir:
+            output_files = process_apple_health_data(
+                {"HKCategoryTypeIdentifierSleepAnalysis": []}, output_dir
+            )
+
+            assert output_files == {}
+            assert os.listdir(output_dir) == []
@@ -0,0 +1,169 @@
+import os
+import sys
+import tempfile
+
+import xml.etree.ElementTree as ET
+
+import pytest
+
+# Add the src directory to the path so we can import the module
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../../../../../src"))
+
+from training_readiness.etl.stage_data.apple_health import (  # noqa: E402
+    apple_health_parser,
+)
+from training_readiness.etl.stage_data.apple_health.apple_health_parallel import (  # noqa: E402
+    _extract_range,
+)
+from training_readiness.etl.stage_data.apple_health.apple_health_parser import (  # noqa: E402
+    RESTING_HEART_RATE_TYPE,
+    SLEEP_ANALYSIS_TYPE,
+    extract_records,
+    iter_elements,
+    iter_records,
+)
+from training_readiness.etl.stage_data.apple_health.load_resting_hr_data import (  # noqa: E402
+    collect_resting_hr_record,
+)
+from training_readiness.etl.stage_data.apple_health.load_sleep_data import (  # noqa: E402
+    collect_sleep_record,
+)
+
+pytestmark = pytest.mark.skipif(
+    apple_health_parser.lxml_etree is None, reason="lxml is not installed"
+)
+
+COLLECTORS = {
+    SLEEP_ANALYSIS_TYPE: collect_sleep_record,
+    RESTING_HEART_RATE_TYPE: collect_resting_hr_record,
+}
+
+
+def build_export(days):
+    """Build an export with nested records, workouts and metadata"""
+    lines = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        "<!DOCTYPE HealthData [",
+        "<!ELEMENT HealthData (ExportDate,Me,(Record|Correlation|Workout)*)>",
+        "]>",
+        '<HealthData locale="en_US">',
+        ' <ExportDate value="2024-03-01 08:00:00 -0700"/>',
+    ]
+    for day in range(1, days + 1):
+        date = f"2024-01-{day:02d}"
+        lines.extend(
+            [
+                f' <Record type="{SLEEP_ANALYSIS_TYPE}" '
+                f'startDate="{date} 23:00:00 -0700" endDate="{date} 23:59:00 -0700" '
+                'value="HKCategoryValueSleepAnalysisAsleepDeep"/>',
+                f' <Record type="{RESTING_HEART_RATE_TYPE}" '
+                f'startDate="{date} 08:00:00 -0700" endDate="{date} 08:00:00 -0700" '
+                f'value="{50 + day}" unit="count/min" sourceName="Watch &amp; Co">',
+                '  <MetadataEntry key="HKMetadataKeySyncVersion" value="1"/>',
+                " </Record>",
+                ' <Correlation type="HKCorrelationTypeIdentifierBloodPressure">',
+                f'  <Record type="{RESTING_HEART_RATE_TYPE}" '
+                f'startDate="{date} 09:00:00 -0700" endDate="{date} 09:00:00 -0700" '
+                'value="99" unit="count/min"/>',
+                " </Correlation>",
+                ' <Workout workoutActivityType="HKWorkoutActivityTypeRunning" '
+                'sourceName="Run &amp; Ride">',
+                '  <WorkoutEvent type="HKWorkoutEventTypeSegment"/>',
+                " </Workout>",
+            ]
+        )
+    lines.append("</HealthData>")
+    return "\n".join(lines)
+
+
+class TestLxmlFastPath:
+    """Test that the lxml parser yields the same output as ElementTree"""
+
+    def setup_method(self):
+        """Write the sample export to a temporary file"""
+        with tempfile.NamedTemporaryFile(mode="w", suffix=".xml", delete=False) as f:
+            f.write(build_export(20))
+            self.temp_file = f.name
+
+    def teardown_method(self):
+        """Remove the temporary export"""
+        os.unlink(self.temp_file)
+
+    def test_extract_records_matches_stdlib(self, monkeypatch):
+        """Test that extracted rows are identical with and without lxml"""
+        with_lxml = extract_records(self.temp_file, COLLECTORS)
+
+        monkeypatch.setattr(apple_health_parser, "lxml_etree", None)
+        with_stdlib = extract_records(self.temp_file, COLLECTORS)
+
+        assert with_lxml == with_stdlib
+        assert len(with_lxml[RESTING_HEART_RATE_TYPE]) == 20
+
+    def test_all_records_match_stdlib(self, monkeypatch):
+        """Test that unfiltered records are identical with and without lxml"""
+        with open(self.temp_file, "rb") as f:
+            with_lxml = list(iter_records(f))
+
+        monkeypatch.setattr(apple_health_parser, "lxml_etree", None)
+        with open(self.temp_file, "rb") as f:
+            with_stdlib = list(iter_records(f))
+
+        assert with_lxml == with_stdlib
+        # Records nested inside a Correlation are not top-level records
+        assert len(with_lxml) == 40
+        assert with_lxml[1]["sourceName"] == "Watch & Co"
+
+    def test_elements_match_stdlib(self, monkeypatch):
+        """Test that top-level elements and their children are identical"""
+
+        def snapshot(elem):
+            return (elem.tag, dict(elem.attrib), [snapshot(child) for child in elem])
+
+        tags = ("Record", "Workout")
+        with_lxml = [snapshot(elem) for elem in iter_elements(self.temp_file, tags)]
+
+        monkeypatch.setattr(apple_health_parser, "lxml_etree", None)
+        with_stdlib = [snapshot(elem) for elem in iter_elements(self.temp_file, tags)]
+
+        assert with_lxml == with_stdlib
+        assert len(with_lxml) == 60
+        assert with_lxml[2][1]["sourceName"] == "Run & Ride"
+
+    def test_elements_are_standalone(self):
+        """Test that wanted elements are built without a tree of skipped ones"""
+        workouts = list(iter_elements(self.temp_file, ("Workout",)))
+
+        assert len(workouts) == 20
+        assert all(isinstance(elem, ET.Element) for elem in workouts)
+
+    def test_skipped_records_are_never_built(self, monkeypatch):
+        """Test that Records before the last Workout are not kept in a tree"""
+        built = []
+
+        class CountingTreeBuilder(ET.TreeBuilder):
+            def start(self, tag, attrs):
+                built.append(tag)
+                return super().start(tag, attrs)
+
+        # Apple writes every Record before the first Workout
+        records = "".join(
+            f'<Record type="{RESTING_HEART_RATE_TYPE}" value="{i}"/>'
+            for i in range(5000)
+        )
+        export = f"<HealthData>{records}<Workout><WorkoutEvent/></Workout></HealthData>"
+        with open(self.temp_file, "w") as f:
+            f.write(export)
+        monkeypatch.setattr(apple_health_parser.ET, "TreeBuilder", CountingTreeBuilder)
+
+        workouts = list(iter_elements(self.temp_file, ("Workout",)))
+
+        assert len(workouts) == 1
+        assert built == ["Workout", "WorkoutEvent"]
+
+    def test_worker_parse_error_is_picklable(self):
+        """Test that lxml errors in a worker are raised as ET.ParseError"""
+        with open(self.temp_file, "rb") as f:
+            start = f.read().index(b"<Record") + 1
+
+        with pytest.raises(ET.ParseError):
+            _extract_range((self.temp_file, start, start + 200, COLLECTORS, None))
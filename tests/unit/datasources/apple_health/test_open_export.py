@@ -0,0 +1,99 @@
+import os
+import sys
+import tempfile
+import zipfile
+
+import pytest
+
+# Add the src directory to the path so we can import the module
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../../../../../src"))
+
+from training_readiness.etl.stage_data.apple_health.apple_health_parser import (  # noqa: E402
+    find_export_file,
+    iter_records,
+    open_export,
+)
+from training_readiness.etl.stage_data.apple_health.load_sleep_data import (  # noqa: E402
+    extract_sleep_data_from_xml,
+)
+
+XML_CONTENT = """<?xml version="1.0" encoding="UTF-8"?>
+<HealthData>
+    <Record type="HKCategoryTypeIdentifierSleepAnalysis" startDate="2024-01-01 23:00:00 +0000" endDate="2024-01-02 06:00:00 +0000" value="HKCategoryValueSleepAnalysisAsleep"/>
+    <Record type="HKQuantityTypeIdentifierRestingHeartRate" startDate="2024-01-02 08:00:00 +0000" endDate="2024-01-02 08:00:00 +0000" value="55" unit="count/min"/>
+</HealthData>"""
+
+
+class TestOpenExport:
+    """Test cases for reading the export from export.zip"""
+
+    def setup_method(self):
+        """Create a temporary directory for exports"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.zip_path = os.path.join(self.temp_dir.name, "export.zip")
+
+    def teardown_method(self):
+        """Remove the temporary directory"""
+        self.temp_dir.cleanup()
+
+    def write_zip(self, members):
+        """Write an archive with the given member names and contents"""
+        with zipfile.ZipFile(self.zip_path, "w", zipfile.ZIP_DEFLATED) as archive:
+            for name, content in members.items():
+                archive.writestr(name, content)
+
+    def test_open_plain_xml(self):
+        """Test that an unpacked export.xml is opened as a file"""
+        xml_path = os.path.join(self.temp_dir.name, "export.xml")
+        with open(xml_path, "w") as f:
+            f.write(XML_CONTENT)
+
+        with open_export(xml_path) as f:
+            assert f.read().startswith(b"<?xml")
+
+    def test_records_from_zip(self):
+        """Test that records are streamed straight out of export.zip"""
+        self.write_zip(
+            {
+                "apple_health_export/export_cda.xml": "<ClinicalDocument/>",
+                "apple_health_export/export.xml": XML_CONTENT,
+            }
+        )
+
+        result = list(iter_records(self.zip_path))
+
+        assert [r["type"] for r in result] == [
+            "HKCategoryTypeIdentifierSleepAnalysis",
+            "HKQuantityTypeIdentifierRestingHeartRate",
+        ]
+        # Nothing is unpacked next to the archive
+        assert os.listdir(self.temp_dir.name) == ["export.zip"]
+
+    def test_zip_without_export_xml(self):
+        """Test that an archive without export.xml raises FileNotFoundError"""
+        self.write_zip({"apple_health_export/export_cda.xml": "<ClinicalDocument/>"})
+
+        with pytest.raises(FileNotFoundError, match="export.xml not found"):
+            with open_export(self.zip_path):
+                pass
+
+    def test_extract_sleep_data_from_zip(self):
+        """Test that the sleep extractor accepts export.zip"""
+        self.write_zip({"apple_health_export/export.xml": XML_CONTENT})
+
+        result = extract_sleep_data_from_xml(self.zip_path)
+
+        assert len(result) == 1
+        assert result[0]["sleep_type"] == "HKCategoryValueSleepAnalysisAsleep"
+
+    def test_find_export_prefers_zip(self):
+        """Test that export.zip is used when present"""
+        self.write_zip({"apple_health_export/export.xml": XML_CONTENT})
+
+        assert find_export_file(self.temp_dir.name) == self.zip_path
+
+    def test_find_export_falls_back_to_xml(self):
+        """Test that the unpacked export.xml path is used without an archive"""
+        expected = os.path.join(self.temp_dir.name, "apple_health_export", "export.xml")
+
+        assert find_export_file(self.temp_dir.name) == expected
@@ -0,0 +1,258 @@
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Add the src directory to the path so we can import the module
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../../../../../src"))
+
+from training_readiness.etl.stage_data.apple_health.load_activity_data import (  # noqa: E402
+    ACTIVITY_COLUMNS,
+    compact_activity_samples,
+    extract_activity_samples,
+    merge_intervals,
+    process_activity_data,
+    uncovered_fraction,
+)
+
+STEPS = "HKQuantityTypeIdentifierStepCount"
+ENERGY = "HKQuantityTypeIdentifierActiveEnergyBurned"
+EXERCISE = "HKQuantityTypeIdentifierAppleExerciseTime"
+
+SOURCE_NAMES = ["Sam's Apple Watch", "Sam's iPhone"]
+WATCH, PHONE = 0, 1
+STEP_METRIC, ENERGY_METRIC, EXERCISE_METRIC = 0, 1, 2
+
+
+def activity_record(record_type, start, end, value, unit, source="Sam's Apple Watch"):
+    """Build an activity Record element"""
+    return (
+        f'<Record type="{record_type}" sourceName="{source}" unit="{unit}" '
+        f'startDate="{start}" endDate="{end}" value="{value}"/>'
+    )
+
+
+def samples(rows):
+    """Build compact samples from (metric, source, start, end, value) rows"""
+    columns = [list(column) for column in zip(*rows)] or [[] for _ in range(5)]
+    return compact_activity_samples(*columns)
+
+
+class TestExtractActivitySamples:
+    """Test cases for streaming activity samples into arrays"""
+
+    def setup_method(self):
+        """Write a sample export to a temporary file"""
+        records = [
+            activity_record(
+                STEPS,
+                f"2024-01-01 08:{minute:02d}:00 -0700",
+                f"2024-01-01 08:{minute:02d}:59 -0700",
+                100,
+                "count",
+                source="Sam's iPhone" if minute % 2 else "Sam's Apple Watch",
+            )
+            for minute in range(25)
+        ]
+        records.append(
+            activity_record(
+                ENERGY,
+                "2024-01-01 09:00:00 -0700",
+                "2024-01-01 09:10:00 -0700",
+                418.4,
+                "kJ",
+            )
+        )
+        records.append(
+            activity_record(
+                EXERCISE,
+                "2024-01-01 09:00:00 -0700",
+                "2024-01-01 09:01:00 -0700",
+                1,
+                "min",
+            )
+        )
+        records.append(
+            activity_record(STEPS, "2024-01-01 09:00:00 -0700", "", 5, "furlongs")
+        )
+        with tempfile.NamedTemporaryFile(mode="w", suffix=".xml", delete=False) as f:
+            f.write("<HealthData>\n" + "\n".join(records) + "\n</HealthData>")
+            self.temp_file = f.name
+
+    def teardown_method(self):
+        """Remove the temporary export"""
+        os.unlink(self.temp_file)
+
+    def test_compact_dtypes_and_units(self):
+        """Test that samples are compact and converted to the output units"""
+        result, source_names = extract_activity_samples(self.temp_file, chunk_size=10)
+
+        assert len(result) == 27
+        assert source_names == SOURCE_NAMES
+        assert result["metric"].dtype == "int8"
+        assert result["source"].dtype == "int16"
+        assert set(result["offset_minutes"]) == {-420}
+        energy = result[result["metric"] == ENERGY_METRIC]
+        assert energy["value"].iloc[0] == pytest.approx(100.0)
+
+    def test_chunking_does_not_change_result(self):
+        """Test that the chunk size only bounds memory"""
+        expected, _ = extract_activity_samples(self.temp_file)
+
+        result, _ = extract_activity_samples(self.temp_file, chunk_size=4)
+
+        pd.testing.assert_frame_equal(result, expected)
+
+    def test_file_not_found(self):
+        """Test that a missing export raises"""
+        with pytest.raises(FileNotFoundError):
+            extract_activity_samples("/nonexistent/export.xml")
+
+
+class TestIntervalCoverage:
+    """Test cases for the interval arithmetic behind source deduplication"""
+
+    def test_merge_intervals(self):
+        """Test that overlapping and nested intervals are merged"""
+        start, end = merge_intervals(np.array([0, 2, 3, 10]), np.array([5, 4, 6, 12]))
+
+        assert list(start) == [0, 10]
+        assert list(end) == [6, 12]
+
+    def test_uncovered_fraction(self):
+        """Test partial, full and no coverage, and instantaneous samples"""
+        fraction = uncovered_fraction(
+            np.array([0, 4, 20, 5, 8]),
+            np.array([10, 6, 30, 5, 8]),
+            np.array([0, 5]),
+            np.array([2, 7]),
+        )
+
+        np.testing.assert_allclose(fraction, [0.6, 0.5, 1.0, 0.0, 1.0])
+
+
+class TestProcessActivityData:
+    """Test cases for daily activity totals"""
+
+    def test_empty(self):
+        """Test that no samples produce an empty output with headers"""
+        output_data = process_activity_data(samples([]), [])
+
+        assert list(output_data.columns) == ACTIVITY_COLUMNS
+        assert output_data.empty
+
+    def test_phone_steps_covered_by_watch_are_dropped(self):
+        """Test that the watch wins where both devices counted steps"""
+        output_data = process_activity_data(
+            samples(
+                [
+                    (
+                        STEP_METRIC,
+                        WATCH,
+                        "2024-01-01 08:00:00 -0700",
+                        "2024-01-01 08:10:00 -0700",
+                        1000,
+                    ),
+                    # Half of the phone's interval is covered by the watch
+                    (
+                        STEP_METRIC,
+                        PHONE,
+                        "2024-01-01 08:05:00 -0700",
+                        "2024-01-01 08:15:00 -0700",
+                        800,
+                    ),
+                    # Phone only, while the watch was charging
+                    (
+                        STEP_METRIC,
+                        PHONE,
+                        "2024-01-01 12:00:00 -0700",
+                        "2024-01-01 12:10:00 -0700",
+                        500,
+                    ),
+                ]
+            ),
+            SOURCE_NAMES,
+        )
+
+        assert output_data["Step_Count"].tolist() == [1900]
+
+    def test_exact_duplicates_count_once(self):
+        """Test that a sample exported twice is only counted once"""
+        row = (
+            ENERGY_METRIC,
+            WATCH,
+            "2024-01-01 08:00:00 -0700",
+            "2024-01-01 08:01:00 -0700",
+            12.5,
+        )
+
+        output_data = process_activity_data(samples([row, row]), SOURCE_NAMES)
+
+        assert output_data["Active_Energy_Kcal"].tolist() == [12.5]
+
+    def test_metrics_are_deduplicated_separately(self):
+        """Test that watch energy does not hide phone steps"""
+        output_data = process_activity_data(
+            samples(
+                [
+                    (
+                        ENERGY_METRIC,
+                        WATCH,
+                        "2024-01-01 08:00:00 -0700",
+                        "2024-01-01 09:00:00 -0700",
+                        300,
+                    ),
+                    (
+                        STEP_METRIC,
+                        PHONE,
+                        "2024-01-01 08:00:00 -0700",
+                        "2024-01-01 09:00:00 -0700",
+                        4000,
+                    ),
+                    (
+                        EXERCISE_METRIC,
+                        WATCH,
+                        "2024-01-01 08:00:00 -0700",
+                        "2024-01-01 08:30:00 -0700",
+                        30,
+                    ),
+                ]
+            ),
+            SOURCE_NAMES,
+        )
+
+        row = output_data.iloc[0]
+        assert row["Step_Count"] == 4000
+        assert row["Active_Energy_Kcal"] == 300.0
+        assert row["Exercise_Minutes"] == 30.0
+
+    def test_days_use_local_time(self):
+        """Test that samples are assigned to the local day they start on"""
+        output_data = process_activity_data(
+            samples(
+                [
+                    (
+                        STEP_METRIC,
+                        WATCH,
+                        "2024-01-01 23:50:00 -0700",
+                        "2024-01-02 00:10:00 -0700",
+                        300,
+                    ),
+                    (
+                        STEP_METRIC,
+                        WATCH,
+                        "2024-01-02 08:00:00 -0700",
+                        "2024-01-02 08:10:00 -0700",
+                        200,
+                    ),
+                ]
+            ),
+            SOURCE_NAMES,
+        )
+
+        assert output_data["Activity_Date"].tolist() == ["01/01/2024", "01/02/2024"]
+        assert output_data["Step_Count"].tolist() == [300, 200]
+        assert output_data["Exercise_Minutes"].tolist() == [0.0, 0.0]
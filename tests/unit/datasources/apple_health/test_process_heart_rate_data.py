@@ -0,0 +1,183 @@
+import os
+import sys
+import tempfile
+
+import pandas as pd
+import pytest
+
+# Add the src directory to the path so we can import the module
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../../../../../src"))
+
+from training_readiness.etl.stage_data.apple_health.load_heart_rate_data import (  # noqa: E402
+    HEART_RATE_DAILY_COLUMNS,
+    HEART_RATE_MINUTE_COLUMNS,
+    compact_heart_rate_samples,
+    extract_heart_rate_samples,
+    process_heart_rate_data,
+)
+
+HEART_RATE = "HKQuantityTypeIdentifierHeartRate"
+
+
+def heart_rate_record(start, value):
+    """Build a heart rate Record element"""
+    return (
+        f'<Record type="{HEART_RATE}" unit="count/min" startDate="{start}" '
+        f'endDate="{start}" value="{value}"/>'
+    )
+
+
+def samples(rows):
+    """Build compact samples from (start_date, bpm) pairs"""
+    return compact_heart_rate_samples([row[0] for row in rows], [r[1] for r in rows])
+
+
+class TestExtractHeartRateSamples:
+    """Test cases for streaming heart rate samples into arrays"""
+
+    def setup_method(self):
+        """Write a sample export to a temporary file"""
+        records = [
+            heart_rate_record(f"2024-01-01 08:{minute:02d}:00 -0700", 60 + minute)
+            for minute in range(25)
+        ]
+        records.append(
+            '<Record type="HKQuantityTypeIdentifierRestingHeartRate" unit="count/min" '
+            'startDate="2024-01-01 08:00:00 -0700" value="50"/>'
+        )
+        records.append(f'<Record type="{HEART_RATE}" startDate="" value="70"/>')
+        with tempfile.NamedTemporaryFile(mode="w", suffix=".xml", delete=False) as f:
+            f.write("<HealthData>\n" + "\n".join(records) + "\n</HealthData>")
+            self.temp_file = f.name
+
+    def teardown_method(self):
+        """Remove the temporary export"""
+        os.unlink(self.temp_file)
+
+    def test_compact_dtypes(self):
+        """Test that samples are stored as compact int and float arrays"""
+        result = extract_heart_rate_samples(self.temp_file, chunk_size=10)
+
+        assert len(result) == 25
+        assert result.dtypes.to_dict() == {
+            "utc_seconds": "int64",
+            "offset_minutes": "int16",
+            "bpm": "float32",
+        }
+        assert set(result["offset_minutes"]) == {-420}
+        assert result["bpm"].iloc[-1] == 84.0
+
+    def test_chunking_does_not_change_result(self):
+        """Test that the chunk size only bounds memory"""
+        expected = extract_heart_rate_samples(self.temp_file)
+
+        result = extract_heart_rate_samples(self.temp_file, chunk_size=7)
+
+        pd.testing.assert_frame_equal(result, expected)
+
+    def test_file_not_found(self):
+        """Test that a missing export raises"""
+        with pytest.raises(FileNotFoundError):
+            extract_heart_rate_samples("/nonexistent/export.xml")
+
+
+class TestProcessHeartRateData:
+    """Test cases for per-minute and per-day heart rate aggregates"""
+
+    def test_empty(self):
+        """Test that no samples produce empty outputs with headers"""
+        minute_data, daily_data = process_heart_rate_data(samples([]))
+
+        assert list(minute_data.columns) == HEART_RATE_MINUTE_COLUMNS
+        assert list(daily_data.columns) == HEART_RATE_DAILY_COLUMNS
+        assert minute_data.empty and daily_data.empty
+
+    def test_minute_aggregates(self):
+        """Test min, mean, max and count within a local minute"""
+        minute_data, _ = process_heart_rate_data(
+            samples(
+                [
+                    ("2024-01-01 08:00:10 -0700", 60),
+                    ("2024-01-01 08:00:40 -0700", 70),
+                    ("2024-01-01 08:01:00 -0700", 90),
+                ]
+            )
+        )
+
+        assert list(minute_data["Heart_Rate_Minute"]) == [
+            "01/01/2024 08:00",
+            "01/01/2024 08:01",
+        ]
+        first = minute_data.iloc[0]
+        assert (first["Heart_Rate_Min"], first["Heart_Rate_Mean"]) == (60.0, 65.0)
+        assert (first["Heart_Rate_Max"], first["Heart_Rate_Count"]) == (70.0, 2)
+
+    def test_days_use_local_time(self):
+        """Test that samples are assigned to the day of their own offset"""
+        _, daily_data = process_heart_rate_data(
+            samples(
+                [
+                    ("2024-01-01 23:30:00 -0700", 60),
+                    ("2024-01-02 00:30:00 -0700", 80),
+                ]
+            )
+        )
+
+        assert list(daily_data["Heart_Rate_Date"]) == ["01/01/2024", "01/02/2024"]
+
+    def test_time_in_zones(self):
+        """Test that samples count until the next one, capped at the max gap"""
+        _, daily_data = process_heart_rate_data(
+            samples(
+                [
+                    # Zone 3 (140-160 bpm with max 200) for 30 seconds
+                    ("2024-01-01 08:00:00 +0000", 150),
+                    # Zone 5 for 60 seconds (gap capped)
+                    ("2024-01-01 08:00:30 +0000", 185),
+                    # Below zone 1 is not reported
+                    ("2024-01-01 08:10:00 +0000", 70),
+                    # Zone 1 for the capped 60 seconds of the last sample
+                    ("2024-01-01 08:10:30 +0000", 100),
+                ]
+            ),
+            max_hr=200,
+        )
+
+        row = daily_data.iloc[0]
+        assert row["Zone_1_Minutes"] == 1.0
+        assert row["Zone_2_Minutes"] == 0.0
+        assert row["Zone_3_Minutes"] == 0.5
+        assert row["Zone_4_Minutes"] == 0.0
+        assert row["Zone_5_Minutes"] == 1.0
+        assert row["Heart_Rate_Count"] == 4
+
+    def test_unordered_sources(self):
+        """Test that interleaved sources are ordered before durations"""
+        rows = [
+            ("2024-01-01 08:00:30 +0000", 185),
+            ("2024-01-01 08:00:00 +0000", 150),
+        ]
+
+        _, daily_data = process_heart_rate_data(samples(rows), max_hr=200)
+
+        assert daily_data.iloc[0]["Zone_3_Minutes"] == 0.5
+
+    def test_offset_change_reorders_minutes(self):
+        """Test that local minutes stay grouped when the UTC offset goes back"""
+        minute_data, daily_data = process_heart_rate_data(
+            samples(
+                [
+                    ("2024-11-03 01:30:00 -0600", 60),
+                    # An hour later in UTC, but back at 01:30 local time
+                    ("2024-11-03 01:30:20 -0700", 80),
+                    ("2024-11-03 01:10:00 -0700", 100),
+                ]
+            )
+        )
+
+        assert list(minute_data["Heart_Rate_Minute"]) == [
+            "11/03/2024 01:10",
+            "11/03/2024 01:30",
+        ]
+        assert list(minute_data["Heart_Rate_Mean"]) == [100.0, 70.0]
+        assert daily_data.iloc[0]["Heart_Rate_Count"] == 3
@@ -0,0 +1,161 @@
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+# Add the src directory to the path so we can import the module
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../../../../../src"))
+
+from training_readiness.etl.stage_data.apple_health.load_hrv_data import (  # noqa: E402
+    HRV_COLUMNS,
+    extract_hrv_data_from_xml,
+    hrv_high_water_mark,
+    merge_hrv_analysis,
+    process_hrv_data,
+    save_hrv_analysis,
+)
+
+
+def hrv_record(start, value):
+    """Build a collected HRV row"""
+    return {"start_date": start, "end_date": start, "value": value, "unit": "ms"}
+
+
+def daily_records(values, first_day="2024-01-01"):
+    """One morning reading per consecutive day"""
+    days = pd.date_range(first_day, periods=len(values), freq="D")
+    return [
+        hrv_record(f"{day:%Y-%m-%d} 07:00:00 -0700", float(value))
+        for day, value in zip(days, values)
+    ]
+
+
+class TestProcessHrvData:
+    """Test cases for process_hrv_data and merge_hrv_analysis"""
+
+    def setup_method(self):
+        """Create a directory for stored results"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.output_file = os.path.join(self.temp_dir.name, "apple_hrv_analysis.csv")
+
+    def teardown_method(self):
+        """Remove the temporary directory"""
+        self.temp_dir.cleanup()
+
+    def test_empty_data(self):
+        """Test that no readings give an empty frame with the output columns"""
+        result = process_hrv_data([])
+
+        assert result.empty
+        assert list(result.columns) == HRV_COLUMNS
+
+    def test_daily_mean_by_local_day(self):
+        """Test that readings are averaged per local day"""
+        result = process_hrv_data(
+            [
+                hrv_record("2024-01-01 07:00:00 -0700", 40.0),
+                hrv_record("2024-01-01 23:30:00 -0700", 50.0),
+                # Same UTC day as the reading above, but the next local day
+                hrv_record("2024-01-02 01:00:00 -0700", 60.0),
+            ]
+        )
+
+        assert list(result["HRV_Date"]) == ["01/01/2024", "01/02/2024"]
+        assert list(result["HRV_SDNN"]) == [45.0, 60.0]
+
+    def test_baselines_use_prior_days_only(self):
+        """Test that each day is compared against the days before it"""
+        values = [40, 50, 60, 70, 80]
+        result = process_hrv_data(daily_records(values))
+
+        # At least three prior days are needed for the 7-day baseline
+        assert result["HRV_Baseline_7d"].iloc[:3].isna().all()
+        assert result["HRV_Baseline_7d"].iloc[3] == 50.0
+        assert result["HRV_Baseline_7d"].iloc[4] == 55.0
+
+        expected_z = (70 - 50) / np.std([40, 50, 60], ddof=1)
+        assert result["HRV_Z_7d"].iloc[3] == round(expected_z, 2)
+        # The 60-day baseline needs two weeks of history
+        assert result["HRV_Baseline_60d"].isna().all()
+
+    def test_baseline_window_is_by_calendar_day(self):
+        """Test that days without readings do not stretch the window"""
+        records = daily_records([40, 50, 60]) + daily_records(
+            [70, 80], first_day="2024-01-09"
+        )
+
+        result = process_hrv_data(records)
+
+        # On 01/09 the last seven days only contain 01/02 and 01/03
+        assert result["HRV_Date"].iloc[3] == "01/09/2024"
+        assert np.isnan(result["HRV_Baseline_7d"].iloc[3])
+
+    def test_constant_history_has_no_z_score(self):
+        """Test that a baseline without spread does not divide by zero"""
+        result = process_hrv_data(daily_records([50, 50, 50, 60]))
+
+        assert result["HRV_Baseline_7d"].iloc[3] == 50.0
+        assert np.isnan(result["HRV_Z_7d"].iloc[3])
+
+    def test_incremental_merge_matches_full_run(self):
+        """Test that merging new days gives the same result as a full run"""
+        values = np.random.default_rng(0).normal(55, 8, 90).round(1)
+        records = daily_records(values)
+
+        save_hrv_analysis(process_hrv_data(records[:80]), self.output_file)
+        # The last stored day is re-collected, as after a high-water mark
+        merged = merge_hrv_analysis(
+            self.output_file, process_hrv_data(records[79:]), "HRV_Date"
+        )
+
+        expected = process_hrv_data(records)
+        pd.testing.assert_frame_equal(
+            merged.reset_index(drop=True), expected, check_dtype=False
+        )
+
+    def test_merge_keeps_stored_rows(self):
+        """Test that stored days before the new ones are left untouched"""
+        stored = process_hrv_data(daily_records([40, 50, 60, 70]))
+        stored.loc[0, "HRV_Baseline_60d"] = 99.0
+        save_hrv_analysis(stored, self.output_file)
+
+        merged = merge_hrv_analysis(
+            self.output_file,
+            process_hrv_data(daily_records([80], first_day="2024-01-05")),
+        )
+
+        assert merged["HRV_Baseline_60d"].iloc[0] == 99.0
+        assert list(merged["HRV_SDNN"]) == [40.0, 50.0, 60.0, 70.0, 80.0]
+        assert merged["HRV_Baseline_7d"].iloc[4] == 55.0
+
+    def test_merge_without_existing_file(self):
+        """Test that new rows are returned as-is when nothing is stored"""
+        new_data = process_hrv_data(daily_records([40, 50]))
+
+        result = merge_hrv_analysis(self.output_file, new_data)
+
+        assert result.equals(new_data)
+
+    def test_high_water_mark_is_start_of_last_day(self):
+        """Test that incremental runs resume at midnight of the latest day"""
+        records = daily_records([40, 50])
+
+        assert hrv_high_water_mark(records) == "2024-01-02 00:00:00 -0700"
+
+    def test_extract_from_xml(self):
+        """Test that SDNN records are read from the export"""
+        xml_file = os.path.join(self.temp_dir.name, "export.xml")
+        with open(xml_file, "w") as f:
+            f.write("""<?xml version="1.0" encoding="UTF-8"?>
+<HealthData>
+    <Record type="HKQuantityTypeIdentifierHeartRateVariabilitySDNN" startDate="2024-01-01 07:00:00 -0700" endDate="2024-01-01 07:01:00 -0700" value="48.5" unit="ms"/>
+    <Record type="HKQuantityTypeIdentifierRestingHeartRate" startDate="2024-01-01 08:00:00 -0700" endDate="2024-01-01 08:00:00 -0700" value="55" unit="count/min"/>
+    <Record type="HKQuantityTypeIdentifierHeartRateVariabilitySDNN" startDate="2024-01-02 07:00:00 -0700" endDate="2024-01-02 07:01:00 -0700" unit="ms"/>
+</HealthData>""")
+
+        for scan in (False, True):
+            hrv_data = extract_hrv_data_from_xml(xml_file, scan=scan)
+
+            assert [row["value"] for row in hrv_data] == [48.5]
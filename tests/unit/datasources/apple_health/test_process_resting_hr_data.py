@@ -18,7 +18,7 @@ class TestProcessRestingHrData:
     def test_empty_data(self):
         """Test processing empty data"""
         result = process_resting_hr_data([])
-        assert result == []
+        assert result.empty
 
     def test_single_day_single_record(self):
         """Test processing single record for one day"""
@@ -34,8 +34,8 @@ class TestProcessRestingHrData:
         result = process_resting_hr_data(input_data)
 
         assert len(result) == 1
-        assert result[0]["Resting_HR_Date"] == "01/01/2024"
-        assert result[0]["Resting_HR_Value"] == 65.0
+        assert result.iloc[0]["Resting_HR_Date"] == "01/01/2024"
+        assert result.iloc[0]["Resting_HR_Value"] == 65.0
 
     def test_single_day_multiple_records(self):
         """Test processing multiple records for one day - should take the last one"""
@@ -57,8 +57,10 @@ class TestProcessRestingHrData:
         result = process_resting_hr_data(input_data)
 
         assert len(result) == 1
-        assert result[0]["Resting_HR_Date"] == "01/01/2024"
-        assert result[0]["Resting_HR_Value"] == 68.0  # Should take the later record
+        assert result.iloc[0]["Resting_HR_Date"] == "01/01/2024"
+        assert (
+            result.iloc[0]["Resting_HR_Value"] == 68.0
+        )  # Should take the later record
 
     def test_multiple_days(self):
         """Test processing records for multiple days"""
@@ -86,12 +88,12 @@ class TestProcessRestingHrData:
         result = process_resting_hr_data(input_data)
 
         assert len(result) == 3
-        assert result[0]["Resting_HR_Date"] == "01/01/2024"
-        assert result[0]["Resting_HR_Value"] == 65.0
-        assert result[1]["Resting_HR_Date"] == "01/02/2024"
-        assert result[1]["Resting_HR_Value"] == 68.0
-        assert result[2]["Resting_HR_Date"] == "01/03/2024"
-        assert result[2]["Resting_HR_Value"] == 62.0
+        assert result.iloc[0]["Resting_HR_Date"] == "01/01/2024"
+        assert result.iloc[0]["Resting_HR_Value"] == 65.0
+        assert result.iloc[1]["Resting_HR_Date"] == "01/02/2024"
+        assert result.iloc[1]["Resting_HR_Value"] == 68.0
+        assert result.iloc[2]["Resting_HR_Date"] == "01/03/2024"
+        assert result.iloc[2]["Resting_HR_Value"] == 62.0
 
     def test_multiple_records_per_day_takes_latest(self):
         """Test that when multiple records exist for a day, it takes the latest one"""
@@ -119,8 +121,10 @@ class TestProcessRestingHrData:
         result = process_resting_hr_data(input_data)
 
         assert len(result) == 1
-        assert result[0]["Resting_HR_Date"] == "01/01/2024"
-        assert result[0]["Resting_HR_Value"] == 68.0  # Should take the latest (18:00)
+        assert result.iloc[0]["Resting_HR_Date"] == "01/01/2024"
+        assert (
+            result.iloc[0]["Resting_HR_Value"] == 68.0
+        )  # Should take the latest (18:00)
 
     def test_value_rounding(self):
         """Test that values are rounded to 1 decimal place"""
@@ -136,7 +140,7 @@ class TestProcessRestingHrData:
         result = process_resting_hr_data(input_data)
 
         assert len(result) == 1
-        assert result[0]["Resting_HR_Value"] == 65.1
+        assert result.iloc[0]["Resting_HR_Value"] == 65.1
 
     def test_debug_mode(self):
         """Test that debug mode creates debug file"""
@@ -158,8 +162,8 @@ class TestProcessRestingHrData:
             result = process_resting_hr_data(input_data, debug=True)
 
         assert len(result) == 1
-        assert result[0]["Resting_HR_Date"] == "01/01/2024"
-        assert result[0]["Resting_HR_Value"] == 65.0
+        assert result.iloc[0]["Resting_HR_Date"] == "01/01/2024"
+        assert result.iloc[0]["Resting_HR_Value"] == 65.0
 
     def test_date_formatting(self):
         """Test that dates are formatted correctly"""
@@ -175,4 +179,77 @@ class TestProcessRestingHrData:
         result = process_resting_hr_data(input_data)
 
         assert len(result) == 1
-        assert result[0]["Resting_HR_Date"] == "12/25/2024"  # MM/DD/YYYY format
+        assert result.iloc[0]["Resting_HR_Date"] == "12/25/2024"  # MM/DD/YYYY format
+
+    def test_multiple_reducers(self):
+        """Test computing several daily statistics in one pass"""
+        input_data = [
+            {
+                "start_date": "2024-01-01 06:00:00 +0000",
+                "end_date": "2024-01-01 06:00:00 +0000",
+                "value": 70.0,
+                "unit": "count/min",
+            },
+            {
+                "start_date": "2024-01-01 18:00:00 +0000",
+                "end_date": "2024-01-01 18:00:00 +0000",
+                "value": 61.0,
+                "unit": "count/min",
+            },
+            {
+                "start_date": "2024-01-01 12:00:00 +0000",
+                "end_date": "2024-01-01 12:00:00 +0000",
+                "value": 65.0,
+                "unit": "count/min",
+            },
+            {
+                "start_date": "2024-01-02 08:00:00 +0000",
+                "end_date": "2024-01-02 08:00:00 +0000",
+                "value": 58.0,
+                "unit": "count/min",
+            },
+        ]
+
+        result = process_resting_hr_data(
+            input_data, reducers=("last", "min", "mean", "count")
+        )
+
+        assert list(result.columns) == [
+            "Resting_HR_Date",
+            "Resting_HR_Value",
+            "Resting_HR_Min",
+            "Resting_HR_Mean",
+            "Resting_HR_Count",
+        ]
+        assert result.iloc[0]["Resting_HR_Value"] == 61.0
+        assert result.iloc[0]["Resting_HR_Min"] == 61.0
+        assert result.iloc[0]["Resting_HR_Mean"] == 65.3
+        assert result.iloc[0]["Resting_HR_Count"] == 3
+        assert result.iloc[1]["Resting_HR_Date"] == "01/02/2024"
+        assert result.iloc[1]["Resting_HR_Count"] == 1
+
+    def test_unknown_reducer(self):
+        """Test that an unknown reducer raises ValueError"""
+        with pytest.raises(ValueError, match="Unknown resting heart rate reducers"):
+            process_resting_hr_data([], reducers=("median",))
+
+    def test_unsorted_input(self):
+        """Test that the latest reading wins regardless of input order"""
+        input_data = [
+            {
+                "start_date": "2024-01-01 18:00:00 +0000",
+                "end_date": "2024-01-01 18:00:00 +0000",
+                "value": 68.0,
+                "unit": "count/min",
+            },
+            {
+                "start_date": "2024-01-01 06:00:00 +0000",
+                "end_date": "2024-01-01 06:00:00 +0000",
+                "value": 70.0,
+                "unit": "count/min",
+            },
+        ]
+
+        result = process_resting_hr_data(input_data)
+
+        assert result.iloc[0]["Resting_HR_Value"] == 68.0
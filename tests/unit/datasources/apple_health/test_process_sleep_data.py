@@ -2,12 +2,14 @@ import os
 import sys
 from unittest.mock import MagicMock
 
+import pandas as pd
 import pytest
 
 # Add the src directory to the path so we can import the module
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../../../../../src"))
 
 from training_readiness.etl.stage_data.apple_health.load_sleep_data import (  # noqa: E402
+    SLEEP_ANALYSIS_COLUMNS,
     process_sleep_data,
 )
 
@@ -18,7 +20,7 @@ class TestProcessSleepData:
     def test_empty_data(self):
         """Test processing empty data"""
         result = process_sleep_data([])
-        assert result == []
+        assert result.empty
 
     def test_single_session_single_record(self):
         """Test processing single record for one sleep session"""
@@ -38,12 +40,12 @@ class TestProcessSleepData:
         result = process_sleep_data(input_data)
 
         assert len(result) == 1
-        assert result[0]["Sleep_Date"] == "01/01/2024"
-        assert result[0]["Total_Time_Asleep"] == 7.0  # 7 hours
-        assert result[0]["Total_Deep_Sleep"] == 0.0
-        assert result[0]["Total_Core_Sleep"] == 0.0
-        assert result[0]["Total_REM_Sleep"] == 0.0
-        assert result[0]["Total_Awake_Time"] == 0.0
+        assert result.iloc[0]["Sleep_Date"] == "01/01/2024"
+        assert result.iloc[0]["Total_Time_Asleep"] == 7.0  # 7 hours
+        assert result.iloc[0]["Total_Deep_Sleep"] == 0.0
+        assert result.iloc[0]["Total_Core_Sleep"] == 0.0
+        assert result.iloc[0]["Total_REM_Sleep"] == 0.0
+        assert result.iloc[0]["Total_Awake_Time"] == 0.0
 
     def test_multiple_sessions(self):
         """Test processing multiple sleep sessions"""
@@ -75,10 +77,10 @@ class TestProcessSleepData:
         result = process_sleep_data(input_data)
 
         assert len(result) == 2
-        assert result[0]["Sleep_Date"] == "01/01/2024"
-        assert result[0]["Total_Time_Asleep"] == 7.0
-        assert result[1]["Sleep_Date"] == "01/02/2024"
-        assert result[1]["Total_Time_Asleep"] == 8.0
+        assert result.iloc[0]["Sleep_Date"] == "01/01/2024"
+        assert result.iloc[0]["Total_Time_Asleep"] == 7.0
+        assert result.iloc[1]["Sleep_Date"] == "01/02/2024"
+        assert result.iloc[1]["Total_Time_Asleep"] == 8.0
 
     def test_session_grouping_with_gaps(self):
         """Test that records with gaps are grouped into separate sessions"""
@@ -105,10 +107,10 @@ class TestProcessSleepData:
         result = process_sleep_data(input_data)
 
         assert len(result) == 2
-        assert result[0]["Sleep_Date"] == "01/01/2024"
-        assert result[0]["Total_Time_Asleep"] == 7.0
-        assert result[1]["Sleep_Date"] == "01/02/2024"
-        assert result[1]["Total_Time_Asleep"] == 2.0
+        assert result.iloc[0]["Sleep_Date"] == "01/01/2024"
+        assert result.iloc[0]["Total_Time_Asleep"] == 7.0
+        assert result.iloc[1]["Sleep_Date"] == "01/02/2024"
+        assert result.iloc[1]["Total_Time_Asleep"] == 2.0
 
     def test_different_sleep_types(self):
         """Test processing different sleep types (Deep, Core, REM, Awake)"""
@@ -148,14 +150,14 @@ class TestProcessSleepData:
         result = process_sleep_data(input_data)
 
         assert len(result) == 1
-        assert result[0]["Sleep_Date"] == "01/01/2024"
+        assert result.iloc[0]["Sleep_Date"] == "01/01/2024"
         assert (
-            result[0]["Total_Time_Asleep"] == 6.0
+            result.iloc[0]["Total_Time_Asleep"] == 6.0
         )  # 2+2+1+1 hours (InBed filtered out)
-        assert result[0]["Total_Deep_Sleep"] == 2.0
-        assert result[0]["Total_Core_Sleep"] == 2.0
-        assert result[0]["Total_REM_Sleep"] == 1.0
-        assert result[0]["Total_Awake_Time"] == 1.0
+        assert result.iloc[0]["Total_Deep_Sleep"] == 2.0
+        assert result.iloc[0]["Total_Core_Sleep"] == 2.0
+        assert result.iloc[0]["Total_REM_Sleep"] == 1.0
+        assert result.iloc[0]["Total_Awake_Time"] == 1.0
 
     def test_exclude_unspecified_sleep_sessions(self):
         """Test that sessions containing Unspecified sleep type are excluded"""
@@ -192,8 +194,8 @@ class TestProcessSleepData:
         result = process_sleep_data(input_data)
 
         assert len(result) == 1  # Only the first session should be included
-        assert result[0]["Sleep_Date"] == "01/01/2024"
-        assert result[0]["Total_Time_Asleep"] == 7.0
+        assert result.iloc[0]["Sleep_Date"] == "01/01/2024"
+        assert result.iloc[0]["Total_Time_Asleep"] == 7.0
 
     def test_value_rounding(self):
         """Test that values are rounded to 2 decimal places"""
@@ -213,7 +215,7 @@ class TestProcessSleepData:
         result = process_sleep_data(input_data)
 
         assert len(result) == 1
-        assert result[0]["Total_Time_Asleep"] == 7.5
+        assert result.iloc[0]["Total_Time_Asleep"] == 7.5
 
     def test_debug_mode(self):
         """Test that debug mode creates debug file"""
@@ -239,8 +241,8 @@ class TestProcessSleepData:
             result = process_sleep_data(input_data, debug=True)
 
         assert len(result) == 1
-        assert result[0]["Sleep_Date"] == "01/01/2024"
-        assert result[0]["Total_Time_Asleep"] == 7.0
+        assert result.iloc[0]["Sleep_Date"] == "01/01/2024"
+        assert result.iloc[0]["Total_Time_Asleep"] == 7.0
 
     def test_date_formatting(self):
         """Test that dates are formatted correctly"""
@@ -260,7 +262,7 @@ class TestProcessSleepData:
         result = process_sleep_data(input_data)
 
         assert len(result) == 1
-        assert result[0]["Sleep_Date"] == "12/25/2024"  # MM/DD/YYYY format
+        assert result.iloc[0]["Sleep_Date"] == "12/25/2024"  # MM/DD/YYYY format
 
     def test_filter_inbed_records(self):
         """Test that InBed records are filtered out"""
@@ -280,9 +282,9 @@ class TestProcessSleepData:
         result = process_sleep_data(input_data)
 
         assert len(result) == 1
-        assert result[0]["Total_Time_Asleep"] == 7.0
+        assert result.iloc[0]["Total_Time_Asleep"] == 7.0
         # InBed time should not be counted in any sleep metrics
-        assert result[0]["Total_Awake_Time"] == 0.0
+        assert result.iloc[0]["Total_Awake_Time"] == 0.0
 
     def test_session_boundary_crossing_midnight(self):
         """Test session that crosses midnight boundary"""
@@ -303,7 +305,51 @@ class TestProcessSleepData:
 
         assert len(result) == 1
         # Should use the date of the earliest record (Jan 1)
-        assert result[0]["Sleep_Date"] == "01/01/2024"
+        assert result.iloc[0]["Sleep_Date"] == "01/01/2024"
         # Sleep start should be the earliest start time after filtering InBed records
-        assert result[0]["Sleep_Start"] == "01/01/2024 23:00:00"
-        assert result[0]["Sleep_End"] == "01/02/2024 06:00:00"
+        assert result.iloc[0]["Sleep_Start"] == "01/01/2024 23:00:00"
+        assert result.iloc[0]["Sleep_End"] == "01/02/2024 06:00:00"
+
+    def test_returns_dataframe_in_save_format(self):
+        """Test that the result has the columns written by save_sleep_analysis"""
+        input_data = [
+            {
+                "start_date": "2024-01-01 23:00:00 +0000",
+                "end_date": "2024-01-02 06:00:00 +0000",
+                "sleep_type": "HKCategoryValueSleepAnalysisAsleep",
+            },
+        ]
+
+        result = process_sleep_data(input_data)
+
+        assert isinstance(result, pd.DataFrame)
+        assert list(result.columns) == SLEEP_ANALYSIS_COLUMNS
+
+    def test_many_sessions_totals(self):
+        """Test per-session totals across many interleaved sessions"""
+        input_data = []
+        for day in range(1, 29):
+            input_data.extend(
+                [
+                    {
+                        "start_date": f"2024-02-{day:02d} 23:00:00 +0000",
+                        "end_date": f"2024-02-{day:02d} 23:30:00 +0000",
+                        "sleep_type": "HKCategoryValueSleepAnalysisAwake",
+                    },
+                    {
+                        "start_date": f"2024-02-{day:02d} 23:30:00 +0000",
+                        "end_date": f"2024-02-{day:02d} 23:45:00 +0000",
+                        "sleep_type": "HKCategoryValueSleepAnalysisAsleepREM",
+                    },
+                ]
+            )
+
+        # Shuffle the input order; sessions are built from sorted records
+        result = process_sleep_data(input_data[::-1])
+
+        assert len(result) == 28
+        assert result["Sleep_Date"].iloc[0] == "02/01/2024"
+        assert result["Sleep_Date"].iloc[-1] == "02/28/2024"
+        assert (result["Total_Awake_Time"] == 0.5).all()
+        assert (result["Total_REM_Sleep"] == 0.25).all()
+        assert (result["Total_Time_Asleep"] == 0.25).all()
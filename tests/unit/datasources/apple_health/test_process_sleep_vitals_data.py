@@ -0,0 +1,193 @@
+import os
+import sys
+import tempfile
+
+import pandas as pd
+
+# Add the src directory to the path so we can import the module
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../../../../../src"))
+
+from training_readiness.etl.stage_data.apple_health.load_sleep_data import (  # noqa: E402
+    process_sleep_data,
+)
+from training_readiness.etl.stage_data.apple_health.load_sleep_vitals_data import (  # noqa: E402
+    SLEEP_VITALS_COLUMNS,
+    extract_sleep_vitals_from_xml,
+    process_sleep_vitals_data,
+)
+
+SLEEP = "HKCategoryTypeIdentifierSleepAnalysis"
+RESPIRATORY_RATE = "HKQuantityTypeIdentifierRespiratoryRate"
+WRIST_TEMPERATURE = "HKQuantityTypeIdentifierAppleSleepingWristTemperature"
+OXYGEN_SATURATION = "HKQuantityTypeIdentifierOxygenSaturation"
+
+
+def sleep_row(start, end):
+    """Build a collected sleep row"""
+    return {
+        "start_date": start,
+        "end_date": end,
+        "sleep_type": "HKCategoryValueSleepAnalysisAsleepCore",
+        "source_name": "Apple Watch",
+    }
+
+
+def vital_row(start, value, unit, end=None):
+    """Build a collected vital sign row"""
+    return {"start_date": start, "end_date": end or start, "value": value, "unit": unit}
+
+
+class TestProcessSleepVitalsData:
+    """Test cases for attaching overnight vitals to sleep sessions"""
+
+    def test_medians_per_session(self):
+        """Test that each session gets the median of the samples inside it"""
+        results = {
+            SLEEP: [
+                sleep_row("2024-01-01 23:00:00 -0700", "2024-01-02 06:00:00 -0700"),
+                sleep_row("2024-01-02 23:00:00 -0700", "2024-01-03 06:00:00 -0700"),
+            ],
+            RESPIRATORY_RATE: [
+                vital_row("2024-01-02 01:00:00 -0700", 14.0, "count/min"),
+                vital_row("2024-01-02 02:00:00 -0700", 15.0, "count/min"),
+                vital_row("2024-01-02 03:00:00 -0700", 19.0, "count/min"),
+                vital_row("2024-01-03 02:00:00 -0700", 16.0, "count/min"),
+            ],
+            OXYGEN_SATURATION: [
+                vital_row("2024-01-02 02:00:00 -0700", 0.95, "%"),
+                vital_row("2024-01-02 04:00:00 -0700", 0.97, "%"),
+            ],
+        }
+
+        output_data = process_sleep_vitals_data(results)
+
+        assert list(output_data.columns) == SLEEP_VITALS_COLUMNS
+        assert list(output_data["Respiratory_Rate_Median"]) == [15.0, 16.0]
+        assert output_data["SpO2_Median"].iloc[0] == 96.0
+        assert pd.isna(output_data["SpO2_Median"].iloc[1])
+        assert output_data["Wrist_Temperature_Median"].isna().all()
+
+    def test_samples_outside_sessions_are_ignored(self):
+        """Test that daytime samples and samples between sessions are dropped"""
+        results = {
+            SLEEP: [
+                sleep_row("2024-01-01 23:00:00 -0700", "2024-01-02 06:00:00 -0700"),
+            ],
+            RESPIRATORY_RATE: [
+                vital_row("2024-01-01 22:00:00 -0700", 30.0, "count/min"),
+                vital_row("2024-01-02 06:00:00 -0700", 14.0, "count/min"),
+                vital_row("2024-01-02 12:00:00 -0700", 30.0, "count/min"),
+            ],
+        }
+
+        output_data = process_sleep_vitals_data(results)
+
+        assert len(output_data) == 1
+        assert output_data["Respiratory_Rate_Median"].iloc[0] == 14.0
+
+    def test_wrist_temperature_by_midpoint(self):
+        """Test that overnight samples are placed by midpoint and shown in C"""
+        results = {
+            SLEEP: [
+                sleep_row("2024-01-01 23:00:00 -0700", "2024-01-02 06:00:00 -0700"),
+            ],
+            # Starts before the session, but its midpoint is inside it
+            WRIST_TEMPERATURE: [
+                vital_row(
+                    "2024-01-01 22:00:00 -0700",
+                    95.0,
+                    "degF",
+                    end="2024-01-02 06:00:00 -0700",
+                ),
+            ],
+        }
+
+        output_data = process_sleep_vitals_data(results)
+
+        assert output_data["Wrist_Temperature_Median"].iloc[0] == 35.0
+
+    def test_keys_match_sleep_analysis(self):
+        """Test that rows join with the sleep analysis on Sleep_Start"""
+        sleep = [
+            sleep_row("2024-01-01 23:00:00 -0700", "2024-01-02 06:00:00 -0700"),
+            sleep_row("2024-01-02 22:30:00 -0500", "2024-01-03 05:00:00 -0500"),
+        ]
+        results = {
+            SLEEP: sleep,
+            RESPIRATORY_RATE: [
+                vital_row("2024-01-02 01:00:00 -0700", 14.0, "count/min"),
+                vital_row("2024-01-03 01:00:00 -0500", 15.0, "count/min"),
+            ],
+        }
+
+        output_data = process_sleep_vitals_data(results)
+        sleep_analysis = process_sleep_data(sleep)
+
+        assert list(output_data["Sleep_Start"]) == list(sleep_analysis["Sleep_Start"])
+        assert list(output_data["Sleep_Date"]) == list(sleep_analysis["Sleep_Date"])
+
+    def test_unspecified_sessions_are_skipped(self):
+        """Test that sessions left out of the sleep analysis get no vitals"""
+        unspecified = sleep_row(
+            "2024-01-03 01:00:00 -0700", "2024-01-03 02:00:00 -0700"
+        )
+        unspecified["sleep_type"] = "HKCategoryValueSleepAnalysisAsleepUnspecified"
+        sleep = [
+            sleep_row("2024-01-01 23:00:00 -0700", "2024-01-02 06:00:00 -0700"),
+            sleep_row("2024-01-02 23:00:00 -0700", "2024-01-03 01:00:00 -0700"),
+            unspecified,
+        ]
+        results = {
+            SLEEP: sleep,
+            RESPIRATORY_RATE: [
+                vital_row("2024-01-02 01:00:00 -0700", 14.0, "count/min"),
+                vital_row("2024-01-03 01:30:00 -0700", 15.0, "count/min"),
+            ],
+        }
+
+        output_data = process_sleep_vitals_data(results)
+        sleep_analysis = process_sleep_data(sleep)
+
+        assert list(output_data["Sleep_Start"]) == list(sleep_analysis["Sleep_Start"])
+        assert list(output_data["Respiratory_Rate_Median"]) == [14.0]
+
+    def test_no_vitals(self):
+        """Test that an export without vitals gives an empty frame"""
+        output_data = process_sleep_vitals_data(
+            {
+                SLEEP: [
+                    sleep_row("2024-01-01 23:00:00 -0700", "2024-01-02 06:00:00 -0700")
+                ]
+            }
+        )
+
+        assert output_data.empty
+        assert list(output_data.columns) == SLEEP_VITALS_COLUMNS
+
+    def test_extract_in_one_pass(self):
+        """Test that sleep records and vitals are read from the same export"""
+        xml_content = """<?xml version="1.0" encoding="UTF-8"?>
+<HealthData locale="en_US">
+    <Record type="HKCategoryTypeIdentifierSleepAnalysis"
+        sourceName="Apple Watch"
+        startDate="2024-01-01 23:00:00 -0700" endDate="2024-01-02 06:00:00 -0700"
+        value="HKCategoryValueSleepAnalysisAsleepCore"/>
+    <Record type="HKQuantityTypeIdentifierRespiratoryRate" unit="count/min"
+        startDate="2024-01-02 01:00:00 -0700" endDate="2024-01-02 01:00:00 -0700"
+        value="14.5"/>
+    <Record type="HKQuantityTypeIdentifierOxygenSaturation" unit="%"
+        startDate="2024-01-02 02:00:00 -0700" endDate="2024-01-02 02:00:00 -0700"
+        value="0.96"/>
+</HealthData>"""
+        with tempfile.NamedTemporaryFile(mode="w", suffix=".xml", delete=False) as f:
+            f.write(xml_content)
+            xml_file_path = f.name
+
+        try:
+            results = extract_sleep_vitals_from_xml(xml_file_path)
+        finally:
+            os.unlink(xml_file_path)
+
+        output_data = process_sleep_vitals_data(results)
+        assert output_data["Respiratory_Rate_Median"].iloc[0] == 14.5
+        assert output_data["SpO2_Median"].iloc[0] == 96.0
@@ -0,0 +1,124 @@
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+# Add the src directory to the path so we can import the module
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../../../../../src"))
+
+from training_readiness.etl.stage_data.apple_health.load_workout_data import (  # noqa: E402
+    WORKOUT_COLUMNS,
+    WORKOUT_DTYPES,
+    extract_workout_data_from_xml,
+    process_workout_data,
+    save_workout_analysis,
+)
+
+XML_CONTENT = """<?xml version="1.0" encoding="UTF-8"?>
+<HealthData>
+    <Record type="HKQuantityTypeIdentifierRestingHeartRate" startDate="2024-01-01 08:00:00 -0700" endDate="2024-01-01 08:00:00 -0700" value="55" unit="count/min"/>
+    <Workout workoutActivityType="HKWorkoutActivityTypeRunning" duration="45" durationUnit="min" totalDistance="8.5" totalDistanceUnit="km" totalEnergyBurned="520" totalEnergyBurnedUnit="kcal" sourceName="Apple Watch" startDate="2024-01-02 06:30:00 -0700" endDate="2024-01-02 07:15:00 -0700">
+        <MetadataEntry key="HKIndoorWorkout" value="0"/>
+        <WorkoutStatistics type="HKQuantityTypeIdentifierHeartRate" startDate="2024-01-02 06:30:00 -0700" endDate="2024-01-02 07:15:00 -0700" average="148.26" minimum="110" maximum="172" unit="count/min"/>
+    </Workout>
+    <Workout workoutActivityType="HKWorkoutActivityTypeCycling" duration="1.5" durationUnit="hr" sourceName="Apple Watch" startDate="2024-01-03 17:00:00 -0700" endDate="2024-01-03 18:30:00 -0700">
+        <WorkoutStatistics type="HKQuantityTypeIdentifierActiveEnergyBurned" startDate="2024-01-03 17:00:00 -0700" endDate="2024-01-03 18:30:00 -0700" sum="2092" unit="kJ"/>
+        <WorkoutStatistics type="HKQuantityTypeIdentifierDistanceCycling" startDate="2024-01-03 17:00:00 -0700" endDate="2024-01-03 18:30:00 -0700" sum="25" unit="mi"/>
+    </Workout>
+    <Workout workoutActivityType="HKWorkoutActivityTypeYoga" sourceName="iPhone" startDate="2024-01-04 07:00:00 -0700" endDate="2024-01-04 07:30:00 -0700"/>
+    <Workout workoutActivityType="HKWorkoutActivityTypeRunning" duration="20" durationUnit="min"/>
+</HealthData>"""
+
+
+class TestProcessWorkoutData:
+    """Test cases for the Workout element loader"""
+
+    def setup_method(self):
+        """Write the sample export"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.xml_file = os.path.join(self.temp_dir.name, "export.xml")
+        with open(self.xml_file, "w") as f:
+            f.write(XML_CONTENT)
+
+    def teardown_method(self):
+        """Remove the temporary directory"""
+        self.temp_dir.cleanup()
+
+    def test_extract_workouts(self):
+        """Test that only dated top-level Workouts are extracted"""
+        workout_data = extract_workout_data_from_xml(self.xml_file)
+
+        assert [row["activity_type"] for row in workout_data] == [
+            "HKWorkoutActivityTypeRunning",
+            "HKWorkoutActivityTypeCycling",
+            "HKWorkoutActivityTypeYoga",
+        ]
+        assert workout_data[0]["heart_rate_average"] == "148.26"
+
+    def test_workout_statistics_fill_missing_totals(self):
+        """Test that newer exports read totals from WorkoutStatistics"""
+        workout_data = extract_workout_data_from_xml(self.xml_file)
+
+        assert workout_data[1]["energy"] == "2092"
+        assert workout_data[1]["energy_unit"] == "kJ"
+        assert workout_data[1]["distance"] == "25"
+        assert workout_data[1]["distance_unit"] == "mi"
+
+    def test_typed_table(self):
+        """Test that the output columns have the declared types"""
+        result = process_workout_data(extract_workout_data_from_xml(self.xml_file))
+
+        assert list(result.columns) == WORKOUT_COLUMNS
+        assert result.dtypes.astype(str).to_dict() == {
+            column: str(pd.Series(dtype=dtype).dtype)
+            for column, dtype in WORKOUT_DTYPES.items()
+        }
+
+    def test_units_are_normalized(self):
+        """Test conversion to hours, meters and kilocalories"""
+        result = process_workout_data(extract_workout_data_from_xml(self.xml_file))
+
+        assert list(result["Duration_Hours"]) == [0.75, 1.5, 0.5]
+        assert list(result["Distance_Meters"][:2]) == [8500.0, 40233.6]
+        assert list(result["Energy_Kcal"][:2]) == [520.0, 500.0]
+        assert list(result["Heart_Rate_Average"][:1]) == [148.3]
+        assert np.isnan(result["Distance_Meters"].iloc[2])
+
+    def test_trainingpeaks_workout_types(self):
+        """Test that activity types map onto TrainingPeaks workout types"""
+        result = process_workout_data(extract_workout_data_from_xml(self.xml_file))
+
+        assert list(result["Workout_Type"]) == ["Run", "Bike", "Other"]
+        assert list(result["Activity_Type"]) == ["Running", "Cycling", "Yoga"]
+
+    def test_local_workout_date(self):
+        """Test that workouts are dated by their local start"""
+        workout_data = extract_workout_data_from_xml(self.xml_file)
+        # 23:30 local is already the next day in UTC
+        workout_data[0]["start_date"] = "2024-01-01 23:30:00 -0700"
+
+        result = process_workout_data(workout_data)
+
+        assert result["Workout_Date"].iloc[0] == pd.Timestamp("2024-01-01")
+        assert result["Workout_Start_UTC"].iloc[0] == pd.Timestamp(
+            "2024-01-02 06:30:00", tz="UTC"
+        )
+
+    def test_empty_data(self):
+        """Test that no workouts give an empty typed table"""
+        result = process_workout_data([])
+
+        assert result.empty
+        assert list(result.columns) == WORKOUT_COLUMNS
+
+    def test_saved_dates_join_as_dates(self):
+        """Test that Workout_Date is written as a plain date"""
+        output_file = os.path.join(self.temp_dir.name, "workouts.csv")
+        result = process_workout_data(extract_workout_data_from_xml(self.xml_file))
+
+        save_workout_analysis(result, output_file)
+
+        saved = pd.read_csv(output_file, dtype=str)
+        assert list(saved["Workout_Date"]) == ["2024-01-02", "2024-01-03", "2024-01-04"]
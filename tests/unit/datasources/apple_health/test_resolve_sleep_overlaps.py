@@ -0,0 +1,175 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Add the src directory to the path so we can import the module
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../../../../../src"))
+
+from training_readiness.etl.stage_data.apple_health.load_sleep_data import (  # noqa: E402
+    process_sleep_data,
+    sleep_high_water_mark,
+    sweep_sleep_intervals,
+)
+
+WATCH = "Apple Watch"
+APP = "AutoSleep"
+
+
+def sleep_record(start, end, stage, source):
+    """Build a collected sleep row"""
+    return {
+        "start_date": f"2024-01-{start} +0000",
+        "end_date": f"2024-01-{end} +0000",
+        "sleep_type": f"HKCategoryValueSleepAnalysis{stage}",
+        "source_name": source,
+    }
+
+
+class TestResolveSleepOverlaps:
+    """Test cases for source-aware merging of overlapping sleep records"""
+
+    def test_sweep_keeps_best_rank(self):
+        """Test that the best-ranked interval owns overlapping time"""
+        positions, starts, ends = sweep_sleep_intervals(
+            np.array([0, 2]), np.array([10, 5]), np.array([1, 0])
+        )
+
+        assert positions.tolist() == [0, 1, 0]
+        assert starts.tolist() == [0, 2, 5]
+        assert ends.tolist() == [2, 5, 10]
+
+    def test_sweep_equal_rank_keeps_earliest(self):
+        """Test that equal ranks resolve in favour of the earlier interval"""
+        positions, starts, ends = sweep_sleep_intervals(
+            np.array([0, 5]), np.array([10, 15]), np.array([0, 0])
+        )
+
+        assert positions.tolist() == [0, 1]
+        assert starts.tolist() == [0, 10]
+        assert ends.tolist() == [10, 15]
+
+    def test_duplicate_night_is_not_double_counted(self):
+        """Test that a second source covering the same night adds nothing"""
+        result = process_sleep_data(
+            [
+                sleep_record("01 23:00:00", "02 03:00:00", "AsleepCore", WATCH),
+                sleep_record("02 03:00:00", "02 05:00:00", "AsleepDeep", WATCH),
+                sleep_record("02 05:00:00", "02 07:00:00", "AsleepREM", WATCH),
+                sleep_record("01 22:30:00", "02 07:00:00", "Asleep", APP),
+            ]
+        )
+
+        assert len(result) == 1
+        # 30 minutes before the watch started come from the app
+        assert result.iloc[0]["Total_Time_Asleep"] == 8.5
+        assert result.iloc[0]["Total_Core_Sleep"] == 4.0
+        assert result.iloc[0]["Total_Deep_Sleep"] == 2.0
+        assert result.iloc[0]["Total_REM_Sleep"] == 2.0
+        assert result.iloc[0]["Sleep_Start"] == "01/01/2024 22:30:00"
+
+    def test_preferred_source_wins_regardless_of_order(self):
+        """Test that the watch's stages replace the app's inside the overlap"""
+        result = process_sleep_data(
+            [
+                sleep_record("01 23:00:00", "02 07:00:00", "AsleepCore", APP),
+                sleep_record("02 01:00:00", "02 03:00:00", "AsleepDeep", WATCH),
+            ]
+        )
+
+        assert result.iloc[0]["Total_Time_Asleep"] == 8.0
+        assert result.iloc[0]["Total_Deep_Sleep"] == 2.0
+        assert result.iloc[0]["Total_Core_Sleep"] == 6.0
+
+    def test_custom_source_priority(self):
+        """Test that the source order can be configured"""
+        result = process_sleep_data(
+            [
+                sleep_record("01 23:00:00", "02 07:00:00", "AsleepCore", APP),
+                sleep_record("02 01:00:00", "02 03:00:00", "AsleepDeep", WATCH),
+            ],
+            source_priority=(APP,),
+        )
+
+        assert result.iloc[0]["Total_Time_Asleep"] == 8.0
+        assert result.iloc[0]["Total_Deep_Sleep"] == 0.0
+
+    def test_nested_record_does_not_split_session(self):
+        """Test that a record ending inside a longer one keeps one session"""
+        result = process_sleep_data(
+            [
+                sleep_record("01 23:00:00", "02 07:00:00", "AsleepCore", APP),
+                sleep_record("02 00:00:00", "02 01:00:00", "Awake", WATCH),
+                sleep_record("02 02:00:00", "02 03:00:00", "AsleepDeep", APP),
+            ]
+        )
+
+        assert len(result) == 1
+        assert result.iloc[0]["Total_Time_Asleep"] == 7.0
+        assert result.iloc[0]["Total_Awake_Time"] == 1.0
+
+    def test_records_without_source(self):
+        """Test that overlapping rows without a source name are rejected"""
+        records = [
+            sleep_record("01 23:00:00", "02 07:00:00", "AsleepCore", WATCH),
+            sleep_record("02 06:00:00", "02 08:00:00", "AsleepCore", WATCH),
+        ]
+        for record in records:
+            del record["source_name"]
+
+        with pytest.raises(ValueError, match="source_name"):
+            process_sleep_data(records)
+
+    def test_local_times_follow_clipped_records(self):
+        """Test that reported wall-clock times are clipped with the records"""
+        result = process_sleep_data(
+            [
+                {
+                    "start_date": "2024-01-01 23:00:00 -0700",
+                    "end_date": "2024-01-02 07:00:00 -0700",
+                    "sleep_type": "HKCategoryValueSleepAnalysisAsleepCore",
+                    "source_name": WATCH,
+                },
+                {
+                    "start_date": "2024-01-02 06:00:00 -0700",
+                    "end_date": "2024-01-02 07:30:00 -0700",
+                    "sleep_type": "HKCategoryValueSleepAnalysisAwake",
+                    "source_name": APP,
+                },
+            ]
+        )
+
+        assert result.iloc[0]["Sleep_End"] == "01/02/2024 07:30:00"
+        assert result.iloc[0]["Total_Awake_Time"] == 0.5
+
+    def test_high_water_mark_uses_merged_sessions(self):
+        """Test that overlapping sources do not split the last session"""
+        records = [
+            sleep_record("01 23:00:00", "02 07:00:00", "AsleepCore", APP),
+            sleep_record("02 00:00:00", "02 01:00:00", "AsleepDeep", WATCH),
+            sleep_record("02 02:00:00", "02 03:00:00", "AsleepDeep", APP),
+        ]
+
+        assert sleep_high_water_mark(records) == "2024-01-01 23:00:00 +0000"
+
+    def test_many_overlapping_nights(self):
+        """Test totals over many nights recorded by two sources"""
+        records = []
+        for day in pd.date_range("2024-01-01", periods=300, freq="D"):
+            night = day + pd.Timedelta(hours=23)
+            for source, offset in ((WATCH, 0), (APP, -1)):
+                records.append(
+                    {
+                        "start_date": f"{night + pd.Timedelta(hours=offset)} +0000",
+                        "end_date": f"{night + pd.Timedelta(hours=8)} +0000",
+                        "sleep_type": "HKCategoryValueSleepAnalysisAsleepCore",
+                        "source_name": source,
+                    }
+                )
+
+        result = process_sleep_data(records)
+
+        assert len(result) == 300
+        assert (result["Total_Time_Asleep"] == 9.0).all()
@@ -9,6 +9,7 @@ import pytest
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../../../../../src"))
 
 from training_readiness.etl.stage_data.apple_health.load_sleep_data import (  # noqa: E402
+    process_sleep_data,
     save_sleep_analysis,
 )
 
@@ -296,3 +297,32 @@ class TestSaveSleepAnalysis:
                 assert float(row["Total_Awake_Time"]) == 0.0
         finally:
             os.unlink(temp_file)
+
+    def test_save_dataframe(self):
+        """Test saving the DataFrame returned by process_sleep_data"""
+        input_data = process_sleep_data(
+            [
+                {
+                    "start_date": "2024-01-01 23:00:00 +0000",
+                    "end_date": "2024-01-02 06:30:00 +0000",
+                    "sleep_type": "HKCategoryValueSleepAnalysisAsleepCore",
+                },
+            ]
+        )
+
+        with tempfile.NamedTemporaryFile(mode="w", suffix=".csv", delete=False) as f:
+            temp_file = f.name
+
+        try:
+            save_sleep_analysis(input_data, temp_file)
+
+            with open(temp_file, "r") as csvfile:
+                reader = csv.DictReader(csvfile)
+                rows = list(reader)
+
+                assert len(rows) == 1
+                assert rows[0]["Sleep_Date"] == "01/01/2024"
+                assert float(rows[0]["Total_Core_Sleep"]) == 7.5
+                assert rows[0]["Sleep_End"] == "01/02/2024 06:30:00"
+        finally:
+            os.unlink(temp_file)
@@ -0,0 +1,168 @@
+import os
+import sys
+import tempfile
+import zipfile
+
+# Add the src directory to the path so we can import the module
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../../../../../src"))
+
+from training_readiness.etl.stage_data.apple_health import (  # noqa: E402
+    apple_health_parser,
+)
+from training_readiness.etl.stage_data.apple_health.apple_health_parser import (  # noqa: E402
+    RESTING_HEART_RATE_TYPE,
+    SLEEP_ANALYSIS_TYPE,
+    extract_records,
+    iter_records,
+)
+from training_readiness.etl.stage_data.apple_health.apple_health_scanner import (  # noqa: E402
+    decode_attribute,
+    extract_records_scanned,
+    scan_records,
+)
+from training_readiness.etl.stage_data.apple_health.load_apple_health_data import (  # noqa: E402
+    extract_apple_health_data,
+)
+from training_readiness.etl.stage_data.apple_health.load_resting_hr_data import (  # noqa: E402
+    collect_resting_hr_record,
+)
+from training_readiness.etl.stage_data.apple_health.load_sleep_data import (  # noqa: E402
+    collect_sleep_record,
+)
+
+COLLECTORS = {
+    SLEEP_ANALYSIS_TYPE: collect_sleep_record,
+    RESTING_HEART_RATE_TYPE: collect_resting_hr_record,
+}
+
+XML_CONTENT = f"""<?xml version="1.0" encoding="UTF-8"?>
+<!DOCTYPE HealthData [
+<!ELEMENT HealthData (ExportDate,Me,(Record|Correlation|Workout)*)>
+<!ATTLIST Record type CDATA #REQUIRED>
+]>
+<HealthData locale="en_US">
+ <ExportDate value="2024-01-05 08:00:00 -0700"/>
+ <Record type="HKQuantityTypeIdentifierHeartRate" sourceName="Watch" unit="count/min" startDate="2024-01-01 07:59:00 -0700" endDate="2024-01-01 07:59:00 -0700" value="70">
+  <MetadataEntry key="HKMetadataKeyHeartRateMotionContext" value="0"/>
+ </Record>
+ <Record type="{RESTING_HEART_RATE_TYPE}" sourceName="Jane&apos;s Apple&#160;Watch" device="&lt;&lt;HKDevice: 0x2&gt;, name:Apple Watch&gt;" unit="count/min" startDate="2024-01-01 08:00:00 -0700" endDate="2024-01-01 08:00:00 -0700" value="55">
+  <MetadataEntry key="HKMetadataKeySyncVersion" value="1"/>
+ </Record>
+ <Record type="{SLEEP_ANALYSIS_TYPE}" sourceName="Watch" startDate="2024-01-01 23:00:00 -0700" endDate="2024-01-02 06:00:00 -0700" value="HKCategoryValueSleepAnalysisAsleepCore"/>
+ <Correlation type="HKCorrelationTypeIdentifierBloodPressure" startDate="2024-01-02 09:00:00 -0700" endDate="2024-01-02 09:00:00 -0700">
+  <Record type="{RESTING_HEART_RATE_TYPE}" startDate="2024-01-02 09:00:00 -0700" endDate="2024-01-02 09:00:00 -0700" value="99" unit="count/min"/>
+ </Correlation>
+ <Workout workoutActivityType="HKWorkoutActivityTypeRunning" duration="30">
+  <WorkoutStatistics type="{RESTING_HEART_RATE_TYPE}" startDate="2024-01-02 10:00:00 -0700" endDate="2024-01-02 10:30:00 -0700" average="120" unit="count/min"/>
+ </Workout>
+ <Record
+   type="{RESTING_HEART_RATE_TYPE}"
+   startDate="2024-01-02 08:00:00 -0700" endDate="2024-01-02 08:00:00 -0700"
+   value="57" unit="count/min"/>
+ <Record type="{SLEEP_ANALYSIS_TYPE}" sourceName="Watch" startDate="2024-01-02 23:00:00 -0700" endDate="2024-01-03 06:00:00 -0700" value="HKCategoryValueSleepAnalysisAsleepREM"></Record>
+</HealthData>
+"""
+
+
+class TestScanRecords:
+    """Test cases for the byte-level record scanner"""
+
+    def setup_method(self):
+        """Write the sample export to a temporary file"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.xml_file = os.path.join(self.temp_dir.name, "export.xml")
+        with open(self.xml_file, "w", encoding="utf-8") as f:
+            f.write(XML_CONTENT)
+
+    def teardown_method(self):
+        """Remove the temporary directory"""
+        self.temp_dir.cleanup()
+
+    def test_matches_element_tree(self, monkeypatch):
+        """Test that scanned attributes equal the ElementTree attributes"""
+        monkeypatch.setattr(apple_health_parser, "lxml_etree", None)
+        expected = list(iter_records(self.xml_file, COLLECTORS))
+
+        result = list(scan_records(self.xml_file, COLLECTORS))
+
+        assert result == expected
+        assert len(result) == 4
+        assert result[0]["sourceName"] == "Jane's Apple\xa0Watch"
+        assert result[0]["device"] == "<<HKDevice: 0x2>, name:Apple Watch>"
+
+    def test_extract_matches_xml_parse(self):
+        """Test that extracted rows equal the rows of the XML parser"""
+        result = extract_records_scanned(self.xml_file, COLLECTORS)
+
+        assert result == extract_records(self.xml_file, COLLECTORS)
+        assert [row["value"] for row in result[RESTING_HEART_RATE_TYPE]] == [
+            55.0,
+            57.0,
+        ]
+
+    def test_high_water_marks(self):
+        """Test that high-water marks are applied to scanned records"""
+        since = {RESTING_HEART_RATE_TYPE: "2024-01-02 00:00:00 -0700"}
+
+        result = extract_records_scanned(self.xml_file, COLLECTORS, since=since)
+
+        assert result == extract_records(self.xml_file, COLLECTORS, since=since)
+        assert len(result[RESTING_HEART_RATE_TYPE]) == 1
+
+    def test_unsupported_layout_falls_back(self):
+        """Test that attributes the scanner cannot read fall back to XML"""
+        with open(self.xml_file, "w") as f:
+            f.write(
+                "<HealthData>\n"
+                f' <Record type="{RESTING_HEART_RATE_TYPE}" '
+                'startDate="2024-01-01 08:00:00 -0700" value="55" unit="count/min"/>\n'
+                f' <Record type="{RESTING_HEART_RATE_TYPE}" unit = "count/min" '
+                'startDate="2024-01-02 08:00:00 -0700" value="56"/>\n'
+                "</HealthData>"
+            )
+
+        result = extract_records_scanned(self.xml_file, COLLECTORS)
+
+        assert result == extract_records(self.xml_file, COLLECTORS)
+        assert len(result[RESTING_HEART_RATE_TYPE]) == 2
+
+    def test_single_quoted_type_falls_back(self):
+        """Test that a Record the marker search cannot see is not skipped"""
+        with open(self.xml_file, "w") as f:
+            f.write(
+                "<HealthData>\n"
+                f" <Record type='{RESTING_HEART_RATE_TYPE}' "
+                "startDate='2024-01-01 08:00:00 -0700' value='55' unit='count/min'/>\n"
+                f' <Record type = "{RESTING_HEART_RATE_TYPE}" unit="count/min" '
+                'startDate="2024-01-02 08:00:00 -0700" value="56"/>\n'
+                "</HealthData>"
+            )
+
+        result = extract_records_scanned(self.xml_file, COLLECTORS)
+
+        assert [row["value"] for row in result[RESTING_HEART_RATE_TYPE]] == [
+            55.0,
+            56.0,
+        ]
+
+    def test_zip_export_is_parsed(self):
+        """Test that an archive is parsed as XML"""
+        zip_file = os.path.join(self.temp_dir.name, "export.zip")
+        with zipfile.ZipFile(zip_file, "w") as archive:
+            archive.write(self.xml_file, "apple_health_export/export.xml")
+
+        result = extract_records_scanned(zip_file, COLLECTORS)
+
+        assert result == extract_records(self.xml_file, COLLECTORS)
+
+    def test_decode_attribute(self):
+        """Test entity references and whitespace normalization"""
+        assert decode_attribute(b"a &amp; b") == "a & b"
+        assert decode_attribute(b"&#x41;&#66;") == "AB"
+        assert decode_attribute(b"line\r\nbreak\tend") == "line break end"
+
+    def test_scan_mode_in_loader(self):
+        """Test that the combined loader returns the same rows in scan mode"""
+        result = extract_apple_health_data(self.xml_file, scan=True)
+
+        assert result == extract_apple_health_data(self.xml_file)
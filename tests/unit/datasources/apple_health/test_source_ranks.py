@@ -0,0 +1,35 @@
+import os
+import sys
+
+# Add the src directory to the path so we can import the module
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../../../../../src"))
+
+from training_readiness.etl.stage_data.apple_health.apple_health_sources import (  # noqa: E402
+    source_ranks,
+)
+
+
+class TestSourceRanks:
+    """Test cases for ranking the sources of overlapping records"""
+
+    def test_priority_then_name(self):
+        """Test that listed sources win, then the rest ordered by name"""
+        names = ["Sleep App", "Jane's iPhone", "Jane's Apple Watch", "Another App"]
+
+        ranks = source_ranks(names, ("Apple Watch", "iPhone"))
+
+        ordered = [names[i] for i in ranks.argsort()]
+        assert ordered == [
+            "Jane's Apple Watch",
+            "Jane's iPhone",
+            "Another App",
+            "Sleep App",
+        ]
+
+    def test_same_source_same_rank(self):
+        """Test that records of one source share a rank"""
+        ranks = source_ranks(["Watch", None, "Watch", None])
+
+        assert ranks[0] == ranks[2]
+        assert ranks[1] == ranks[3]
+        assert ranks[1] < ranks[0]
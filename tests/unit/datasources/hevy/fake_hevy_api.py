@@ -0,0 +1,172 @@
+"""
+Local fake of the Hevy API for extractor tests.
+
+Serves paginated exercise_templates, workouts and workouts/events from
+in-memory data over real HTTP on localhost, so the extractor is exercised
+through its pooled client. Workouts are changed with put_workout() and
+delete_workout(), which record events like the real API, and fail_pages
+makes pages answer with an error.
+"""
+
+import json
+import threading
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+API_KEY = "test-key"
+
+
+def iso(moment):
+    """Format a UTC datetime like the Hevy API"""
+    return moment.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def make_workout(workout_id, start, sets=2, title="Workout"):
+    """Build a Hevy workout with one exercise of ``sets`` sets"""
+    return {
+        "id": workout_id,
+        "title": title,
+        "description": "",
+        "start_time": iso(start),
+        "end_time": iso(start + timedelta(hours=1)),
+        "exercises": [
+            {
+                "index": 0,
+                "title": "Bench Press (Barbell)",
+                "notes": "",
+                "exercise_template_id": "79D0BB3A",
+                "supersets_id": None,
+                "sets": [
+                    {
+                        "index": index,
+                        "type": "normal",
+                        "weight_kg": 60.0 + index,
+                        "reps": 8,
+                        "distance_meters": None,
+                        "duration_seconds": None,
+                        "rpe": None,
+                    }
+                    for index in range(sets)
+                ],
+            }
+        ],
+    }
+
+
+class FakeHevyApi:
+    """In-memory Hevy account served over HTTP"""
+
+    def __init__(self):
+        self.workouts = {}
+        self.events = []
+        self.exercise_templates = [
+            {"id": f"T{index}", "title": f"Exercise {index}"} for index in range(12)
+        ]
+        # Changes made before a test syncs happened a day ago
+        self.clock = datetime.now(timezone.utc) - timedelta(days=1)
+        self.requests = []
+        self.pages_requested = []
+        # Pages answered with an error, to interrupt a fetch
+        self.fail_pages = set()
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self.handler())
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server.server_port}/v1"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def tick(self):
+        """Time of the next change: a second later, and never in the past"""
+        self.clock = max(self.clock + timedelta(seconds=1), datetime.now(timezone.utc))
+        return self.clock
+
+    def put_workout(self, workout, at=None):
+        """Create or update a workout, now or at an earlier time ``at``"""
+        with self.lock:
+            workout = dict(workout, updated_at=iso(at or self.tick()))
+            self.workouts[workout["id"]] = workout
+            self.events.append({"type": "updated", "workout": workout})
+
+    def delete_workout(self, workout_id):
+        """Delete a workout"""
+        with self.lock:
+            del self.workouts[workout_id]
+            self.events.append(
+                {"type": "deleted", "id": workout_id, "deleted_at": iso(self.tick())}
+            )
+
+    def items(self, path, query):
+        """Items of an endpoint, newest first, and the key they are listed under"""
+        if path == "/v1/exercise_templates":
+            return "exercise_templates", self.exercise_templates
+        if path == "/v1/workouts":
+            workouts = sorted(
+                self.workouts.values(), key=lambda w: w["start_time"], reverse=True
+            )
+            return "workouts", workouts
+        if path == "/v1/workouts/events":
+            since = query.get("since", ["1970-01-01T00:00:00Z"])[0]
+            events = [
+                event
+                for event in self.events
+                if (event.get("deleted_at") or event["workout"]["updated_at"]) > since
+            ]
+            return "events", events[::-1]
+        return None, None
+
+    def handler(self):
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def send_json(self, status, payload=None):
+                body = json.dumps(payload or {}).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                query = parse_qs(url.query)
+                with api.lock:
+                    api.requests.append(url.path)
+                    key, items = api.items(url.path, query)
+
+                if self.headers.get("api-key") != API_KEY:
+                    return self.send_json(401, {"error": "Unauthorized"})
+                if key is None:
+                    return self.send_json(404, {"error": "Not found"})
+
+                page = int(query.get("page", ["1"])[0])
+                size = int(query.get("pageSize", ["10"])[0])
+                with api.lock:
+                    api.pages_requested.append((url.path, page))
+                if page in api.fail_pages:
+                    return self.send_json(400, {"error": "Bad request"})
+                page_count = max(1, -(-len(items) // size))
+                if page > page_count:
+                    return self.send_json(404, {"error": "Page not found"})
+                self.send_json(
+                    200,
+                    {
+                        "page": page,
+                        "page_count": page_count,
+                        key: items[(page - 1) * size : page * size],
+                    },
+                )
+
+        return Handler
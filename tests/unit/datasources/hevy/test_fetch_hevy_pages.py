@@ -0,0 +1,138 @@
+import threading
+import time
+
+import pytest
+from training_readiness.etl.extract_data.hevy.extract_hevy_data import (
+    fetch_hevy_pages,
+    fetch_hevy_workouts,
+)
+from training_readiness.etl.extract_data.hevy.hevy_client import HevyClient
+
+
+class FakeResponse:
+    """Minimal stand-in for requests.Response"""
+
+    def __init__(self, status_code, payload=None):
+        self.status_code = status_code
+        self.payload = payload
+        self.headers = {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+    def json(self):
+        return self.payload
+
+
+class FakeHevyApi:
+    """Serves pages of items like the Hevy API, recording concurrency"""
+
+    def __init__(self, items, page_size, with_page_count=True, delay=0.0):
+        self.items = items
+        self.page_size = page_size
+        self.with_page_count = with_page_count
+        self.delay = delay
+        self.requested = []
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+        self.headers = {}
+
+    def get(self, url, params=None, timeout=None):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+            self.requested.append(params["page"])
+        # Later pages answer sooner, so completion order differs from page order
+        time.sleep(self.delay / params["page"])
+        with self.lock:
+            self.active -= 1
+
+        page, size = params["page"], params["pageSize"]
+        page_count = max(1, -(-len(self.items) // size))
+        if page > page_count:
+            return FakeResponse(404)
+        payload = {"page": page, "items": self.items[(page - 1) * size : page * size]}
+        if self.with_page_count:
+            payload["page_count"] = page_count
+        return FakeResponse(200, payload)
+
+
+class FixedResponseSession:
+    """Session answering every request with the same status"""
+
+    def __init__(self, status_code):
+        self.status_code = status_code
+        self.headers = {}
+
+    def get(self, url, params=None, timeout=None):
+        return FakeResponse(self.status_code)
+
+
+def fake_client(session):
+    """Client without rate limiting or backoff waits"""
+    return HevyClient(
+        "test-key", rate=1000, burst=100, session=session, sleep=lambda s: None
+    )
+
+
+@pytest.fixture
+def fake_api():
+    """Create a fake Hevy API serving 45 items and a client using it"""
+
+    def install(**kwargs):
+        api = FakeHevyApi(list(range(45)), page_size=10, **kwargs)
+        return api, fake_client(api)
+
+    return install
+
+
+class TestFetchHevyPages:
+    """Test cases for fetching Hevy pages concurrently"""
+
+    def test_pages_reassembled_in_order(self, fake_api):
+        """Test that concurrently fetched pages keep their order"""
+        api, client = fake_api(delay=0.05)
+
+        items = fetch_hevy_pages(
+            "workouts", "items", page_size=10, max_workers=4, client=client
+        )
+
+        assert items == list(range(45))
+        assert sorted(api.requested) == [1, 2, 3, 4, 5]
+        assert api.max_active > 1
+
+    def test_single_worker(self, fake_api):
+        """Test that one worker fetches the same pages one at a time"""
+        api, client = fake_api()
+
+        items = fetch_hevy_pages(
+            "workouts", "items", page_size=10, max_workers=1, client=client
+        )
+
+        assert items == list(range(45))
+        assert api.max_active == 1
+
+    def test_without_page_count(self, fake_api):
+        """Test that pages are walked until a short page without a page count"""
+        api, client = fake_api(with_page_count=False)
+
+        items = fetch_hevy_pages("workouts", "items", page_size=10, client=client)
+
+        assert items == list(range(45))
+        assert api.requested == [1, 2, 3, 4, 5]
+
+    def test_no_data(self):
+        """Test that a 404 on the first page means no items"""
+        client = fake_client(FixedResponseSession(404))
+
+        assert fetch_hevy_pages("workouts", "workouts", client=client) == []
+        assert fetch_hevy_workouts(client=client) is None
+
+    def test_errors_are_raised(self):
+        """Test that a page still failing after retries aborts the fetch"""
+        client = fake_client(FixedResponseSession(500))
+
+        with pytest.raises(RuntimeError):
+            fetch_hevy_pages("workouts", "workouts", client=client)
@@ -0,0 +1,197 @@
+import json
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+
+import pytest
+import requests
+from training_readiness.etl.extract_data.hevy.extract_hevy_data import (
+    create_hevy_client,
+    fetch_hevy_pages,
+    sync_hevy_workouts,
+)
+from training_readiness.etl.extract_data.hevy.hevy_checkpoints import (
+    MANIFEST_FILE,
+    PageCheckpoints,
+)
+
+from .fake_hevy_api import API_KEY, FakeHevyApi, iso, make_workout
+
+
+@pytest.fixture
+def api(monkeypatch):
+    """A running fake Hevy API holding 35 workouts (4 pages of 10)"""
+    monkeypatch.setenv("HEVY_API_KEY", API_KEY)
+    with FakeHevyApi() as api:
+        start = datetime(2024, 1, 1, 17, 0, tzinfo=timezone.utc)
+        for day in range(35):
+            api.put_workout(make_workout(f"w{day:02d}", start + timedelta(days=day)))
+        yield api
+
+
+def fetch_workouts(api, staging_dir, max_workers=1):
+    """Fetch all workout pages from the fake API, staging pages"""
+    with create_hevy_client(base_url=api.base_url) as client:
+        workouts = fetch_hevy_pages(
+            "workouts",
+            "workouts",
+            max_workers=max_workers,
+            client=client,
+            checkpoint_dir=staging_dir,
+        )
+    return [workout["id"] for workout in workouts]
+
+
+def workout_pages(api):
+    """Workout pages requested from the fake API"""
+    return [page for path, page in api.pages_requested if path == "/v1/workouts"]
+
+
+class TestHevyCheckpoints:
+    """Test cases for resuming Hevy fetches from staged pages"""
+
+    def test_resume_fetches_only_missing_pages(self, api, tmp_path):
+        """Test that an interrupted fetch resumes with its completed pages"""
+        expected = [f"w{day:02d}" for day in range(34, -1, -1)]
+        api.fail_pages = {3}
+        with pytest.raises(requests.HTTPError):
+            fetch_workouts(api, tmp_path)
+
+        staged = sorted(path.name for path in (tmp_path / "workouts").glob("page_*"))
+        assert staged == ["page_00001.json", "page_00002.json", "page_00004.json"]
+
+        api.fail_pages = set()
+        api.pages_requested.clear()
+        assert fetch_workouts(api, tmp_path, max_workers=4) == expected
+
+        # The last staged page is fetched again to check it has not moved
+        assert sorted(workout_pages(api)) == [1, 3, 4]
+        assert not (tmp_path / "workouts").exists()
+
+    def test_changed_page_count_starts_over(self, api, tmp_path):
+        """Test that staged pages are dropped when the data has shifted"""
+        api.fail_pages = {4}
+        with pytest.raises(requests.HTTPError):
+            fetch_workouts(api, tmp_path)
+        for day in range(35, 45):
+            api.put_workout(make_workout(f"w{day}", datetime(2024, 3, day - 30)))
+
+        api.fail_pages = set()
+        api.pages_requested.clear()
+        workouts = fetch_workouts(api, tmp_path)
+
+        assert sorted(workout_pages(api)) == [1, 2, 3, 4, 5]
+        assert len(workouts) == 45
+
+    def test_insertion_with_same_page_count_starts_over(self, api, tmp_path):
+        """Test that a new workout at the top discards the shifted pages"""
+        api.fail_pages = {3}
+        with pytest.raises(requests.HTTPError):
+            fetch_workouts(api, tmp_path)
+        api.put_workout(make_workout("w35", datetime(2024, 2, 5, tzinfo=timezone.utc)))
+
+        api.fail_pages = set()
+        api.pages_requested.clear()
+        workouts = fetch_workouts(api, tmp_path)
+
+        assert sorted(workout_pages(api)) == [1, 2, 3, 4]
+        assert sorted(workouts) == [f"w{day:02d}" for day in range(36)]
+
+    def test_backdated_insertion_starts_over(self, api, tmp_path):
+        """Test that a shift below the first page discards the staged pages"""
+        api.fail_pages = {3}
+        with pytest.raises(requests.HTTPError):
+            fetch_workouts(api, tmp_path)
+        # Lands on page 2, shifting pages 3 and 4 by one
+        api.put_workout(make_workout("old", datetime(2024, 1, 20, tzinfo=timezone.utc)))
+
+        api.fail_pages = set()
+        workouts = fetch_workouts(api, tmp_path)
+
+        assert sorted(workouts) == sorted(
+            [f"w{day:02d}" for day in range(35)] + ["old"]
+        )
+
+    def test_deletion_starts_over(self, api, tmp_path):
+        """Test that a deletion between runs does not drop a later workout"""
+        expected = [f"w{day:02d}" for day in range(34, -1, -1) if day != 20]
+        api.fail_pages = {4}
+        with pytest.raises(requests.HTTPError):
+            fetch_workouts(api, tmp_path)
+        # On page 2, moving every later workout up by one
+        api.delete_workout("w20")
+
+        api.fail_pages = set()
+
+        assert fetch_workouts(api, tmp_path) == expected
+
+    def test_resumed_sync_applies_later_edits(self, api, tmp_path, monkeypatch):
+        """Test that a resumed export syncs from when its pages were staged"""
+        monkeypatch.setenv("TIMEZONE_OFFSET_HOURS", "0")
+        staging_dir = tmp_path / "staging"
+        api.fail_pages = {3}
+        with create_hevy_client(base_url=api.base_url) as client:
+            with pytest.raises(requests.HTTPError):
+                sync_hevy_workouts(tmp_path, client, checkpoint_dir=staging_dir)
+
+        # The workouts were logged three hours ago, the interrupted run
+        # started two hours ago, and w20 (on the staged page 2) was edited
+        # an hour ago
+        now = datetime.now(timezone.utc)
+        for event in api.events:
+            event["workout"]["updated_at"] = iso(now - timedelta(hours=3))
+        manifest_path = staging_dir / "workouts" / MANIFEST_FILE
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        manifest["started"] = (now - timedelta(hours=2)).isoformat()
+        with open(manifest_path, "w") as f:
+            json.dump(manifest, f)
+        edited = make_workout("w20", datetime(2024, 1, 21, 17, tzinfo=timezone.utc))
+        api.put_workout(dict(edited, title="Edited"), at=now - timedelta(hours=1))
+
+        api.fail_pages = set()
+        with create_hevy_client(base_url=api.base_url) as client:
+            sync_hevy_workouts(tmp_path, client, checkpoint_dir=staging_dir)
+            sync_hevy_workouts(
+                tmp_path, client, incremental=True, checkpoint_dir=staging_dir
+            )
+
+        workouts_df = pd.read_csv(tmp_path / "hevy_workouts.csv")
+        assert set(workouts_df.loc[workouts_df["workout_id"] == "w20", "title"]) == {
+            "Edited"
+        }
+
+    def test_stale_staging_is_discarded(self, tmp_path):
+        """Test that pages staged too long ago are not resumed"""
+        first_page = {"workouts": [{"id": "new"}]}
+        checkpoints = PageCheckpoints(
+            tmp_path, "workouts", "workouts", {"pageSize": 10}
+        )
+        second_page = {"workouts": [{"id": "old"}]}
+        checkpoints.start(3, first_page, fetch_page=None)
+        checkpoints.save(1, first_page)
+        checkpoints.save(2, second_page)
+        assert checkpoints.start(3, first_page, lambda page: second_page) == {1, 2}
+        assert checkpoints.load(2) == {"workouts": [{"id": "old"}]}
+
+        manifest_path = tmp_path / "workouts" / MANIFEST_FILE
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        manifest["started"] = "2000-01-01T00:00:00+00:00"
+        with open(manifest_path, "w") as f:
+            json.dump(manifest, f)
+
+        assert checkpoints.start(3, first_page, lambda page: second_page) == set()
+        assert not (tmp_path / "workouts" / "page_00002.json").exists()
+
+    def test_other_query_is_not_resumed(self, tmp_path):
+        """Test that pages of a different query are not mixed in"""
+        first_page = {"events": []}
+        events = PageCheckpoints(tmp_path, "workouts/events", "events", {"since": "a"})
+        events.start(2, first_page, fetch_page=None)
+        events.save(1, first_page)
+        events.save(2, first_page)
+
+        later = PageCheckpoints(tmp_path, "workouts/events", "events", {"since": "b"})
+
+        assert later.start(2, first_page, lambda page: first_page) == set()
@@ -0,0 +1,152 @@
+import pytest
+import requests
+from training_readiness.etl.extract_data.hevy.hevy_client import (
+    HevyClient,
+    TokenBucket,
+    retry_after_seconds,
+)
+
+
+class ScriptedResponse:
+    """Response with a status code and headers"""
+
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+class ScriptedSession:
+    """Session returning (or raising) scripted outcomes in order"""
+
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+        self.headers = {}
+        self.calls = 0
+
+    def get(self, url, params=None, timeout=None):
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    def close(self):
+        pass
+
+
+class FakeClock:
+    """Clock that only moves when slept on"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def scripted_client(outcomes, **kwargs):
+    """Client over a scripted session that records its backoff waits"""
+    sleeps = []
+    client = HevyClient(
+        "test-key",
+        rate=1000,
+        burst=100,
+        session=ScriptedSession(outcomes),
+        sleep=sleeps.append,
+        **kwargs,
+    )
+    return client, sleeps
+
+
+class TestHevyClient:
+    """Test cases for the pooled, retrying Hevy client"""
+
+    def test_api_key_header(self):
+        """Test that the API key is set once on the shared session"""
+        client, _ = scripted_client([])
+
+        assert client.session.headers["api-key"] == "test-key"
+
+    def test_retries_with_exponential_backoff(self):
+        """Test that 5xx responses are retried with doubling delays"""
+        client, sleeps = scripted_client(
+            [ScriptedResponse(503), ScriptedResponse(502), ScriptedResponse(200)],
+            backoff=0.5,
+        )
+
+        response = client.get("https://example.test/workouts")
+
+        assert response.status_code == 200
+        assert sleeps == [0.5, 1.0]
+        assert client.stats["requests"] == 3
+        assert client.stats["retries"] == 2
+
+    def test_retry_after_is_honored(self):
+        """Test that a 429 waits as long as the API asks"""
+        client, sleeps = scripted_client(
+            [ScriptedResponse(429, {"Retry-After": "7"}), ScriptedResponse(200)]
+        )
+
+        client.get("https://example.test/workouts")
+
+        assert sleeps == [7.0]
+        assert client.stats["throttled"] == 1
+
+    def test_gives_up_after_max_retries(self):
+        """Test that the last failing response is returned"""
+        client, sleeps = scripted_client(
+            [ScriptedResponse(500)] * 3, max_retries=2, backoff=1.0
+        )
+
+        response = client.get("https://example.test/workouts")
+
+        assert response.status_code == 500
+        assert sleeps == [1.0, 2.0]
+
+    def test_client_errors_are_not_retried(self):
+        """Test that a 404 is returned straight away"""
+        client, sleeps = scripted_client([ScriptedResponse(404)])
+
+        assert client.get("https://example.test/workouts").status_code == 404
+        assert sleeps == []
+
+    def test_connection_errors_are_retried(self):
+        """Test that dropped connections are retried, then raised"""
+        client, _ = scripted_client([requests.ConnectionError(), ScriptedResponse(200)])
+        assert client.get("https://example.test/workouts").status_code == 200
+        assert client.stats["errors"] == 1
+
+        client, _ = scripted_client([requests.Timeout()] * 2, max_retries=1)
+        with pytest.raises(requests.Timeout):
+            client.get("https://example.test/workouts")
+
+
+class TestTokenBucket:
+    """Test cases for the request rate limiter"""
+
+    def test_burst_then_rate(self):
+        """Test that a full bucket allows a burst before waiting"""
+        clock = FakeClock()
+        bucket = TokenBucket(rate=2.0, capacity=3, clock=clock, sleep=clock.sleep)
+
+        waits = [bucket.acquire() for _ in range(5)]
+
+        assert waits[:3] == [0.0, 0.0, 0.0]
+        assert waits[3:] == [0.5, 0.5]
+        assert clock.now == 1.0
+
+
+class TestRetryAfterSeconds:
+    """Test cases for parsing Retry-After"""
+
+    def test_formats(self):
+        """Test seconds, past HTTP dates and invalid values"""
+        assert retry_after_seconds("12") == 12.0
+        assert retry_after_seconds("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+        assert retry_after_seconds("soon") is None
+        assert retry_after_seconds(None) is None
@@ -0,0 +1,41 @@
+import pandas as pd
+from training_readiness.etl.extract_data.hevy.extract_hevy_data import (
+    localize_workout_times,
+)
+
+
+class TestLocalizeWorkoutTimes:
+    """Test cases for converting Hevy workout times to local time"""
+
+    def test_offset_applied_to_all_rows(self, monkeypatch):
+        """Test that every row is shifted by the configured offset"""
+        monkeypatch.setenv("TIMEZONE_OFFSET_HOURS", "7")
+        df = pd.DataFrame(
+            {
+                "workout_id": ["a", "a", "b"],
+                "start_time": [
+                    "2024-01-15T17:30:00+00:00",
+                    "2024-01-15T17:30:00+00:00",
+                    "2024-01-16T02:00:00Z",
+                ],
+                "end_time": [
+                    "2024-01-15T18:30:00+00:00",
+                    "2024-01-15T18:30:00+00:00",
+                    "2024-01-16T03:15:00Z",
+                ],
+            }
+        )
+
+        result = localize_workout_times(df)
+
+        assert list(result["start_time"]) == [
+            "2024-01-15T10:30:00",
+            "2024-01-15T10:30:00",
+            "2024-01-15T19:00:00",
+        ]
+        assert list(result["end_time"]) == [
+            "2024-01-15T11:30:00",
+            "2024-01-15T11:30:00",
+            "2024-01-15T20:15:00",
+        ]
+        assert list(result.columns) == ["workout_id", "start_time", "end_time"]
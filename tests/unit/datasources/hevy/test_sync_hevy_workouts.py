@@ -0,0 +1,113 @@
+import json
+from datetime import datetime, timezone
+
+import pandas as pd
+import pytest
+from training_readiness.etl.extract_data.hevy.extract_hevy_data import (
+    HEVY_SYNC_STATE_FILE,
+    apply_workout_events,
+    create_hevy_client,
+    main,
+    sync_hevy_workouts,
+)
+
+from .fake_hevy_api import API_KEY, FakeHevyApi, make_workout
+
+
+def workout_start(day):
+    """Start of a workout on a January 2024 day"""
+    return datetime(2024, 1, day, 17, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def api(monkeypatch):
+    """A running fake Hevy API holding three workouts"""
+    monkeypatch.setenv("HEVY_API_KEY", API_KEY)
+    monkeypatch.setenv("TIMEZONE_OFFSET_HOURS", "0")
+    with FakeHevyApi() as api:
+        for day in (1, 2, 3):
+            api.put_workout(make_workout(f"w{day}", workout_start(day)))
+        yield api
+
+
+def read_workouts(output_dir):
+    """Read an exported hevy_workouts.csv"""
+    return pd.read_csv(output_dir / "hevy_workouts.csv", dtype={"workout_id": str})
+
+
+class TestSyncHevyWorkouts:
+    """Test cases for incremental Hevy workout syncs"""
+
+    def sync(self, api, output_dir, incremental):
+        with create_hevy_client(base_url=api.base_url) as client:
+            return sync_hevy_workouts(output_dir, client, incremental=incremental)
+
+    def test_incremental_matches_full_export(self, api, tmp_path):
+        """Test that applying events gives the same rows as a full re-export"""
+        self.sync(api, tmp_path, incremental=True)
+        api.put_workout(make_workout("w2", workout_start(2), sets=4, title="Edited"))
+        api.delete_workout("w1")
+        api.put_workout(make_workout("w4", workout_start(4)))
+        api.requests.clear()
+
+        self.sync(api, tmp_path, incremental=True)
+
+        assert set(api.requests) == {"/v1/workouts/events"}
+        full_dir = tmp_path / "full"
+        full_dir.mkdir()
+        self.sync(api, full_dir, incremental=False)
+        pd.testing.assert_frame_equal(read_workouts(tmp_path), read_workouts(full_dir))
+        assert list(read_workouts(tmp_path)["workout_id"].unique()) == [
+            "w4",
+            "w3",
+            "w2",
+        ]
+
+    def test_first_incremental_run_fetches_everything(self, api, tmp_path):
+        """Test that without a previous sync all workouts are exported"""
+        rows = self.sync(api, tmp_path, incremental=True)
+
+        assert "/v1/workouts" in api.requests
+        assert rows == 6
+        with open(tmp_path / HEVY_SYNC_STATE_FILE) as f:
+            assert json.load(f)["last_sync"].endswith("Z")
+
+    def test_no_changes(self, api, tmp_path):
+        """Test that a sync without events leaves the export unchanged"""
+        self.sync(api, tmp_path, incremental=True)
+        before = read_workouts(tmp_path)
+
+        self.sync(api, tmp_path, incremental=True)
+
+        pd.testing.assert_frame_equal(read_workouts(tmp_path), before)
+
+    def test_main_exports_exercises(self, api, tmp_path):
+        """Test that main writes exercises and workouts from the API"""
+        main(output_dir=tmp_path, base_url=api.base_url, incremental=True)
+
+        with open(tmp_path / "hevy_exercises.json") as f:
+            assert len(json.load(f)) == 12
+        assert len(read_workouts(tmp_path)) == 6
+
+
+class TestApplyWorkoutEvents:
+    """Test cases for applying workout events to stored rows"""
+
+    def test_latest_event_wins(self, monkeypatch):
+        """Test that events are applied in the order they happened"""
+        monkeypatch.setenv("TIMEZONE_OFFSET_HOURS", "0")
+        workout = dict(
+            make_workout("w1", workout_start(1)), updated_at="2024-02-01T10:00:00Z"
+        )
+        deleted = {"type": "deleted", "id": "w1", "deleted_at": "2024-02-01T09:00:00Z"}
+
+        # Newest first, as the API lists them
+        result = apply_workout_events(
+            None, [{"type": "updated", "workout": workout}, deleted]
+        )
+
+        assert list(result["workout_id"]) == ["w1", "w1"]
+        assert (
+            apply_workout_events(result, [dict(deleted, deleted_at="2024-03-01")])
+            is None
+        )
@@ -0,0 +1,154 @@
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+import pytest
+from training_readiness.etl.extract_data.hevy.extract_hevy_data import (
+    HEVY_WORKOUT_COLUMNS,
+    create_hevy_client,
+    export_hevy_workouts,
+    iter_workout_batches,
+    read_workouts_file,
+    sync_hevy_workouts,
+    write_workout_batches,
+)
+
+from .fake_hevy_api import API_KEY, FakeHevyApi, make_workout
+
+
+def workout_pages(count, per_page=10, sets=3):
+    """Pages of workouts with ``sets`` sets each, newest first"""
+    start = datetime(2024, 1, 1, 17, 0, tzinfo=timezone.utc)
+    workouts = [
+        make_workout(f"w{day:03d}", start + timedelta(days=day), sets=sets)
+        for day in range(count - 1, -1, -1)
+    ]
+    return [workouts[i : i + per_page] for i in range(0, count, per_page)]
+
+
+@pytest.fixture(autouse=True)
+def utc(monkeypatch):
+    monkeypatch.setenv("TIMEZONE_OFFSET_HOURS", "0")
+
+
+class TestIterWorkoutBatches:
+    """Test cases for flattening workout pages into batches"""
+
+    def test_fixed_size_batches(self):
+        """Test that every batch but the last holds batch_rows rows"""
+        batches = list(iter_workout_batches(workout_pages(25), batch_rows=7))
+
+        assert [len(batch) for batch in batches] == [7] * 10 + [5]
+        assert list(batches[0].columns) == HEVY_WORKOUT_COLUMNS
+        assert batches[0]["start_time"].iloc[0] == "2024-01-25T17:00:00"
+
+    def test_batches_follow_pages(self):
+        """Test that batches are produced before later pages are read"""
+        pages_read = []
+
+        def pages():
+            for number, page in enumerate(workout_pages(30), start=1):
+                pages_read.append(number)
+                yield page
+
+        batches = iter_workout_batches(pages(), batch_rows=30)
+
+        next(batches)
+        assert pages_read == [1]
+
+    def test_repeated_workouts_are_dropped(self):
+        """Test that a workout repeated on the next page is flattened once"""
+        first, second = workout_pages(20)
+        batches = iter_workout_batches([first, [first[-1]] + second])
+
+        assert pd.concat(batches)["workout_id"].nunique() == 20
+
+
+class TestWriteWorkoutBatches:
+    """Test cases for writing batches to CSV and Parquet"""
+
+    def test_parquet_matches_csv(self, tmp_path):
+        """Test that both formats hold the same rows"""
+        pages = workout_pages(12)
+        pages[0][0]["exercises"][0]["sets"][0]["reps"] = None
+
+        csv_rows = write_workout_batches(
+            iter_workout_batches(pages, batch_rows=5), tmp_path / "w.csv"
+        )
+        parquet_rows = write_workout_batches(
+            iter_workout_batches(pages, batch_rows=5), tmp_path / "w.parquet"
+        )
+
+        assert csv_rows == parquet_rows == 36
+        # CSV reads empty strings back as missing
+        parquet_df = read_workouts_file(tmp_path / "w.parquet")
+        assert parquet_df["reps"].isna().sum() == 1
+        pd.testing.assert_frame_equal(
+            parquet_df.replace("", None),
+            read_workouts_file(tmp_path / "w.csv"),
+            check_dtype=False,
+        )
+
+    def test_csv_is_readable_while_writing(self, tmp_path):
+        """Test that rows written so far can be read before the export ends"""
+        output_file = tmp_path / "w.csv"
+        seen = []
+
+        def batches():
+            for batch in iter_workout_batches(workout_pages(4), batch_rows=3):
+                if output_file.exists():
+                    seen.append(len(read_workouts_file(output_file)))
+                yield batch
+
+        write_workout_batches(batches(), output_file)
+
+        assert seen == [3, 6, 9]
+
+    def test_no_rows_removes_file(self, tmp_path):
+        """Test that an empty export leaves no stale file behind"""
+        output_file = tmp_path / "w.parquet"
+        output_file.write_bytes(b"stale")
+
+        assert write_workout_batches([], output_file) == 0
+        assert not output_file.exists()
+
+
+class TestExportHevyWorkouts:
+    """Test cases for streaming workouts from the API"""
+
+    @pytest.fixture
+    def api(self, monkeypatch):
+        """A running fake Hevy API holding 35 workouts (4 pages of 10)"""
+        monkeypatch.setenv("HEVY_API_KEY", API_KEY)
+        with FakeHevyApi() as api:
+            for page in workout_pages(35, sets=2):
+                for workout in page:
+                    api.put_workout(workout)
+            yield api
+
+    def test_export_from_api(self, api, tmp_path):
+        """Test that all pages are streamed into the Parquet file"""
+        with create_hevy_client(base_url=api.base_url) as client:
+            rows = export_hevy_workouts(
+                tmp_path / "w.parquet", max_workers=4, client=client, batch_rows=8
+            )
+
+        workouts_df = read_workouts_file(tmp_path / "w.parquet")
+        assert rows == len(workouts_df) == 70
+        assert workouts_df["workout_id"].iloc[0] == "w034"
+        assert workouts_df["start_time"].is_monotonic_decreasing
+
+    def test_incremental_parquet_sync(self, api, tmp_path):
+        """Test that events are applied to a stored Parquet export"""
+        with create_hevy_client(base_url=api.base_url) as client:
+            sync_hevy_workouts(
+                tmp_path, client, incremental=True, file_format="parquet"
+            )
+            api.delete_workout("w000")
+            rows = sync_hevy_workouts(
+                tmp_path, client, incremental=True, file_format="parquet"
+            )
+
+        assert rows == 68
+        assert "w000" not in set(
+            read_workouts_file(tmp_path / "hevy_workouts.parquet")["workout_id"]
+        )
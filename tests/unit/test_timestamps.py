@@ -0,0 +1,88 @@
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+import pytest
+from training_readiness.etl.timestamps import (
+    parse_apple_health_timestamp,
+    parse_apple_health_timestamps,
+    parse_hevy_timestamps,
+    parse_utc_offset,
+)
+
+
+class TestTimestamps:
+    """Test cases for the shared fixed-format timestamp parser"""
+
+    def test_apple_health_mixed_offsets(self):
+        """Test that a column mixing offsets becomes datetime64 columns"""
+        values = pd.Series(
+            ["2024-03-10 01:00:00 -0800", "2024-03-10 03:30:00 -0700"], index=[4, 9]
+        )
+
+        local, utc = parse_apple_health_timestamps(values)
+
+        assert local.dtype == "datetime64[ns]"
+        assert str(utc.dtype) == "datetime64[ns, UTC]"
+        assert list(local.index) == [4, 9]
+        assert list(local.dt.strftime("%H:%M")) == ["01:00", "03:30"]
+        assert list(utc.dt.strftime("%H:%M")) == ["09:00", "10:30"]
+
+    def test_matches_pandas_inference(self):
+        """Test that instants equal those of pd.to_datetime"""
+        values = pd.Series(
+            [
+                "2024-01-01 23:00:00 +0000",
+                "2024-06-30 06:12:00 -0700",
+                "2024-11-03 01:30:00 +0530",
+            ]
+        )
+
+        _, utc = parse_apple_health_timestamps(values)
+
+        expected = pd.to_datetime(values, utc=True)
+        assert list(utc) == list(expected)
+
+    def test_missing_values_are_nat(self):
+        """Test that missing dates become NaT in both columns"""
+        local, utc = parse_apple_health_timestamps(["2024-01-01 23:00:00 +0000", None])
+
+        assert local.isna().tolist() == [False, True]
+        assert utc.isna().tolist() == [False, True]
+
+    def test_empty_column(self):
+        """Test that an empty column keeps datetime dtypes"""
+        local, utc = parse_apple_health_timestamps(pd.Series([], dtype=object))
+
+        assert local.dtype == "datetime64[ns]"
+        assert str(utc.dtype) == "datetime64[ns, UTC]"
+
+    def test_hevy_suffixes(self):
+        """Test that Z, +00:00 and no suffix all denote UTC"""
+        _, utc = parse_hevy_timestamps(
+            [
+                "2024-01-15T10:30:00Z",
+                "2024-01-15T10:30:00+00:00",
+                "2024-01-15T10:30:00",
+                "2024-01-15T16:00:00+05:30",
+            ]
+        )
+
+        assert list(utc.dt.strftime("%H:%M")) == ["10:30", "10:30", "10:30", "10:30"]
+
+    def test_invalid_values(self):
+        """Test that values not in the source's format raise"""
+        with pytest.raises(ValueError):
+            parse_hevy_timestamps(["invalid-date"])
+        with pytest.raises(ValueError):
+            parse_apple_health_timestamps(["2024-01-15T10:30:00Z"])
+        with pytest.raises(ValueError):
+            parse_utc_offset(" PST")
+
+    def test_single_timestamp(self):
+        """Test parsing a single Apple Health date"""
+        result = parse_apple_health_timestamp("2024-03-01 06:12:00 -0700")
+
+        assert result == datetime(
+            2024, 3, 1, 6, 12, tzinfo=timezone(timedelta(hours=-7))
+        )
+        assert parse_apple_health_timestamp("") is None